@@ -0,0 +1,116 @@
+"""partition_transactions_by_month
+
+Revision ID: 7a1c3e9d2b40
+Revises: 2f0541c82cc5
+Create Date: 2026-10-19 09:00:00.000000
+
+Converts `transactions` into a PostgreSQL table partitioned by RANGE
+("timestamp"), one partition per month plus a DEFAULT partition. The
+primary key becomes (id, timestamp) because PostgreSQL requires unique
+constraints on a partitioned table to include the partition key; for the
+same reason the foreign key from bill_transactions.transaction_id is dropped.
+
+On SQLite only the (sender_id, timestamp) and (receiver_id, timestamp)
+indexes are added.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a1c3e9d2b40'
+down_revision: Union[str, Sequence[str], None] = '2f0541c82cc5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    """Partition transactions by month (PostgreSQL only)."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.create_index('ix_transactions_sender_id_timestamp', 'transactions', ['sender_id', 'timestamp'], unique=False)
+        op.create_index('ix_transactions_receiver_id_timestamp', 'transactions', ['receiver_id', 'timestamp'], unique=False)
+        return
+
+    op.execute('ALTER TABLE bill_transactions DROP CONSTRAINT IF EXISTS bill_transactions_transaction_id_fkey')
+    op.execute('ALTER TABLE transactions RENAME TO transactions_legacy')
+    op.execute('DROP INDEX IF EXISTS ix_transactions_id')
+
+    op.execute("""
+        CREATE TABLE transactions (
+            id VARCHAR NOT NULL,
+            sender_id VARCHAR REFERENCES users(id),
+            receiver_id VARCHAR REFERENCES users(id),
+            amount FLOAT NOT NULL,
+            "timestamp" TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            encrypted_note VARCHAR,
+            PRIMARY KEY (id, "timestamp")
+        ) PARTITION BY RANGE ("timestamp")
+    """)
+    op.execute('CREATE INDEX ix_transactions_id ON transactions (id)')
+    op.execute('CREATE INDEX ix_transactions_sender_id_timestamp ON transactions (sender_id, "timestamp")')
+    op.execute('CREATE INDEX ix_transactions_receiver_id_timestamp ON transactions (receiver_id, "timestamp")')
+    op.execute('CREATE TABLE transactions_default PARTITION OF transactions DEFAULT')
+
+    # One partition per month from the oldest existing row to MONTHS_AHEAD months from now
+    oldest = bind.execute(sa.text('SELECT min("timestamp") FROM transactions_legacy')).scalar()
+    today = date.today()
+    month = date(oldest.year, oldest.month, 1) if oldest else date(today.year, today.month, 1)
+    last = _add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE transactions_y{month.year}m{month.month:02d} PARTITION OF transactions "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+
+    op.execute("""
+        INSERT INTO transactions (id, sender_id, receiver_id, amount, "timestamp", encrypted_note)
+        SELECT id, sender_id, receiver_id, amount, COALESCE("timestamp", now()), encrypted_note
+        FROM transactions_legacy
+    """)
+    op.execute('DROP TABLE transactions_legacy')
+
+
+def downgrade() -> None:
+    """Convert transactions back into a regular table (PostgreSQL only)."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.drop_index('ix_transactions_receiver_id_timestamp', table_name='transactions')
+        op.drop_index('ix_transactions_sender_id_timestamp', table_name='transactions')
+        return
+
+    op.execute('ALTER TABLE transactions RENAME TO transactions_partitioned')
+    op.execute('DROP INDEX IF EXISTS ix_transactions_id')
+    op.execute("""
+        CREATE TABLE transactions (
+            id VARCHAR NOT NULL PRIMARY KEY,
+            sender_id VARCHAR REFERENCES users(id),
+            receiver_id VARCHAR REFERENCES users(id),
+            amount FLOAT NOT NULL,
+            "timestamp" TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            encrypted_note VARCHAR
+        )
+    """)
+    op.execute('CREATE INDEX ix_transactions_id ON transactions (id)')
+    op.execute("""
+        INSERT INTO transactions (id, sender_id, receiver_id, amount, "timestamp", encrypted_note)
+        SELECT id, sender_id, receiver_id, amount, "timestamp", encrypted_note
+        FROM transactions_partitioned
+    """)
+    # Dropping the parent drops all attached partitions
+    op.execute('DROP TABLE transactions_partitioned')
+    op.execute(
+        'ALTER TABLE bill_transactions ADD CONSTRAINT bill_transactions_transaction_id_fkey '
+        'FOREIGN KEY (transaction_id) REFERENCES transactions (id)'
+    )
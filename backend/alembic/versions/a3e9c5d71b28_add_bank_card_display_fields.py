@@ -0,0 +1,79 @@
+"""add_bank_card_display_fields
+
+Revision ID: a3e9c5d71b28
+Revises: f4d2a8c61e07
+Create Date: 2026-10-19 22:00:00.000000
+
+Adds bank_cards.last4, brand and expiry_masked, the plain display fields
+the card endpoints and transaction notes use instead of decrypting the
+card number and expiry.
+
+Existing cards are backfilled by decrypting them once, so this needs the
+app's ENCRYPTION_KEY (and ENCRYPTION_OLD_KEYS during a key rotation).
+Cards that can't be decrypted keep NULL and are shown as "****" / "**/**",
+as before.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3e9c5d71b28'
+down_revision: Union[str, Sequence[str], None] = 'f4d2a8c61e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Add and backfill the bank_cards display fields."""
+    from app.core.encryption import encryption_service
+    from app.services.card_display import card_display_fields
+
+    with op.batch_alter_table('bank_cards') as batch_op:
+        batch_op.add_column(sa.Column('last4', sa.String(length=4), nullable=True))
+        batch_op.add_column(sa.Column('brand', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('expiry_masked', sa.String(length=5), nullable=True))
+
+    conn = op.get_bind()
+    cards = sa.table(
+        'bank_cards',
+        sa.column('id', sa.String), sa.column('card_number_encrypted', sa.String),
+        sa.column('expiry_date_encrypted', sa.String), sa.column('last4', sa.String),
+        sa.column('brand', sa.String), sa.column('expiry_masked', sa.String),
+    )
+    update = cards.update().where(cards.c.id == sa.bindparam('card_id')).values(
+        last4=sa.bindparam('p_last4'), brand=sa.bindparam('p_brand'), expiry_masked=sa.bindparam('p_expiry_masked'),
+    )
+    last_id = None
+    while True:
+        query = sa.select(cards.c.id, cards.c.card_number_encrypted, cards.c.expiry_date_encrypted).order_by(cards.c.id)
+        if last_id is not None:
+            query = query.where(cards.c.id > last_id)
+        rows = conn.execute(query.limit(BATCH_SIZE)).all()
+        if not rows:
+            break
+        pending = []
+        for card_id, card_number_encrypted, expiry_date_encrypted in rows:
+            try:
+                fields = card_display_fields(
+                    encryption_service.decrypt(card_number_encrypted),
+                    encryption_service.decrypt(expiry_date_encrypted),
+                )
+            except (ValueError, TypeError):
+                continue
+            pending.append({'card_id': card_id, **{f'p_{name}': value for name, value in fields.items()}})
+        if pending:
+            conn.execute(update, pending)
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    """Drop the bank_cards display fields."""
+    with op.batch_alter_table('bank_cards') as batch_op:
+        batch_op.drop_column('expiry_masked')
+        batch_op.drop_column('brand')
+        batch_op.drop_column('last4')
@@ -0,0 +1,93 @@
+"""store_money_as_bigint_minor_units
+
+Revision ID: b5e2d8f41c07
+Revises: 7a1c3e9d2b40
+Create Date: 2026-10-19 12:00:00.000000
+
+Converts every money column from FLOAT / NUMERIC(15,2) to BIGINT minor
+units (đồng; VND has no sub-unit). Existing values are rounded to the
+nearest đồng: on PostgreSQL by the type change itself (USING ROUND(...)),
+so each table is rewritten only by the ALTER; elsewhere by an UPDATE before
+the batch table copy. On PostgreSQL the type change on the partitioned
+`transactions` table propagates to its partitions.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e2d8f41c07'
+down_revision: Union[str, Sequence[str], None] = '7a1c3e9d2b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, previous type, nullable)
+MONEY_COLUMNS = [
+    ('wallets', 'balance', sa.Float(), True),
+    ('transactions', 'amount', sa.Float(), False),
+    ('bill_transactions', 'amount', sa.Numeric(15, 2), False),
+    ('budgets', 'amount', sa.Float(), False),
+    ('savings_goals', 'target_amount', sa.Float(), False),
+    ('savings_goals', 'current_amount', sa.Float(), True),
+    ('savings_goals', 'auto_deposit_amount', sa.Float(), True),
+    ('alert_settings', 'large_transaction_threshold', sa.Float(), True),
+    ('alert_settings', 'low_balance_threshold', sa.Float(), True),
+]
+
+
+def _tables():
+    tables = {}
+    for table, column, old_type, nullable in MONEY_COLUMNS:
+        tables.setdefault(table, []).append((column, old_type, nullable))
+    return tables
+
+
+def upgrade() -> None:
+    """Round money columns to whole đồng and change them to BIGINT."""
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    for table, columns in _tables().items():
+        if postgres:
+            for column, old_type, nullable in columns:
+                op.alter_column(
+                    table, column,
+                    existing_type=old_type,
+                    existing_nullable=nullable,
+                    type_=sa.BigInteger(),
+                    postgresql_using=f'ROUND({column})::bigint',
+                )
+        else:
+            for column, _, _ in columns:
+                op.execute(f'UPDATE {table} SET {column} = ROUND({column}) WHERE {column} IS NOT NULL')
+            with op.batch_alter_table(table) as batch_op:
+                for column, old_type, nullable in columns:
+                    batch_op.alter_column(
+                        column,
+                        existing_type=old_type,
+                        existing_nullable=nullable,
+                        type_=sa.BigInteger(),
+                    )
+
+
+def downgrade() -> None:
+    """Change money columns back to FLOAT / NUMERIC(15,2)."""
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    for table, columns in _tables().items():
+        if postgres:
+            for column, old_type, nullable in columns:
+                op.alter_column(
+                    table, column,
+                    existing_type=sa.BigInteger(),
+                    existing_nullable=nullable,
+                    type_=old_type,
+                )
+        else:
+            with op.batch_alter_table(table) as batch_op:
+                for column, old_type, nullable in columns:
+                    batch_op.alter_column(
+                        column,
+                        existing_type=sa.BigInteger(),
+                        existing_nullable=nullable,
+                        type_=old_type,
+                    )
@@ -0,0 +1,81 @@
+"""add_bank_card_hash
+
+Revision ID: b7d1f3a9c604
+Revises: a3e9c5d71b28
+Create Date: 2026-10-19 23:00:00.000000
+
+Adds bank_cards.card_hash, a keyed HMAC blind index of the card number
+(app/core/blind_index.py), with a unique constraint, and so an index, on
+(user_id, card_hash). Adding a card looks duplicates up on it instead of
+decrypting the user's cards.
+
+Existing cards are backfilled by decrypting them once, so this needs the
+app's ENCRYPTION_KEY and the same BLIND_INDEX_KEY as the app (required if
+ENCRYPTION_OLD_KEYS is set). Where a user
+already has the same card number more than once, the hash goes to the
+verified card, or the oldest one; the others keep NULL. Cards that can't
+be decrypted keep NULL too.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d1f3a9c604'
+down_revision: Union[str, Sequence[str], None] = 'a3e9c5d71b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Add, backfill and index bank_cards.card_hash."""
+    from app.core.blind_index import card_number_index
+    from app.core.encryption import encryption_service
+
+    # Fails here, not per card, if the blind index key is missing during a key rotation
+    card_number_index.hmac_key
+
+    with op.batch_alter_table('bank_cards') as batch_op:
+        batch_op.add_column(sa.Column('card_hash', sa.String(length=64), nullable=True))
+
+    conn = op.get_bind()
+    cards = sa.table(
+        'bank_cards',
+        sa.column('id', sa.String), sa.column('card_hash', sa.String),
+    )
+    # Best candidate first within each user, so the first row seen per card keeps the hash
+    rows = conn.execute(sa.text(
+        "SELECT id, user_id, card_number_encrypted FROM bank_cards "
+        "ORDER BY user_id, is_verified DESC, created_at"
+    )).mappings()
+    update = cards.update().where(cards.c.id == sa.bindparam('card_id')).values(card_hash=sa.bindparam('p_hash'))
+    seen = set()
+    pending = []
+    for row in rows.all():
+        try:
+            card_hash = card_number_index.hash(encryption_service.decrypt(row['card_number_encrypted']))
+        except ValueError:
+            continue
+        if card_hash is None or (row['user_id'], card_hash) in seen:
+            continue
+        seen.add((row['user_id'], card_hash))
+        pending.append({'card_id': row['id'], 'p_hash': card_hash})
+        if len(pending) >= BATCH_SIZE:
+            conn.execute(update, pending)
+            pending = []
+    if pending:
+        conn.execute(update, pending)
+
+    with op.batch_alter_table('bank_cards') as batch_op:
+        batch_op.create_unique_constraint('uq_bank_cards_user_id_card_hash', ['user_id', 'card_hash'])
+
+
+def downgrade() -> None:
+    """Drop bank_cards.card_hash and its unique constraint."""
+    with op.batch_alter_table('bank_cards') as batch_op:
+        batch_op.drop_constraint('uq_bank_cards_user_id_card_hash', type_='unique')
+        batch_op.drop_column('card_hash')
@@ -0,0 +1,33 @@
+"""mask_bank_card_expiry
+
+Revision ID: c2e7a4b9d813
+Revises: b7d1f3a9c604
+Create Date: 2026-10-20 09:00:00.000000
+
+bank_cards.expiry_masked held the full MM/YY in plain text next to
+expiry_date_encrypted. It now holds **/YY only; this masks the values
+written before. Downgrading keeps the masked values: the month can't be
+restored without decrypting, and the card endpoints show **/YY either way.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e7a4b9d813'
+down_revision: Union[str, Sequence[str], None] = 'b7d1f3a9c604'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Replace the month of stored expiries with **."""
+    op.execute(
+        "UPDATE bank_cards SET expiry_masked = '**/' || substr(expiry_masked, 4, 2) "
+        "WHERE expiry_masked IS NOT NULL AND expiry_masked NOT LIKE '**/%'"
+    )
+
+
+def downgrade() -> None:
+    """Nothing to undo; the masked values stay."""
@@ -0,0 +1,72 @@
+"""add_savings_auto_deposit_scheduling
+
+Revision ID: c8a4f1e6d293
+Revises: b5e2d8f41c07
+Create Date: 2026-10-19 14:00:00.000000
+
+Adds savings_goals.next_auto_deposit_at with a partial index over active,
+scheduled goals, and the savings_auto_deposits ledger that makes each
+auto-deposit unique per (goal, period). Existing goals with an
+auto_deposit_amount become due immediately.
+
+Also indexes wallets.user_id: the scheduler debits wallets by user_id, as
+does every wallet lookup in the API.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8a4f1e6d293'
+down_revision: Union[str, Sequence[str], None] = 'b5e2d8f41c07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add auto-deposit scheduling column, index and ledger table."""
+    op.create_index(op.f('ix_wallets_user_id'), 'wallets', ['user_id'], unique=False)
+    with op.batch_alter_table('savings_goals') as batch_op:
+        batch_op.add_column(sa.Column('next_auto_deposit_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_savings_goals_next_auto_deposit_at',
+        'savings_goals',
+        ['next_auto_deposit_at'],
+        postgresql_where=sa.text('auto_deposit_amount IS NOT NULL AND NOT is_completed'),
+        sqlite_where=sa.text('auto_deposit_amount IS NOT NULL AND is_completed = 0'),
+    )
+    op.execute(
+        "UPDATE savings_goals SET next_auto_deposit_at = CURRENT_TIMESTAMP "
+        "WHERE auto_deposit_amount IS NOT NULL"
+    )
+
+    op.create_table(
+        'savings_auto_deposits',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('goal_id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('period', sa.String(), nullable=False),
+        sa.Column('amount', sa.BigInteger(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('transaction_id', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['goal_id'], ['savings_goals.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('goal_id', 'period', name='uq_savings_auto_deposits_goal_period'),
+    )
+    op.create_index(op.f('ix_savings_auto_deposits_id'), 'savings_auto_deposits', ['id'], unique=False)
+    op.create_index(op.f('ix_savings_auto_deposits_user_id'), 'savings_auto_deposits', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop the auto-deposit ledger, index and column."""
+    op.drop_index(op.f('ix_savings_auto_deposits_user_id'), table_name='savings_auto_deposits')
+    op.drop_index(op.f('ix_savings_auto_deposits_id'), table_name='savings_auto_deposits')
+    op.drop_table('savings_auto_deposits')
+    op.drop_index('ix_savings_goals_next_auto_deposit_at', table_name='savings_goals')
+    with op.batch_alter_table('savings_goals') as batch_op:
+        batch_op.drop_column('next_auto_deposit_at')
+    op.drop_index(op.f('ix_wallets_user_id'), table_name='wallets')
@@ -0,0 +1,77 @@
+"""add_user_device_fingerprint
+
+Revision ID: e1b7c4a9f352
+Revises: c8a4f1e6d293
+Create Date: 2026-10-19 18:00:00.000000
+
+Adds user_devices.fingerprint (SHA-256 of IP address + user agent) with a
+unique constraint, and so an index, on (user_id, fingerprint); logins
+match devices on it instead of comparing ip_address and user_agent.
+
+Existing rows are backfilled. Where a user already has several rows with
+the same IP and user agent (an old device was removed and a new row was
+created on the next login), the fingerprint goes to the active row, or
+the most recently used one; the others keep NULL and are never matched.
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b7c4a9f352'
+down_revision: Union[str, Sequence[str], None] = 'c8a4f1e6d293'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def _fingerprint(ip_address, user_agent) -> str:
+    # Same as app.services.device_detection.device_fingerprint, frozen here
+    return hashlib.sha256(f"{ip_address or ''}\n{user_agent or ''}".encode("utf-8")).hexdigest()
+
+
+def upgrade() -> None:
+    """Add, backfill and index user_devices.fingerprint."""
+    with op.batch_alter_table('user_devices') as batch_op:
+        batch_op.add_column(sa.Column('fingerprint', sa.String(length=64), nullable=True))
+
+    conn = op.get_bind()
+    devices = sa.table(
+        'user_devices',
+        sa.column('id', sa.String), sa.column('fingerprint', sa.String),
+    )
+    # Best candidate first within each user, so the first row seen per fingerprint keeps it
+    rows = conn.execute(sa.text(
+        "SELECT id, user_id, ip_address, user_agent FROM user_devices "
+        "ORDER BY user_id, is_active DESC, last_login DESC"
+    )).mappings().all()
+    update = devices.update().where(devices.c.id == sa.bindparam('device_id')).values(
+        fingerprint=sa.bindparam('fp')
+    )
+    seen = set()
+    pending = []
+    for row in rows:
+        fp = _fingerprint(row['ip_address'], row['user_agent'])
+        if (row['user_id'], fp) in seen:
+            continue
+        seen.add((row['user_id'], fp))
+        pending.append({'device_id': row['id'], 'fp': fp})
+        if len(pending) >= BATCH_SIZE:
+            conn.execute(update, pending)
+            pending = []
+    if pending:
+        conn.execute(update, pending)
+
+    with op.batch_alter_table('user_devices') as batch_op:
+        batch_op.create_unique_constraint('uq_user_devices_user_id_fingerprint', ['user_id', 'fingerprint'])
+
+
+def downgrade() -> None:
+    """Drop user_devices.fingerprint and its unique constraint."""
+    with op.batch_alter_table('user_devices') as batch_op:
+        batch_op.drop_constraint('uq_user_devices_user_id_fingerprint', type_='unique')
+        batch_op.drop_column('fingerprint')
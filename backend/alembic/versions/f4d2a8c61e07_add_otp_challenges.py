@@ -0,0 +1,50 @@
+"""add_otp_challenges
+
+Revision ID: f4d2a8c61e07
+Revises: e1b7c4a9f352
+Create Date: 2026-10-19 20:00:00.000000
+
+Adds otp_challenges: one outstanding OTP per user, purpose and target,
+with a keyed hash of the code, an attempt counter and an expiry (indexed
+for the expiry purge). OTPs are no longer written to users.otp_secret /
+users.otp_created_at; the columns are left in place for now. Codes that
+were outstanding at deploy time have to be requested again.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4d2a8c61e07'
+down_revision: Union[str, Sequence[str], None] = 'e1b7c4a9f352'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create otp_challenges."""
+    op.create_table(
+        'otp_challenges',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('purpose', sa.String(), nullable=False),
+        sa.Column('target', sa.String(), nullable=False),
+        sa.Column('code_hash', sa.String(length=64), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'purpose', 'target', name='uq_otp_challenges_user_purpose_target'),
+    )
+    op.create_index(op.f('ix_otp_challenges_id'), 'otp_challenges', ['id'], unique=False)
+    op.create_index(op.f('ix_otp_challenges_expires_at'), 'otp_challenges', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop otp_challenges."""
+    op.drop_index(op.f('ix_otp_challenges_expires_at'), table_name='otp_challenges')
+    op.drop_index(op.f('ix_otp_challenges_id'), table_name='otp_challenges')
+    op.drop_table('otp_challenges')
@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, extract
+from sqlalchemy import and_, or_, extract
 from typing import List, Optional, Dict
 from datetime import datetime, date, timedelta
 from collections import defaultdict
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.core.security import get_current_user
 from app.core.encryption import encryption_service
+from app.core.money import sum_money
 from app.core.rate_limit import limiter, GENERAL_LIMIT
 from app.models import User, Transaction, Wallet
 from app.schemas import (
@@ -75,7 +76,7 @@ async def get_spending_analytics(
     month: Optional[int] = Query(None, ge=1, le=12),
     category: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get spending analytics for a period.
@@ -118,17 +119,16 @@ async def get_spending_analytics(
     
     transactions = query.all()
     
-    # Get all transactions where user is receiver (income)
-    income_query = db.query(Transaction).filter(
+    # Income (transfers received, excluding deposits) only needs its total
+    total_income = db.query(sum_money(Transaction.amount)).filter(
         Transaction.receiver_id == current_user.id,
         Transaction.sender_id.isnot(None),  # Exclude deposits
         Transaction.timestamp >= datetime.combine(start_date, datetime.min.time()),
         Transaction.timestamp < datetime.combine(end_date, datetime.min.time())
-    )
-    income_transactions = income_query.all()
+    ).scalar()
     
     # Calculate spending by category
-    category_totals = defaultdict(lambda: {"amount": 0.0, "count": 0})
+    category_totals = defaultdict(lambda: {"amount": 0, "count": 0})
     
     for tx in transactions:
         # Decrypt note
@@ -147,7 +147,6 @@ async def get_spending_analytics(
     
     # Calculate totals
     total_spending = sum(tx.amount for tx in transactions)
-    total_income = sum(tx.amount for tx in income_transactions)
     net_amount = total_income - total_spending
     
     # Build category summaries
@@ -167,7 +166,7 @@ async def get_spending_analytics(
     # Daily breakdown (for month and year periods)
     daily_breakdown = None
     if period in ["month", "year"]:
-        daily_totals = defaultdict(float)
+        daily_totals = defaultdict(int)
         for tx in transactions:
             tx_date = tx.timestamp.date()
             daily_totals[tx_date.isoformat()] += tx.amount
@@ -196,7 +195,7 @@ async def get_spending_trends(
     request: Request,
     period: str = Query(default="month", pattern="^(week|month|year)$"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get spending trends comparing current period with previous period.
@@ -230,20 +229,20 @@ async def get_spending_trends(
         previous_end = date(now.year, 1, 1)
     
     # Get current period spending
-    current_query = db.query(func.sum(Transaction.amount)).filter(
+    current_query = db.query(sum_money(Transaction.amount)).filter(
         Transaction.sender_id == current_user.id,
         Transaction.timestamp >= datetime.combine(current_start, datetime.min.time()),
         Transaction.timestamp < datetime.combine(current_end, datetime.min.time())
     )
-    current_amount = current_query.scalar() or 0.0
+    current_amount = current_query.scalar()
     
     # Get previous period spending
-    previous_query = db.query(func.sum(Transaction.amount)).filter(
+    previous_query = db.query(sum_money(Transaction.amount)).filter(
         Transaction.sender_id == current_user.id,
         Transaction.timestamp >= datetime.combine(previous_start, datetime.min.time()),
         Transaction.timestamp < datetime.combine(previous_end, datetime.min.time())
     )
-    previous_amount = previous_query.scalar() or 0.0
+    previous_amount = previous_query.scalar()
     
     # Calculate change
     if previous_amount == 0:
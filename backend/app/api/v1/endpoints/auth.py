@@ -2,13 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
-from datetime import datetime, timedelta
 
 from app.core.database import get_db
 from app.core.security import create_access_token, create_refresh_token, get_password_hash, verify_password, SECRET_KEY, ALGORITHM
 from app.core.rate_limit import limiter, AUTH_RATE_LIMIT
 from app.core.config import settings
-from app.models import User, Wallet, UserDevice, SecurityHistory
+from app.models import User, Wallet, SecurityHistory
 from app.schemas import (
     UserCreate,
     UserResponse,
@@ -21,7 +20,15 @@ from app.schemas import (
     TransactionPinVerify,
 )
 from app.core.security import get_current_user
-from app.services.otp import otp_service
+from app.services.device_detection import parse_user_agent
+from app.services.login_recorder import LoginRecord, login_recorder
+from app.services.otp_challenges import (
+    OTP_EXPIRED,
+    OTP_LOCKED,
+    OTP_OK,
+    OTP_PURPOSE_REGISTRATION,
+    otp_challenge_store,
+)
 from app.services.email_service import email_service, send_otp_email_async
 
 router = APIRouter()
@@ -42,27 +49,22 @@ async def register(request: Request, user: UserCreate, db: Session = Depends(get
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    # Generate OTP secret
-    otp_secret = otp_service.generate_secret()
-    otp_code = otp_service.generate_otp(otp_secret)
-    
     # Create user (unverified initially)
     hashed_password = get_password_hash(user.password)
     db_user = User(
         email=user.email,
         hashed_password=hashed_password,
         full_name=user.full_name,
-        otp_secret=otp_secret,
-        otp_created_at=datetime.utcnow(),
         is_verified=False
     )
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
     
-    # Create Wallet for user
+    # Create Wallet for user, and the OTP challenge for email verification
     db_wallet = Wallet(user_id=db_user.id)
     db.add(db_wallet)
+    otp_code = otp_challenge_store.issue(db, db_user.id, OTP_PURPOSE_REGISTRATION, target=db_user.email)
     db.commit()
     
     # Print OTP to console IMMEDIATELY (before attempting email)
@@ -83,45 +85,6 @@ async def register(request: Request, user: UserCreate, db: Session = Depends(get
     
     return db_user
 
-def _detect_device_type(user_agent: str) -> str:
-    """Detect device type from user agent string."""
-    user_agent_lower = user_agent.lower()
-    if 'iphone' in user_agent_lower or 'ipad' in user_agent_lower or 'ipod' in user_agent_lower:
-        return 'IOS'
-    elif 'android' in user_agent_lower:
-        return 'ANDROID'
-    else:
-        return 'WEB'
-
-def _get_device_name(user_agent: str, device_type: str) -> str:
-    """Extract device name from user agent."""
-    user_agent_lower = user_agent.lower()
-    if device_type == 'IOS':
-        if 'iphone' in user_agent_lower:
-            # Try to extract iPhone model
-            if 'iphone os 17' in user_agent_lower or 'iphone os 18' in user_agent_lower:
-                return 'iPhone'
-            return 'iPhone'
-        elif 'ipad' in user_agent_lower:
-            return 'iPad'
-        return 'iOS Device'
-    elif device_type == 'ANDROID':
-        # Try to extract Android device name
-        if 'samsung' in user_agent_lower:
-            return 'Samsung Device'
-        elif 'xiaomi' in user_agent_lower:
-            return 'Xiaomi Device'
-        return 'Android Device'
-    else:
-        # Extract browser name
-        if 'chrome' in user_agent_lower:
-            return 'Chrome Browser'
-        elif 'firefox' in user_agent_lower:
-            return 'Firefox Browser'
-        elif 'safari' in user_agent_lower:
-            return 'Safari Browser'
-        return 'Web Browser'
-
 @router.post("/login", response_model=Token)
 @limiter.limit(AUTH_RATE_LIMIT)
 async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
@@ -129,8 +92,7 @@ async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends
     Login with email and password.
     
     - User must have verified their email via OTP before logging in
-    - Automatically creates/updates device record
-    - Creates security history entry
+    - Queues the device record update and security history entry
     - Returns JWT access token and refresh token on success
     """
     user = db.query(User).filter(User.email == form_data.username).first()
@@ -152,50 +114,17 @@ async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends
     user_agent = request.headers.get("user-agent", "Unknown")
     ip_address = request.client.host if request.client else None
     
-    # Detect device type and name
-    device_type = _detect_device_type(user_agent)
-    device_name = _get_device_name(user_agent, device_type)
-    
-    # Create or update device record
-    # Try to find existing device by IP and user_agent (simple matching)
-    existing_device = db.query(UserDevice).filter(
-        UserDevice.user_id == user.id,
-        UserDevice.ip_address == ip_address,
-        UserDevice.user_agent == user_agent,
-        UserDevice.is_active == True
-    ).first()
-    
-    if existing_device:
-        # Update last login time
-        existing_device.last_login = datetime.utcnow()
-        device_id = existing_device.id
-    else:
-        # Create new device record
-        new_device = UserDevice(
-            user_id=user.id,
-            device_name=device_name,
-            device_type=device_type,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            last_login=datetime.utcnow()
-        )
-        db.add(new_device)
-        db.flush()  # Flush to get the ID
-        device_id = new_device.id
+    # Detect device type and name (memoized per user agent)
+    device = parse_user_agent(user_agent)
     
-    # Create security history entry
-    security_history = SecurityHistory(
+    # Device and security history rows are written in batches off the request path
+    login_recorder.record(LoginRecord(
         user_id=user.id,
-        action_type='LOGIN',
-        description=f'Đăng nhập từ {device_name}',
         ip_address=ip_address,
         user_agent=user_agent,
-        device_id=device_id
-    )
-    db.add(security_history)
-    
-    # Commit all changes
-    db.commit()
+        device_type=device.device_type,
+        device_name=device.device_name,
+    ))
     
     access_token = create_access_token(subject=user.email)
     refresh_token = create_refresh_token(subject=user.email)
@@ -222,14 +151,13 @@ async def verify_otp(request: Request, otp_data: OTPVerify, db: Session = Depend
     if user.is_verified:
         return {"message": "Email already verified"}
     
-    # Check if OTP has expired
-    if user.otp_created_at:
-        expiry_time = user.otp_created_at + timedelta(minutes=settings.OTP_EXPIRY_MINUTES)
-        if datetime.utcnow() > expiry_time:
-            raise HTTPException(status_code=400, detail="OTP has expired. Please request a new one.")
-    
     # Verify OTP
-    if not otp_service.verify_otp(user.otp_secret, otp_data.otp_code):
+    result = otp_challenge_store.verify(db, user.id, OTP_PURPOSE_REGISTRATION, otp_data.otp_code, target=user.email)
+    if result == OTP_EXPIRED:
+        raise HTTPException(status_code=400, detail="OTP has expired. Please request a new one.")
+    if result == OTP_LOCKED:
+        raise HTTPException(status_code=400, detail="Too many incorrect attempts. Please request a new OTP.")
+    if result != OTP_OK:
         raise HTTPException(status_code=400, detail="Invalid OTP")
     
     # Mark user as verified
@@ -254,13 +182,8 @@ async def resend_otp(request: Request, data: ResendOTP, db: Session = Depends(ge
     if user.is_verified:
         raise HTTPException(status_code=400, detail="Email already verified")
     
-    # Generate new OTP
-    otp_secret = otp_service.generate_secret()
-    otp_code = otp_service.generate_otp(otp_secret)
-    
-    # Update user's OTP secret and timestamp
-    user.otp_secret = otp_secret
-    user.otp_created_at = datetime.utcnow()
+    # Generate new OTP (replaces the previous one)
+    otp_code = otp_challenge_store.issue(db, user.id, OTP_PURPOSE_REGISTRATION, target=user.email)
     db.commit()
     
     # Print OTP to console IMMEDIATELY (before attempting email)
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.core.database import get_db
 from app.core.security import get_current_user, verify_password
+from app.core.blind_index import card_number_index
 from app.core.encryption import encryption_service
+from app.core.etag import conditional_get
 from app.core.rate_limit import limiter, GENERAL_LIMIT, WALLET_OPERATION_LIMIT
+from app.core.responses import ORJSONResponse
 from app.models import User, BankCard, Wallet, Transaction
 from app.schemas import (
     BankCardCreate,
@@ -13,18 +17,40 @@ from app.schemas import (
     BankCardResponse,
     BankCardVerifyRequest,
 )
-from app.services.otp import otp_service
+from app.services.otp_challenges import (
+    OTP_EXPIRED,
+    OTP_LOCKED,
+    OTP_MISSING,
+    OTP_OK,
+    OTP_PURPOSE_BANK_CARD,
+    otp_challenge_store,
+)
+from app.services.card_display import (
+    UNKNOWN_EXPIRY,
+    card_display_fields,
+    mask_card_number,
+)
 from app.services.email_service import send_otp_email_async
-from datetime import datetime
 
 router = APIRouter()
 
+CARD_OTP_EXPIRY_MINUTES = 5
 
-def mask_card_number(card_number: str) -> str:
-    """Mask card number, showing only last 4 digits."""
-    if len(card_number) <= 4:
-        return "****"
-    return "**** " * 3 + card_number[-4:]
+
+def card_response(card: BankCard) -> BankCardResponse:
+    """Response from the stored display fields; never decrypts."""
+    return BankCardResponse(
+        id=card.id,
+        user_id=card.user_id,
+        card_holder_name=card.card_holder_name,
+        bank_name=card.bank_name,
+        card_type=card.card_type,
+        card_number_masked=mask_card_number(card.last4),
+        expiry_date_masked=card.expiry_masked or UNKNOWN_EXPIRY,
+        brand=card.brand,
+        is_verified=card.is_verified,
+        created_at=card.created_at
+    )
 
 @router.post("", response_model=BankCardResponse, status_code=status.HTTP_201_CREATED)
 @limiter.limit(GENERAL_LIMIT)
@@ -38,12 +64,22 @@ async def create_bank_card(
     Add a new bank card.
     
     - Encrypts sensitive card information (card number, expiry, CVV)
+    - Stores the last 4 digits, brand and expiry for display
+    - Rejects a card number the user has already added (blind-index lookup)
     - Creates card record (unverified initially)
     - Sends OTP to user's email for verification
     """
     # Clean card number (remove spaces/dashes)
     import re
     card_number = re.sub(r'[\s-]', '', card.card_number)
+    card_hash = card_number_index.hash(card_number)
+    
+    # One indexed lookup on (user_id, card_hash); nothing is decrypted
+    if db.query(BankCard.id).filter(BankCard.user_id == current_user.id, BankCard.card_hash == card_hash).first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Card is already linked to your account"
+        )
     
     # Encrypt sensitive data
     card_number_encrypted = encryption_service.encrypt(card_number)
@@ -54,26 +90,33 @@ async def create_bank_card(
     db_card = BankCard(
         user_id=current_user.id,
         card_number_encrypted=card_number_encrypted,
+        card_hash=card_hash,
         card_holder_name=card.card_holder_name,
         expiry_date_encrypted=expiry_date_encrypted,
         cvv_encrypted=cvv_encrypted,
         bank_name=card.bank_name,
         card_type=card.card_type,
-        is_verified=False
+        is_verified=False,
+        **card_display_fields(card_number, card.expiry_date)
     )
     
     db.add(db_card)
-    db.commit()
-    db.refresh(db_card)
-    
-    # Generate and send OTP for verification
-    otp_secret = otp_service.generate_secret()
-    otp_code = otp_service.generate_otp(otp_secret)
+    try:
+        db.flush()
+    except IntegrityError:
+        # Added by a concurrent request since the check above
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Card is already linked to your account"
+        )
     
-    # Store OTP secret in user record for verification
-    current_user.otp_secret = otp_secret
-    current_user.otp_created_at = datetime.utcnow()
+    # Generate and send OTP for verification of this card
+    otp_code = otp_challenge_store.issue(
+        db, current_user.id, OTP_PURPOSE_BANK_CARD, target=db_card.id, ttl_minutes=CARD_OTP_EXPIRY_MINUTES
+    )
     db.commit()
+    db.refresh(db_card)
     
     # Print OTP to console IMMEDIATELY (before attempting email)
     # This ensures user can always see OTP even if email is slow/fails
@@ -81,8 +124,8 @@ async def create_bank_card(
     print(f"OTP for bank card verification:")
     print(f"  Email: {current_user.email}")
     print(f"  OTP Code: {otp_code}")
-    print(f"  Card: {card.bank_name} - {mask_card_number(card_number)}")
-    print(f"  Valid for: 5 minutes")
+    print(f"  Card: {card.bank_name} - {mask_card_number(db_card.last4)}")
+    print(f"  Valid for: {CARD_OTP_EXPIRY_MINUTES} minutes")
     print(f"{'='*60}\n")
     
     # Send OTP via email in background (truly fire-and-forget, non-blocking)
@@ -93,54 +136,54 @@ async def create_bank_card(
     )
     
     # Return response with masked card number
-    return BankCardResponse(
-        id=db_card.id,
-        user_id=db_card.user_id,
-        card_holder_name=db_card.card_holder_name,
-        bank_name=db_card.bank_name,
-        card_type=db_card.card_type,
-        card_number_masked=mask_card_number(card_number),
-        expiry_date_masked=card.expiry_date,
-        is_verified=db_card.is_verified,
-        created_at=db_card.created_at
-    )
+    return card_response(db_card)
 
 
 @router.get("", response_model=List[BankCardResponse])
 @limiter.limit(GENERAL_LIMIT)
 async def get_bank_cards(
     request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get all bank cards for current user."""
-    cards = db.query(BankCard).filter(
+    rows = db.query(
+        BankCard.id,
+        BankCard.user_id,
+        BankCard.card_holder_name,
+        BankCard.bank_name,
+        BankCard.card_type,
+        BankCard.last4,
+        BankCard.brand,
+        BankCard.expiry_masked,
+        BankCard.is_verified,
+        BankCard.created_at,
+    ).filter(
         BankCard.user_id == current_user.id
     ).order_by(BankCard.created_at.desc()).all()
+    # A 304 costs one query and a hash
+    not_modified = conditional_get(request, response, rows)
+    if not_modified:
+        return not_modified
     
     result = []
-    for card in cards:
-        # Decrypt to get last 4 digits
-        try:
-            card_number = encryption_service.decrypt(card.card_number_encrypted)
-            expiry_date = encryption_service.decrypt(card.expiry_date_encrypted)
-        except:
-            card_number = "****"
-            expiry_date = "**/**"
-        
-        result.append(BankCardResponse(
-            id=card.id,
-            user_id=card.user_id,
-            card_holder_name=card.card_holder_name,
-            bank_name=card.bank_name,
-            card_type=card.card_type,
-            card_number_masked=mask_card_number(card_number),
-            expiry_date_masked=expiry_date,
-            is_verified=card.is_verified,
-            created_at=card.created_at
-        ))
-    
-    return result
+    for (card_id, user_id, card_holder_name, bank_name, card_type,
+         last4, brand, expiry_masked, is_verified, created_at) in rows:
+        result.append({
+            "card_holder_name": card_holder_name,
+            "bank_name": bank_name,
+            "card_type": card_type,
+            "id": card_id,
+            "user_id": user_id,
+            "card_number_masked": mask_card_number(last4),
+            "expiry_date_masked": expiry_masked or UNKNOWN_EXPIRY,
+            "brand": brand,
+            "is_verified": is_verified,
+            "created_at": created_at,
+        })
+    
+    return ORJSONResponse(result, headers=response.headers)
 
 
 @router.get("/{card_id}", response_model=BankCardResponse)
@@ -163,25 +206,7 @@ async def get_bank_card(
             detail="Bank card not found"
         )
     
-    # Decrypt to get last 4 digits
-    try:
-        card_number = encryption_service.decrypt(card.card_number_encrypted)
-        expiry_date = encryption_service.decrypt(card.expiry_date_encrypted)
-    except:
-        card_number = "****"
-        expiry_date = "**/**"
-    
-    return BankCardResponse(
-        id=card.id,
-        user_id=card.user_id,
-        card_holder_name=card.card_holder_name,
-        bank_name=card.bank_name,
-        card_type=card.card_type,
-        card_number_masked=mask_card_number(card_number),
-        expiry_date_masked=expiry_date,
-        is_verified=card.is_verified,
-        created_at=card.created_at
-    )
+    return card_response(card)
 
 
 @router.put("/{card_id}", response_model=BankCardResponse)
@@ -214,25 +239,7 @@ async def update_bank_card(
     db.commit()
     db.refresh(card)
     
-    # Decrypt to get last 4 digits
-    try:
-        card_number = encryption_service.decrypt(card.card_number_encrypted)
-        expiry_date = encryption_service.decrypt(card.expiry_date_encrypted)
-    except:
-        card_number = "****"
-        expiry_date = "**/**"
-    
-    return BankCardResponse(
-        id=card.id,
-        user_id=card.user_id,
-        card_holder_name=card.card_holder_name,
-        bank_name=card.bank_name,
-        card_type=card.card_type,
-        card_number_masked=mask_card_number(card_number),
-        expiry_date_masked=expiry_date,
-        is_verified=card.is_verified,
-        created_at=card.created_at
-    )
+    return card_response(card)
 
 
 @router.delete("/{card_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -293,63 +300,37 @@ async def verify_bank_card(
             detail="Card is already verified"
         )
     
-    # Verify OTP code
-    # OTP secret is stored in user.otp_secret when card was created
-    if not current_user.otp_secret:
+    # Verify OTP (issued for this card when it was added or on resend)
+    result = otp_challenge_store.verify(
+        db, current_user.id, OTP_PURPOSE_BANK_CARD, verify_request.otp_code, target=card.id
+    )
+    if result == OTP_MISSING:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="OTP không hợp lệ hoặc đã hết hạn. Vui lòng thêm lại thẻ."
         )
-    
-    # Verify OTP
-    is_valid = otp_service.verify_otp(
-        secret=current_user.otp_secret,
-        otp=verify_request.otp_code
-    )
-    
-    if not is_valid:
+    if result == OTP_EXPIRED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Mã OTP đã hết hạn. Vui lòng thêm lại thẻ để nhận mã mới."
+        )
+    if result == OTP_LOCKED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Nhập sai OTP quá nhiều lần. Vui lòng yêu cầu mã mới."
+        )
+    if result != OTP_OK:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Mã OTP không đúng. Vui lòng kiểm tra lại."
         )
     
-    # Check if OTP is expired (5 minutes)
-    if current_user.otp_created_at:
-        from datetime import timedelta
-        if datetime.utcnow() - current_user.otp_created_at > timedelta(minutes=5):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Mã OTP đã hết hạn. Vui lòng thêm lại thẻ để nhận mã mới."
-            )
-    
-    # Mark card as verified
+    # Mark card as verified (the challenge is consumed in the same commit)
     card.is_verified = True
-    
-    # Clear OTP secret after successful verification
-    current_user.otp_secret = None
-    current_user.otp_created_at = None
     db.commit()
     db.refresh(card)
     
-    # Decrypt to get last 4 digits
-    try:
-        card_number = encryption_service.decrypt(card.card_number_encrypted)
-        expiry_date = encryption_service.decrypt(card.expiry_date_encrypted)
-    except:
-        card_number = "****"
-        expiry_date = "**/**"
-    
-    return BankCardResponse(
-        id=card.id,
-        user_id=card.user_id,
-        card_holder_name=card.card_holder_name,
-        bank_name=card.bank_name,
-        card_type=card.card_type,
-        card_number_masked=mask_card_number(card_number),
-        expiry_date_masked=expiry_date,
-        is_verified=card.is_verified,
-        created_at=card.created_at
-    )
+    return card_response(card)
 
 
 @router.post("/{card_id}/resend-otp")
@@ -383,29 +364,20 @@ async def resend_card_verification_otp(
             detail="Thẻ đã được xác thực rồi"
         )
     
-    # Generate new OTP
-    otp_secret = otp_service.generate_secret()
-    otp_code = otp_service.generate_otp(otp_secret)
-    
-    # Store OTP secret in user record
-    current_user.otp_secret = otp_secret
-    current_user.otp_created_at = datetime.utcnow()
+    # Generate new OTP (replaces the previous one for this card)
+    otp_code = otp_challenge_store.issue(
+        db, current_user.id, OTP_PURPOSE_BANK_CARD, target=card.id, ttl_minutes=CARD_OTP_EXPIRY_MINUTES
+    )
     db.commit()
     
-    # Decrypt to get card number for display
-    try:
-        card_number = encryption_service.decrypt(card.card_number_encrypted)
-    except:
-        card_number = "****"
-    
     # Print OTP to console IMMEDIATELY (before attempting email)
     # This ensures user can always see OTP even if email is slow/fails
     print(f"\n{'='*60}")
     print(f"OTP for bank card verification (RESEND):")
     print(f"  Email: {current_user.email}")
     print(f"  OTP Code: {otp_code}")
-    print(f"  Card: {card.bank_name} - {mask_card_number(card_number)}")
-    print(f"  Valid for: 5 minutes")
+    print(f"  Card: {card.bank_name} - {mask_card_number(card.last4)}")
+    print(f"  Valid for: {CARD_OTP_EXPIRY_MINUTES} minutes")
     print(f"{'='*60}\n")
     
     # Send OTP via email in background (truly fire-and-forget, non-blocking)
@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime, timedelta
+from typing import List, Optional
+from datetime import datetime, timezone
 import uuid
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.etag import conditional_get
 from app.core.security import get_current_user, verify_password
 from app.core.rate_limit import limiter, GENERAL_LIMIT, WALLET_OPERATION_LIMIT
-from app.models import User, BillProvider, SavedBill, BillTransaction, Wallet, Transaction
+from app.core.responses import ORJSONResponse
+from app.models import User, SavedBill, BillTransaction, Wallet, Transaction
 from app.schemas import (
     BillProviderResponse,
     SavedBillCreate,
@@ -15,12 +18,31 @@ from app.schemas import (
     SavedBillResponse,
     BillCheckRequest,
     BillCheckResponse,
+    BillCheckBatchItem,
+    BillCheckBatchRequest,
+    BillCheckBatchResult,
+    BillCheckBatchResponse,
     BillInfo,
     BillPayRequest,
     BillPayResponse,
+    BillPayBatchItem,
+    BillPayBatchRequest,
+    BillPayBatchResult,
+    BillPayBatchResponse,
     BillHistoryResponse,
 )
 from app.api.v1.endpoints.wallets import get_user_wallet
+from app.services.bill_gateway import (
+    STATUS_ERROR,
+    STATUS_NOT_FOUND,
+    STATUS_OK,
+    STATUS_TIMEOUT,
+    BillCheckDispatcher,
+    BillCheckOutcome,
+    get_bill_check_dispatcher,
+)
+from app.services.bill_provider_registry import bill_provider_registry
+from app.services.event_bus import BillPaid, event_bus
 
 router = APIRouter()
 
@@ -29,61 +51,152 @@ router = APIRouter()
 @limiter.limit(GENERAL_LIMIT)
 async def get_bill_providers(
     request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get list of active bill providers."""
-    providers = db.query(BillProvider).filter(BillProvider.is_active == True).all()
+    providers = bill_provider_registry.active(db)
+    # Same list for every user, so shared caches may keep it for a while
+    not_modified = conditional_get(
+        request, response, providers,
+        cache_control=f"public, max-age={settings.BILL_PROVIDERS_MAX_AGE_SECONDS}",
+    )
+    if not_modified:
+        return not_modified
     return providers
 
 
+def _bill_info(customer_code: str, outcome: BillCheckOutcome) -> Optional[BillInfo]:
+    lookup = outcome.lookup
+    if outcome.status != STATUS_OK or not lookup.has_bill:
+        return None
+    return BillInfo(
+        customer_code=customer_code,
+        customer_name=lookup.customer_name,
+        amount=lookup.amount,
+        bill_period=lookup.bill_period,
+        due_date=lookup.due_date,
+        description=lookup.description,
+    )
+
+
+def _check_message(outcome: BillCheckOutcome) -> str:
+    if outcome.status == STATUS_TIMEOUT:
+        return "Nhà cung cấp phản hồi chậm, vui lòng thử lại sau"
+    if outcome.status == STATUS_ERROR:
+        return "Không thể kiểm tra hóa đơn lúc này"
+    if outcome.lookup.has_bill:
+        return "Tìm thấy hóa đơn chưa thanh toán"
+    return "Không tìm thấy hóa đơn chưa thanh toán"
+
+
 @router.post("/check", response_model=BillCheckResponse)
 @limiter.limit(GENERAL_LIMIT)
 async def check_bill(
     request: Request,
     check_request: BillCheckRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    dispatcher: BillCheckDispatcher = Depends(get_bill_check_dispatcher),
 ):
     """
     Check if there's an unpaid bill for the given customer code.
     
-    In a real system, this would call the provider's API to check for bills.
-    For demo purposes, we simulate checking bills.
+    The provider is asked through the bill gateway (simulated unless
+    BILL_GATEWAY_URL is set).
     """
-    provider = db.query(BillProvider).filter(BillProvider.id == check_request.provider_id).first()
+    provider = bill_provider_registry.get(db, check_request.provider_id)
     if not provider:
         raise HTTPException(status_code=404, detail="Bill provider not found")
     
-    # Simulate bill checking - in real system, call provider API
-    # For demo: randomly return a bill 70% of the time
-    import random
-    has_bill = random.random() < 0.7
+    outcome = await dispatcher.check(provider, check_request.customer_code)
+    if outcome.status == STATUS_TIMEOUT:
+        raise HTTPException(status_code=504, detail=_check_message(outcome))
+    if outcome.status == STATUS_ERROR:
+        raise HTTPException(status_code=502, detail=_check_message(outcome))
     
-    if has_bill:
-        # Generate a random bill amount between 50k and 500k
-        amount = random.randint(50000, 500000)
-        bill_period = datetime.now().strftime("%m/%Y")
-        
-        bill_info = BillInfo(
-            customer_code=check_request.customer_code,
-            customer_name=f"Khách hàng {check_request.customer_code[-4:]}",
-            amount=amount,
-            bill_period=bill_period,
-            due_date=datetime.now() + timedelta(days=15),
-            description=f"Hóa đơn {provider.name} tháng {bill_period}"
-        )
-        
-        return BillCheckResponse(
-            has_bill=True,
-            bill_info=bill_info,
-            message=f"Tìm thấy hóa đơn chưa thanh toán"
+    bill_info = _bill_info(check_request.customer_code, outcome)
+    return BillCheckResponse(
+        has_bill=bill_info is not None,
+        bill_info=bill_info,
+        message=_check_message(outcome)
+    )
+
+
+@router.post("/check-batch", response_model=BillCheckBatchResponse)
+@limiter.limit(GENERAL_LIMIT)
+async def check_bills_batch(
+    request: Request,
+    batch_request: BillCheckBatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    dispatcher: BillCheckDispatcher = Depends(get_bill_check_dispatcher),
+):
+    """
+    Check many bills at once (default: all of the user's saved bills).
+    
+    - Items are saved bill ids or provider_id/customer_code pairs
+    - Providers are queried concurrently, with a per-provider concurrency
+      limit and a timeout per call
+    - Providers that have not answered by BILL_CHECK_BATCH_TIMEOUT_SECONDS are
+      reported with status TIMEOUT and `complete` is false
+    """
+    items = batch_request.items
+    if len(items) > settings.BILL_CHECK_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tối đa {settings.BILL_CHECK_BATCH_MAX_ITEMS} hóa đơn mỗi lần kiểm tra"
         )
+    
+    # Resolve saved bills in one query
+    saved_query = db.query(SavedBill.id, SavedBill.provider_id, SavedBill.customer_code).filter(
+        SavedBill.user_id == current_user.id
+    )
+    if items:
+        saved_ids = {item.saved_bill_id for item in items if item.saved_bill_id}
+        saved = {row.id: row for row in saved_query.filter(SavedBill.id.in_(saved_ids))} if saved_ids else {}
     else:
-        return BillCheckResponse(
-            has_bill=False,
-            message="Không tìm thấy hóa đơn chưa thanh toán"
+        rows = saved_query.order_by(SavedBill.created_at).limit(settings.BILL_CHECK_BATCH_MAX_ITEMS).all()
+        saved = {row.id: row for row in rows}
+        items = [BillCheckBatchItem(saved_bill_id=row.id) for row in rows]
+    
+    results: List[BillCheckBatchResult] = []
+    checks = []
+    for index, item in enumerate(items):
+        provider_id, customer_code = item.provider_id, item.customer_code
+        if item.saved_bill_id:
+            row = saved.get(item.saved_bill_id)
+            if row is None:
+                results.append(BillCheckBatchResult(
+                    saved_bill_id=item.saved_bill_id, status=STATUS_NOT_FOUND,
+                    message="Hóa đơn đã lưu không tồn tại",
+                ))
+                continue
+            provider_id, customer_code = row.provider_id, row.customer_code
+        
+        result = BillCheckBatchResult(
+            saved_bill_id=item.saved_bill_id, provider_id=provider_id,
+            customer_code=customer_code, status=STATUS_OK,
         )
+        results.append(result)
+        provider = bill_provider_registry.get(db, provider_id)
+        if provider is None or not provider.is_active:
+            result.status = STATUS_NOT_FOUND
+            result.message = "Nhà cung cấp không tồn tại"
+            continue
+        checks.append((index, provider, customer_code))
+    
+    outcomes, complete = await dispatcher.check_many(checks)
+    for index, _, customer_code in checks:
+        outcome = outcomes[index]
+        result = results[index]
+        result.status = outcome.status
+        result.bill_info = _bill_info(customer_code, outcome)
+        result.has_bill = result.bill_info is not None
+        result.message = _check_message(outcome)
+    
+    return BillCheckBatchResponse(results=results, complete=complete)
 
 
 @router.post("/pay", response_model=BillPayResponse)
@@ -108,7 +221,7 @@ async def pay_bill(
         raise HTTPException(status_code=400, detail="Mã PIN giao dịch không đúng")
     
     # Check provider exists
-    provider = db.query(BillProvider).filter(BillProvider.id == pay_request.provider_id).first()
+    provider = bill_provider_registry.get(db, pay_request.provider_id)
     if not provider:
         raise HTTPException(status_code=404, detail="Nhà cung cấp không tồn tại")
     
@@ -169,6 +282,17 @@ async def pay_bill(
         elif pay_request.alias:
             existing.alias = pay_request.alias
     
+    db.flush()
+    event_bus.publish_after_commit(db, BillPaid(
+        transaction_id=transaction.id,
+        bill_transaction_id=bill_transaction.id,
+        user_id=current_user.id,
+        provider_id=pay_request.provider_id,
+        customer_code=pay_request.customer_code,
+        amount=pay_request.amount,
+        note=note,
+        balance_after=wallet.balance,
+    ))
     db.commit()
     db.refresh(bill_transaction)
     db.refresh(transaction)
@@ -182,6 +306,189 @@ async def pay_bill(
     )
 
 
+PAY_STATUS_PAID = "PAID"
+PAY_STATUS_PROVIDER_NOT_FOUND = "PROVIDER_NOT_FOUND"
+PAY_STATUS_DUPLICATE = "DUPLICATE"
+PAY_STATUS_INSUFFICIENT_FUNDS = "INSUFFICIENT_FUNDS"
+PAY_STATUS_SKIPPED = "SKIPPED"
+
+
+@router.post("/pay-batch", response_model=BillPayBatchResponse)
+@limiter.limit(WALLET_OPERATION_LIMIT)
+async def pay_bills_batch(
+    request: Request,
+    batch_request: BillPayBatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Pay several bills in one transaction.
+    
+    - Verifies the transaction PIN once
+    - Debits the wallet once for the total, guarded by `balance >= total`
+    - Bulk inserts one Transaction and one BillTransaction per paid bill
+    - mode=all_or_nothing (default): if any bill is rejected nothing is paid
+      and the per-bill results come back in a 400 response
+    - mode=best_effort: bills are paid in request order while the balance
+      lasts; rejected bills are reported and the rest are paid
+    """
+    items = batch_request.items
+    if len(items) > settings.BILL_PAY_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tối đa {settings.BILL_PAY_BATCH_MAX_ITEMS} hóa đơn mỗi lần thanh toán"
+        )
+    
+    if not verify_password(batch_request.transaction_pin, current_user.transaction_pin_hash):
+        raise HTTPException(status_code=400, detail="Mã PIN giao dịch không đúng")
+    
+    all_or_nothing = batch_request.mode == "all_or_nothing"
+    wallet = get_user_wallet(current_user, db)
+    available = wallet.balance or 0
+    
+    results: List[BillPayBatchResult] = []
+    accepted = []  # (result, provider, item)
+    seen = set()
+    total = 0
+    for item in items:
+        result = BillPayBatchResult(
+            provider_id=item.provider_id, customer_code=item.customer_code,
+            amount=item.amount, status=PAY_STATUS_PAID,
+        )
+        results.append(result)
+        provider = bill_provider_registry.get(db, item.provider_id)
+        key = (item.provider_id, item.customer_code)
+        if provider is None or not provider.is_active:
+            result.status = PAY_STATUS_PROVIDER_NOT_FOUND
+            result.message = "Nhà cung cấp không tồn tại"
+        elif key in seen:
+            result.status = PAY_STATUS_DUPLICATE
+            result.message = "Hóa đơn bị trùng trong yêu cầu"
+        elif total + item.amount > available and not all_or_nothing:
+            result.status = PAY_STATUS_INSUFFICIENT_FUNDS
+            result.message = "Số dư không đủ để thanh toán hóa đơn này"
+        else:
+            seen.add(key)
+            total += item.amount
+            accepted.append((result, provider, item))
+    
+    rejected = len(accepted) < len(items)
+    if all_or_nothing and total > available:
+        for result, _, _ in accepted:
+            result.status = PAY_STATUS_INSUFFICIENT_FUNDS
+            result.message = "Số dư không đủ để thanh toán tất cả hóa đơn"
+        rejected = True
+    if all_or_nothing and rejected:
+        for result, _, _ in accepted:
+            if result.status == PAY_STATUS_PAID:
+                result.status = PAY_STATUS_SKIPPED
+                result.message = "Không thanh toán vì có hóa đơn khác bị từ chối"
+        raise HTTPException(status_code=400, detail={
+            "message": (
+                f"Số dư không đủ để thanh toán. Số dư hiện tại: {available:,}₫, "
+                f"Tổng số tiền cần thanh toán: {sum(item.amount for item in items):,}₫."
+                if total > available else "Không thể thanh toán tất cả hóa đơn"
+            ),
+            "results": [result.model_dump() for result in results],
+        })
+    
+    if accepted:
+        # One guarded debit for the whole batch
+        wallets = Wallet.__table__
+        debited = db.execute(
+            wallets.update()
+            .where(wallets.c.id == wallet.id, wallets.c.balance >= total)
+            .values(balance=wallets.c.balance - total)
+        ).rowcount
+        if debited != 1:
+            db.rollback()
+            raise HTTPException(status_code=409, detail="Số dư ví đã thay đổi, vui lòng thử lại")
+        
+        from app.core.encryption import encryption_service
+        now = datetime.now(timezone.utc)
+        bill_period = now.strftime("%m/%Y")
+        transactions, bill_transactions, notes = [], [], {}
+        for result, provider, item in accepted:
+            result.transaction_id = str(uuid.uuid4())
+            result.bill_transaction_id = str(uuid.uuid4())
+            result.bill_period = bill_period
+            result.paid_at = now
+            notes[result.transaction_id] = f"Thanh toán hóa đơn {provider.name} - Mã KH: {item.customer_code}"
+            transactions.append({
+                "id": result.transaction_id,
+                "sender_id": current_user.id,
+                "receiver_id": None,
+                "amount": item.amount,
+                "timestamp": now,
+                "encrypted_note": encryption_service.encrypt(notes[result.transaction_id]),
+            })
+            bill_transactions.append({
+                "id": result.bill_transaction_id,
+                "user_id": current_user.id,
+                "provider_id": item.provider_id,
+                "customer_code": item.customer_code,
+                "amount": item.amount,
+                "bill_period": bill_period,
+                "transaction_id": result.transaction_id,
+                "created_at": now,
+            })
+        db.execute(Transaction.__table__.insert(), transactions)
+        db.execute(BillTransaction.__table__.insert(), bill_transactions)
+        _save_bills(db, current_user, [item for _, _, item in accepted if item.save_bill])
+        # One event per bill so thresholds and budgets see each payment
+        balance_after = available
+        for result, _, item in accepted:
+            balance_after -= item.amount
+            event_bus.publish_after_commit(db, BillPaid(
+                transaction_id=result.transaction_id,
+                bill_transaction_id=result.bill_transaction_id,
+                user_id=current_user.id,
+                provider_id=item.provider_id,
+                customer_code=item.customer_code,
+                amount=item.amount,
+                note=notes[result.transaction_id],
+                balance_after=balance_after,
+                occurred_at=now,
+            ))
+        db.commit()
+    
+    balance = db.query(Wallet.balance).filter(Wallet.id == wallet.id).scalar() or 0
+    return BillPayBatchResponse(
+        results=results,
+        paid_count=len(accepted),
+        total_paid=total,
+        balance=balance,
+    )
+
+
+def _save_bills(db: Session, user: User, items: List[BillPayBatchItem]) -> None:
+    """Save paid bills for next time (one lookup, one bulk insert)."""
+    if not items:
+        return
+    existing = {
+        (row.provider_id, row.customer_code): row
+        for row in db.query(SavedBill).filter(
+            SavedBill.user_id == user.id,
+            SavedBill.customer_code.in_({item.customer_code for item in items}),
+        )
+    }
+    new_rows = []
+    for item in items:
+        saved = existing.get((item.provider_id, item.customer_code))
+        if saved is None:
+            new_rows.append({
+                "id": str(uuid.uuid4()),
+                "user_id": user.id,
+                "provider_id": item.provider_id,
+                "customer_code": item.customer_code,
+                "alias": item.alias,
+            })
+        elif item.alias:
+            saved.alias = item.alias
+    if new_rows:
+        db.execute(SavedBill.__table__.insert(), new_rows)
+
+
 @router.get("/saved", response_model=List[SavedBillResponse])
 @limiter.limit(GENERAL_LIMIT)
 async def get_saved_bills(
@@ -190,23 +497,33 @@ async def get_saved_bills(
     db: Session = Depends(get_db)
 ):
     """Get user's saved bills."""
-    saved_bills = db.query(SavedBill).filter(SavedBill.user_id == current_user.id).all()
-    
-    result = []
-    for saved_bill in saved_bills:
-        result.append(SavedBillResponse(
-            id=saved_bill.id,
-            user_id=saved_bill.user_id,
-            provider_id=saved_bill.provider_id,
-            provider_name=saved_bill.provider.name,
-            customer_code=saved_bill.customer_code,
-            customer_name=saved_bill.customer_name,
-            alias=saved_bill.alias,
-            created_at=saved_bill.created_at,
-            updated_at=saved_bill.updated_at
-        ))
-    
-    return result
+    rows = db.query(
+        SavedBill.id,
+        SavedBill.user_id,
+        SavedBill.provider_id,
+        SavedBill.customer_code,
+        SavedBill.customer_name,
+        SavedBill.alias,
+        SavedBill.created_at,
+        SavedBill.updated_at,
+    ).filter(
+        SavedBill.user_id == current_user.id
+    ).all()
+    
+    return ORJSONResponse([
+        {
+            "id": saved_id,
+            "user_id": user_id,
+            "provider_id": provider_id,
+            "provider_name": bill_provider_registry.name(db, provider_id),
+            "customer_code": customer_code,
+            "customer_name": customer_name,
+            "alias": alias,
+            "created_at": created_at,
+            "updated_at": updated_at,
+        }
+        for saved_id, user_id, provider_id, customer_code, customer_name, alias, created_at, updated_at in rows
+    ])
 
 
 @router.post("/saved", response_model=SavedBillResponse, status_code=status.HTTP_201_CREATED)
@@ -228,7 +545,7 @@ async def create_saved_bill(
     if existing:
         raise HTTPException(status_code=400, detail="Hóa đơn đã được lưu")
     
-    provider = db.query(BillProvider).filter(BillProvider.id == saved_bill.provider_id).first()
+    provider = bill_provider_registry.get(db, saved_bill.provider_id)
     if not provider:
         raise HTTPException(status_code=404, detail="Nhà cung cấp không tồn tại")
     
@@ -286,7 +603,7 @@ async def update_saved_bill(
         id=saved_bill.id,
         user_id=saved_bill.user_id,
         provider_id=saved_bill.provider_id,
-        provider_name=saved_bill.provider.name,
+        provider_name=bill_provider_registry.name(db, saved_bill.provider_id),
         customer_code=saved_bill.customer_code,
         customer_name=saved_bill.customer_name,
         alias=saved_bill.alias,
@@ -324,22 +641,29 @@ async def get_bill_history(
     db: Session = Depends(get_db)
 ):
     """Get bill payment history."""
-    bill_transactions = db.query(BillTransaction).filter(
+    rows = db.query(
+        BillTransaction.id,
+        BillTransaction.provider_id,
+        BillTransaction.customer_code,
+        BillTransaction.amount,
+        BillTransaction.bill_period,
+        BillTransaction.transaction_id,
+        BillTransaction.created_at,
+    ).filter(
         BillTransaction.user_id == current_user.id
     ).order_by(BillTransaction.created_at.desc()).limit(50).all()
     
-    result = []
-    for bt in bill_transactions:
-        result.append(BillHistoryResponse(
-            id=bt.id,
-            provider_id=bt.provider_id,
-            provider_name=bt.provider.name,
-            customer_code=bt.customer_code,
-            amount=float(bt.amount),
-            bill_period=bt.bill_period,
-            transaction_id=bt.transaction_id,
-            created_at=bt.created_at
-        ))
-    
-    return result
+    return ORJSONResponse([
+        {
+            "id": bt_id,
+            "provider_id": provider_id,
+            "provider_name": bill_provider_registry.name(db, provider_id),
+            "customer_code": customer_code,
+            "amount": amount,
+            "bill_period": bill_period,
+            "transaction_id": transaction_id,
+            "created_at": created_at,
+        }
+        for bt_id, provider_id, customer_code, amount, bill_period, transaction_id, created_at in rows
+    ])
 
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
 from typing import List, Optional
 from datetime import datetime, date
 
 from app.core.database import get_db
+from app.core.etag import conditional_get
 from app.core.security import get_current_user
 from app.core.encryption import encryption_service
 from app.core.rate_limit import limiter, GENERAL_LIMIT
@@ -63,7 +64,7 @@ def _categorize_transaction(note: str) -> str:
     
     return "OTHER"
 
-def _calculate_spending_for_budget(db: Session, user_id: str, budget: Budget) -> float:
+def _calculate_spending_for_budget(db: Session, user_id: str, budget: Budget) -> int:
     """Calculate total spending for a budget category and period."""
     # Determine date range based on period
     if budget.period == "MONTH":
@@ -85,7 +86,7 @@ def _calculate_spending_for_budget(db: Session, user_id: str, budget: Budget) ->
     ).all()
     
     # Calculate spending only for transactions matching the budget category
-    total_spending = 0.0
+    total_spending = 0
     for tx in transactions:
         # Decrypt note to categorize transaction
         try:
@@ -159,6 +160,7 @@ async def create_budget(
 @limiter.limit(GENERAL_LIMIT)
 async def get_budgets(
     request: Request,
+    response: Response,
     year: Optional[int] = None,
     month: Optional[int] = None,
     category: Optional[str] = None,
@@ -180,6 +182,9 @@ async def get_budgets(
         query = query.filter(Budget.category == category)
     
     budgets = query.order_by(Budget.year.desc(), Budget.month.desc(), Budget.category.asc()).all()
+    not_modified = conditional_get(request, response, budgets)
+    if not_modified:
+        return not_modified
     return budgets
 
 
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from sqlalchemy import case, func, or_
 from typing import List
 from datetime import datetime
 
 from app.core.database import get_db
+from app.core.etag import conditional_get
+from app.core.money import sum_money
 from app.core.security import get_current_user
 from app.core.rate_limit import limiter, GENERAL_LIMIT
 from app.models import User, Contact, Transaction
@@ -65,6 +67,7 @@ async def create_contact(
 @limiter.limit(GENERAL_LIMIT)
 async def get_contacts(
     request: Request,
+    response: Response,
     search: str = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -86,6 +89,9 @@ async def get_contacts(
         query = query.filter(search_filter)
     
     contacts = query.order_by(Contact.name.asc()).all()
+    not_modified = conditional_get(request, response, contacts)
+    if not_modified:
+        return not_modified
     return contacts
 
 
@@ -236,30 +242,23 @@ async def get_contact_stats(
             contact_id=contact_id,
             contact_name=contact.name,
             total_transactions=0,
-            total_amount_sent=0.0,
-            total_amount_received=0.0,
+            total_amount_sent=0,
+            total_amount_received=0,
             last_transaction_date=None
         )
     
-    # Get all transactions with this contact
-    transactions = db.query(Transaction).filter(
+    # Totals are summed in the database as integers
+    total_transactions, total_amount_sent, total_amount_received, last_transaction_date = db.query(
+        func.count(Transaction.id),
+        sum_money(case((Transaction.sender_id == current_user.id, Transaction.amount), else_=0)),
+        sum_money(case((Transaction.receiver_id == current_user.id, Transaction.amount), else_=0)),
+        func.max(Transaction.timestamp),
+    ).filter(
         or_(
             (Transaction.sender_id == current_user.id) & (Transaction.receiver_id == receiver_user.id),
             (Transaction.sender_id == receiver_user.id) & (Transaction.receiver_id == current_user.id)
         )
-    ).all()
-    
-    total_transactions = len(transactions)
-    total_amount_sent = sum(
-        t.amount for t in transactions 
-        if t.sender_id == current_user.id
-    )
-    total_amount_received = sum(
-        t.amount for t in transactions 
-        if t.receiver_id == current_user.id
-    )
-    
-    last_transaction = max(transactions, key=lambda t: t.timestamp) if transactions else None
+    ).one()
     
     return ContactStatsResponse(
         contact_id=contact_id,
@@ -267,6 +266,6 @@ async def get_contact_stats(
         total_transactions=total_transactions,
         total_amount_sent=total_amount_sent,
         total_amount_received=total_amount_received,
-        last_transaction_date=last_transaction.timestamp if last_transaction else None
+        last_transaction_date=last_transaction_date
     )
 
@@ -7,6 +7,7 @@ from app.core.database import get_db
 from app.core.security import get_current_user
 from app.core.rate_limit import limiter, GENERAL_LIMIT
 from app.models import User, UserDevice
+from app.services.device_detection import device_fingerprint
 from app.schemas import (
     UserDeviceCreate,
     UserDeviceRename,
@@ -53,20 +54,35 @@ async def create_device(
     ip_address = device.ip_address or request.client.host if request.client else None
     user_agent = device.user_agent or request.headers.get("user-agent")
     
-    # Check if device already exists (by device_token if provided)
+    fingerprint = device_fingerprint(ip_address, user_agent)
+    
+    # Check if device already exists (by device_token if provided, else as seen at login)
     existing_device = None
     if device.device_token:
         existing_device = db.query(UserDevice).filter(
             UserDevice.user_id == current_user.id,
             UserDevice.device_token == device.device_token
         ).first()
+    if not existing_device:
+        existing_device = db.query(UserDevice).filter(
+            UserDevice.user_id == current_user.id,
+            UserDevice.fingerprint == fingerprint
+        ).first()
     
     if existing_device:
         # Update existing device
         existing_device.device_name = device.device_name
         existing_device.device_type = device.device_type
-        existing_device.ip_address = ip_address
-        existing_device.user_agent = user_agent
+        if existing_device.fingerprint != fingerprint:
+            # Moving the token's device onto a fingerprint another device already holds would break uniqueness
+            taken = db.query(UserDevice.id).filter(
+                UserDevice.user_id == current_user.id,
+                UserDevice.fingerprint == fingerprint
+            ).first()
+            if not taken:
+                existing_device.ip_address = ip_address
+                existing_device.user_agent = user_agent
+                existing_device.fingerprint = fingerprint
         existing_device.last_login = datetime.utcnow()
         existing_device.is_active = True
         
@@ -82,6 +98,7 @@ async def create_device(
         device_type=device.device_type,
         ip_address=ip_address,
         user_agent=user_agent,
+        fingerprint=fingerprint,
         last_login=datetime.utcnow()
     )
     
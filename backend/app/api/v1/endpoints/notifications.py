@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.etag import conditional_get
 from app.core.security import get_current_user
 from app.core.rate_limit import limiter, GENERAL_LIMIT
 from app.models import User, Notification, NotificationSettings
@@ -61,7 +62,7 @@ async def get_notifications(
     unread_only: bool = False,
     limit: int = 50,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get notifications for current user.
@@ -84,7 +85,7 @@ async def get_notifications(
 async def get_unread_count(
     request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get count of unread notifications."""
     count = db.query(Notification).filter(
@@ -168,11 +169,15 @@ async def delete_notification(
 @limiter.limit(GENERAL_LIMIT)
 async def get_notification_settings(
     request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get notification settings for current user."""
     settings = _get_or_create_notification_settings(db, current_user.id)
+    not_modified = conditional_get(request, response, settings)
+    if not_modified:
+        return not_modified
     return settings
 
 
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime, date
+import uuid
 
 from app.core.database import get_db
+from app.core.etag import conditional_get
 from app.core.security import get_current_user
 from app.core.rate_limit import limiter, GENERAL_LIMIT
 from app.models import User, SavingsGoal, Wallet, Transaction
@@ -14,6 +16,7 @@ from app.schemas import (
     SavingsGoalDepositRequest,
     SavingsGoalWithdrawRequest,
 )
+from app.services.event_bus import SavingsGoalMoneyMoved, event_bus
 
 router = APIRouter()
 
@@ -37,7 +40,9 @@ async def create_savings_goal(
         target_amount=goal.target_amount,
         deadline=goal.deadline,
         auto_deposit_amount=goal.auto_deposit_amount,
-        current_amount=0.0,
+        # First auto deposit is taken for the current month on the next scheduler run
+        next_auto_deposit_at=datetime.utcnow() if goal.auto_deposit_amount else None,
+        current_amount=0,
         is_completed=False
     )
     
@@ -52,6 +57,7 @@ async def create_savings_goal(
 @limiter.limit(GENERAL_LIMIT)
 async def get_savings_goals(
     request: Request,
+    response: Response,
     include_completed: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -68,6 +74,9 @@ async def get_savings_goals(
         query = query.filter(SavingsGoal.is_completed == False)
     
     goals = query.order_by(SavingsGoal.created_at.desc()).all()
+    not_modified = conditional_get(request, response, goals)
+    if not_modified:
+        return not_modified
     return goals
 
 
@@ -128,6 +137,8 @@ async def update_savings_goal(
         goal.deadline = goal_update.deadline
     if goal_update.auto_deposit_amount is not None:
         goal.auto_deposit_amount = goal_update.auto_deposit_amount
+        if goal.next_auto_deposit_at is None:
+            goal.next_auto_deposit_at = datetime.utcnow()
     if goal_update.is_completed is not None:
         goal.is_completed = goal_update.is_completed
     
@@ -232,12 +243,18 @@ async def deposit_to_savings_goal(
     
     # Create transaction record
     transaction = Transaction(
+        id=str(uuid.uuid4()),
         sender_id=current_user.id,
         receiver_id=None,  # System transaction
         amount=deposit_request.amount,
         encrypted_note=f"Deposit to savings goal: {goal.name}"
     )
     db.add(transaction)
+    event_bus.publish_after_commit(db, SavingsGoalMoneyMoved(
+        transaction_id=transaction.id, user_id=current_user.id, goal_id=goal.id, direction="deposit",
+        amount=deposit_request.amount, note=f"Deposit to savings goal: {goal.name}",
+        balance_after=wallet.balance,
+    ))
     
     db.commit()
     db.refresh(goal)
@@ -299,12 +316,18 @@ async def withdraw_from_savings_goal(
     
     # Create transaction record
     transaction = Transaction(
+        id=str(uuid.uuid4()),
         sender_id=None,  # System transaction
         receiver_id=current_user.id,
         amount=withdraw_request.amount,
         encrypted_note=f"Withdraw from savings goal: {goal.name}"
     )
     db.add(transaction)
+    event_bus.publish_after_commit(db, SavingsGoalMoneyMoved(
+        transaction_id=transaction.id, user_id=current_user.id, goal_id=goal.id, direction="withdraw",
+        amount=withdraw_request.amount, note=f"Withdraw from savings goal: {goal.name}",
+        balance_after=wallet.balance,
+    ))
     
     db.commit()
     db.refresh(goal)
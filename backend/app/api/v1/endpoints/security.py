@@ -4,7 +4,7 @@ from sqlalchemy import desc
 from typing import List, Optional
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.core.security import get_current_user
 from app.core.rate_limit import limiter, GENERAL_LIMIT
 from app.models import User, SecurityHistory, UserDevice
@@ -21,7 +21,7 @@ async def get_security_history(
     offset: int = 0,
     action_type: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get security history for current user.
@@ -1,20 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from typing import List
-from datetime import datetime, timedelta
+from datetime import datetime
 import uuid
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.security import get_current_user, verify_password
 from app.core.encryption import encryption_service
 from app.core.rate_limit import limiter, WALLET_OPERATION_LIMIT, GENERAL_LIMIT
 from app.core.config import settings
+from app.core.etag import conditional_get
+from app.core.responses import ORJSONResponse
 from app.models import User, Wallet, Transaction, BankCard
 from app.schemas import WalletResponse, DepositRequest, WithdrawRequest, TransferRequest, TransferOTPRequest, TransactionResponse, DepositFromCardRequest, WithdrawToCardRequest
-from app.services.otp import otp_service
+from app.services.otp_challenges import (
+    OTP_EXPIRED,
+    OTP_LOCKED,
+    OTP_MISSING,
+    OTP_OK,
+    OTP_PURPOSE_TRANSFER,
+    otp_challenge_store,
+)
+from app.services.card_display import UNKNOWN_LAST4
 from app.services.email_service import email_service, send_email_async
-from app.services.notification_service import create_transaction_notification
+from app.services.event_bus import DepositCompleted, TransferCompleted, WithdrawCompleted, event_bus
 
 router = APIRouter()
 
@@ -31,9 +41,13 @@ def get_user_wallet(user: User, db: Session) -> Wallet:
 
 @router.get("/me", response_model=WalletResponse)
 @limiter.limit(GENERAL_LIMIT)
-async def get_my_wallet(request: Request, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_my_wallet(request: Request, response: Response, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get current user's wallet information."""
-    return get_user_wallet(current_user, db)
+    wallet = get_user_wallet(current_user, db)
+    not_modified = conditional_get(request, response, wallet)
+    if not_modified:
+        return not_modified
+    return wallet
 
 @router.post("/deposit", response_model=WalletResponse)
 @limiter.limit(WALLET_OPERATION_LIMIT)
@@ -87,7 +101,7 @@ async def deposit(
             if not bank_card:
                 raise HTTPException(status_code=404, detail="Thẻ ngân hàng không tồn tại hoặc chưa được xác thực")
             
-            note = f"Nạp tiền từ thẻ {bank_card.bank_name} •••• {bank_card.card_number_encrypted[-4:]}"
+            note = f"Nạp tiền từ thẻ {bank_card.bank_name} •••• {bank_card.last4 or UNKNOWN_LAST4}"
             
         elif deposit_request.source_type == "momo":
             note = "Nạp tiền từ MoMo"
@@ -99,6 +113,7 @@ async def deposit(
         wallet.balance += deposit_request.amount
         
         transaction = Transaction(
+            id=str(uuid.uuid4()),
             sender_id=None,  # System deposit
             receiver_id=current_user.id,
             amount=deposit_request.amount,
@@ -106,23 +121,14 @@ async def deposit(
         )
         
         db.add(transaction)
+        # Notification and alerts are handled by event subscribers after the commit
+        event_bus.publish_after_commit(db, DepositCompleted(
+            transaction_id=transaction.id, user_id=current_user.id, amount=deposit_request.amount,
+            note=note, balance_after=wallet.balance,
+        ))
         db.commit()
         db.refresh(wallet)
         
-        # Create notification for deposit
-        try:
-            create_transaction_notification(
-                db=db,
-                user_id=current_user.id,
-                transaction_type='deposit',
-                amount=deposit_request.amount,
-                note=note
-            )
-        except Exception as e:
-            # Don't fail the deposit if notification fails
-            import logging
-            logging.getLogger(__name__).error(f"Failed to create deposit notification: {e}")
-        
         return wallet
         
     except HTTPException:
@@ -185,7 +191,7 @@ async def withdraw(
             if not bank_card:
                 raise HTTPException(status_code=404, detail="Thẻ ngân hàng không tồn tại hoặc chưa được xác thực")
             
-            note = f"Rút tiền về thẻ {bank_card.bank_name} •••• {bank_card.card_number_encrypted[-4:]}"
+            note = f"Rút tiền về thẻ {bank_card.bank_name} •••• {bank_card.last4 or UNKNOWN_LAST4}"
             
         elif withdraw_request.destination_type == "momo":
             note = "Rút tiền về MoMo"
@@ -197,6 +203,7 @@ async def withdraw(
         wallet.balance -= withdraw_request.amount
         
         transaction = Transaction(
+            id=str(uuid.uuid4()),
             sender_id=current_user.id,
             receiver_id=None,  # System withdraw
             amount=withdraw_request.amount,
@@ -204,23 +211,13 @@ async def withdraw(
         )
         
         db.add(transaction)
+        event_bus.publish_after_commit(db, WithdrawCompleted(
+            transaction_id=transaction.id, user_id=current_user.id, amount=withdraw_request.amount,
+            note=note, balance_after=wallet.balance,
+        ))
         db.commit()
         db.refresh(wallet)
         
-        # Create notification for withdrawal
-        try:
-            create_transaction_notification(
-                db=db,
-                user_id=current_user.id,
-                transaction_type='withdraw',
-                amount=withdraw_request.amount,
-                note=note
-            )
-        except Exception as e:
-            # Don't fail the withdrawal if notification fails
-            import logging
-            logging.getLogger(__name__).error(f"Failed to create withdraw notification: {e}")
-        
         return wallet
         
     except HTTPException:
@@ -255,13 +252,10 @@ async def request_transfer_otp(
     if not verify_password(otp_request.transaction_pin, current_user.transaction_pin_hash):
         raise HTTPException(status_code=400, detail="Invalid transaction PIN")
     
-    # Generate new OTP
-    otp_secret = otp_service.generate_secret()
-    otp_code = otp_service.generate_otp(otp_secret)
-    
-    # Update user's OTP secret and timestamp
-    current_user.otp_secret = otp_secret
-    current_user.otp_created_at = datetime.utcnow()
+    # Generate new OTP, valid only for a transfer to this receiver
+    otp_code = otp_challenge_store.issue(
+        db, current_user.id, OTP_PURPOSE_TRANSFER, target=otp_request.receiver_email
+    )
     db.commit()
     
     # Print OTP to console IMMEDIATELY (before attempting email)
@@ -337,14 +331,17 @@ async def transfer(
                 detail="OTP required for transfers. Please request OTP first."
             )
         
-        if not current_user.otp_created_at or not current_user.otp_secret:
+        otp_result = otp_challenge_store.verify(
+            db, current_user.id, OTP_PURPOSE_TRANSFER, transfer_request.otp_code,
+            target=transfer_request.receiver_email,
+        )
+        if otp_result == OTP_MISSING:
             raise HTTPException(status_code=400, detail="No OTP request found. Please request OTP again.")
-        
-        expiry_time = current_user.otp_created_at + timedelta(minutes=settings.OTP_EXPIRY_MINUTES)
-        if datetime.utcnow() > expiry_time:
+        if otp_result == OTP_EXPIRED:
             raise HTTPException(status_code=400, detail="OTP has expired. Please request a new one.")
-        
-        if not otp_service.verify_otp(current_user.otp_secret, transfer_request.otp_code):
+        if otp_result == OTP_LOCKED:
+            raise HTTPException(status_code=400, detail="Too many incorrect attempts. Please request a new OTP.")
+        if otp_result != OTP_OK:
             raise HTTPException(status_code=400, detail="Invalid OTP")
         
         # Find receiver
@@ -368,6 +365,7 @@ async def transfer(
         encrypted_note = encryption_service.encrypt(note)
         
         transaction = Transaction(
+            id=str(uuid.uuid4()),
             sender_id=current_user.id,
             receiver_id=receiver.id,
             amount=transfer_request.amount,
@@ -375,33 +373,21 @@ async def transfer(
         )
         
         db.add(transaction)
+        # Notifications and alerts are handled by event subscribers after the commit
+        event_bus.publish_after_commit(db, TransferCompleted(
+            transaction_id=transaction.id,
+            sender_id=current_user.id,
+            receiver_id=receiver.id,
+            sender_email=current_user.email,
+            receiver_email=transfer_request.receiver_email,
+            amount=transfer_request.amount,
+            note=note,
+            sender_balance=sender_wallet.balance,
+            receiver_balance=receiver_wallet.balance,
+        ))
         db.commit()
         db.refresh(transaction)
         
-        # Create notifications for both sender and receiver
-        try:
-            # Notification for sender (transfer_out)
-            create_transaction_notification(
-                db=db,
-                user_id=current_user.id,
-                transaction_type='transfer_out',
-                amount=transfer_request.amount,
-                note=f"Chuyển đến {transfer_request.receiver_email}"
-            )
-            
-            # Notification for receiver (transfer_in)
-            create_transaction_notification(
-                db=db,
-                user_id=receiver.id,
-                transaction_type='transfer_in',
-                amount=transfer_request.amount,
-                note=f"Nhận từ {current_user.email}"
-            )
-        except Exception as e:
-            # Don't fail the transfer if notification fails
-            import logging
-            logging.getLogger(__name__).error(f"Failed to create transfer notifications: {e}")
-        
         return TransactionResponse(
             id=transaction.id,
             sender_id=transaction.sender_id,
@@ -421,12 +407,24 @@ async def transfer(
         db.rollback()
         raise HTTPException(status_code=500, detail="An unexpected error occurred")
 
+def _transaction_type(user_id: str, sender_id, receiver_id) -> str:
+    """Direction of a transaction from the point of view of user_id."""
+    if sender_id == user_id and receiver_id:
+        return "transfer_out"
+    if receiver_id == user_id and sender_id:
+        return "transfer_in"
+    if receiver_id == user_id and not sender_id:
+        return "deposit"
+    if sender_id == user_id and not receiver_id:
+        return "withdraw"
+    return "unknown"
+
 @router.get("/transactions", response_model=List[TransactionResponse])
 @limiter.limit(GENERAL_LIMIT)
 async def get_transactions(
     request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get transaction history for current user.
@@ -436,41 +434,37 @@ async def get_transactions(
     - Orders by timestamp (most recent first)
     """
     try:
-        # Get transactions where user is sender or receiver
-        transactions = db.query(Transaction).filter(
+        # Plain column tuples: no ORM identity map, no per-row Pydantic validation
+        rows = db.query(
+            Transaction.id,
+            Transaction.sender_id,
+            Transaction.receiver_id,
+            Transaction.amount,
+            Transaction.timestamp,
+            Transaction.encrypted_note,
+        ).filter(
             (Transaction.sender_id == current_user.id) | (Transaction.receiver_id == current_user.id)
         ).order_by(Transaction.timestamp.desc()).all()
         
         result = []
-        for tx in transactions:
+        for tx_id, sender_id, receiver_id, amount, timestamp, encrypted_note in rows:
             # Safely decrypt note
             try:
-                note = encryption_service.decrypt(tx.encrypted_note)
+                note = encryption_service.decrypt(encrypted_note)
             except Exception as e:
                 note = "Error decrypting note"
             
-            # Determine transaction type
-            tx_type = "unknown"
-            if tx.sender_id == current_user.id and tx.receiver_id:
-                tx_type = "transfer_out"
-            elif tx.receiver_id == current_user.id and tx.sender_id:
-                tx_type = "transfer_in"
-            elif tx.receiver_id == current_user.id and not tx.sender_id:
-                tx_type = "deposit"
-            elif tx.sender_id == current_user.id and not tx.receiver_id:
-                tx_type = "withdraw"
-                
-            result.append(TransactionResponse(
-                id=tx.id,
-                sender_id=tx.sender_id,
-                receiver_id=tx.receiver_id,
-                amount=tx.amount,
-                timestamp=tx.timestamp,
-                note=note,
-                type=tx_type
-            ))
+            result.append({
+                "id": tx_id,
+                "sender_id": sender_id,
+                "receiver_id": receiver_id,
+                "amount": amount,
+                "timestamp": timestamp,
+                "note": note,
+                "type": _transaction_type(current_user.id, sender_id, receiver_id),
+            })
             
-        return result
+        return ORJSONResponse(result)
         
     except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail="Database error occurred")
@@ -0,0 +1,79 @@
+"""
+Blind indexes for encrypted columns.
+
+Encrypted values are randomized, so the database can't compare them: finding
+a card by number would mean decrypting every card the user has. A blind
+index is a keyed HMAC-SHA256 of the normalized plaintext, stored next to the
+ciphertext in an indexed column (bank_cards.card_hash). Equal values give
+equal hashes, so lookups and unique constraints work, while the hash reveals
+nothing without the key.
+
+- each index has a name, and its HMAC key is derived from the root key with
+  HKDF using that name, so equal values in two columns get unrelated hashes
+- the root key is BLIND_INDEX_KEY, or ENCRYPTION_KEY when that is unset. It
+  must not change while the indexes exist, so once ENCRYPTION_OLD_KEYS is
+  set (a key rotation) BLIND_INDEX_KEY is required: without it hashing
+  raises instead of silently producing hashes that match nothing. Set it
+  to the ENCRYPTION_KEY the hashes were made with.
+- values are normalized before hashing (e.g. spaces and dashes removed from
+  card numbers), so formatting doesn't defeat the match
+
+To index another encrypted column, declare a BlindIndex here, add a
+String(64) column with an index (or a unique constraint), and set it
+wherever the ciphertext is written.
+"""
+import hashlib
+import hmac
+import re
+from functools import cached_property
+from typing import Callable, Optional
+
+from app.core.config import settings
+
+BLIND_INDEX_SIZE = 64  # hex characters of HMAC-SHA256
+
+
+def digits_only(value: str) -> str:
+    return re.sub(r"\D", "", value)
+
+
+def blind_index_root_key() -> str:
+    """BLIND_INDEX_KEY, or ENCRYPTION_KEY if no key rotation is configured."""
+    if settings.BLIND_INDEX_KEY:
+        return settings.BLIND_INDEX_KEY
+    if settings.ENCRYPTION_OLD_KEYS.strip():
+        raise ValueError(
+            "BLIND_INDEX_KEY must be set while ENCRYPTION_OLD_KEYS is: set it to the ENCRYPTION_KEY "
+            "the existing blind indexes (bank_cards.card_hash) were created with"
+        )
+    return settings.ENCRYPTION_KEY
+
+
+class BlindIndex:
+    """Keyed hash of one kind of value, for equality lookups on encrypted columns."""
+
+    def __init__(self, name: str, normalize: Optional[Callable[[str], str]] = None, key: Optional[str] = None):
+        self.name = name
+        self.normalize = normalize or (lambda value: value)
+        self._key = key
+
+    @cached_property
+    def hmac_key(self) -> bytes:
+        root = self._key or blind_index_root_key()
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+        return HKDF(algorithm=hashes.SHA256(), length=32, salt=b"ewallet-blind-index",
+                    info=self.name.encode()).derive(root.encode())
+
+    def hash(self, value: Optional[str]) -> Optional[str]:
+        """Hex HMAC of the normalized value; None for empty values."""
+        if not value:
+            return None
+        normalized = self.normalize(value)
+        if not normalized:
+            return None
+        return hmac.new(self.hmac_key, normalized.encode(), hashlib.sha256).hexdigest()
+
+
+card_number_index = BlindIndex("bank_cards.card_number", normalize=digits_only)
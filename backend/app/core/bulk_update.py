@@ -0,0 +1,43 @@
+"""
+Set-based UPDATEs of many rows, each with its own values.
+
+Batch jobs (savings auto-deposits, encryption key rotation) update
+thousands of rows per transaction. keyed_update() sends them as one
+statement where the database allows it instead of one UPDATE per row.
+"""
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import bindparam, column, values
+from sqlalchemy.orm import Session
+
+
+def keyed_update(db: Session, table, key: str, columns: Sequence[Tuple[str, object]], rows: List[Dict], build) -> int:
+    """
+    UPDATE many rows of `table` matched on `key`, each with its own values.
+
+    PostgreSQL gets one UPDATE ... FROM (VALUES ...); other databases get an
+    executemany, or one UPDATE per row where the driver can't report the
+    rows an executemany matched and can't return them either.
+    `build(table, src)` returns (assignments, extra conditions) where
+    src["name"] is the per-row value. Returns the number of rows matched.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        src = values(*[column(name, type_) for name, type_ in columns], name="batch").data(
+            [tuple(row[name] for name, _ in columns) for row in rows]
+        )
+        src_columns = src.c
+        assignments, conditions = build(table, src_columns)
+        stmt = table.update().where(table.c[key] == src_columns[key], *conditions).values(**assignments)
+        return db.execute(stmt).rowcount
+
+    src_columns = {name: bindparam(f"p_{name}", type_=type_) for name, type_ in columns}
+    assignments, conditions = build(table, src_columns)
+    stmt = table.update().where(table.c[key] == src_columns[key], *conditions).values(**assignments)
+    params = [{f"p_{name}": row[name] for name, _ in columns} for row in rows]
+    dialect = db.get_bind().dialect
+    if dialect.supports_sane_multi_rowcount:
+        return db.execute(stmt, params).rowcount
+    if dialect.update_executemany_returning:
+        return len(db.execute(stmt.returning(table.c[key]), params).all())
+    # The driver can't count rows matched by an executemany: run the rows one at a time
+    return sum(db.execute(stmt, row).rowcount for row in params)
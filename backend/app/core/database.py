@@ -1,18 +1,115 @@
-from sqlalchemy import create_engine
+import hashlib
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import create_engine, text, exc
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool, NullPool
+from sqlalchemy.sql.expression import UpdateBase
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-# SQLite requires check_same_thread=False, PostgreSQL doesn't need it
-if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-    )
-else:
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+class PoolStats:
+    """Checkout counters for one connection pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.checkout_seconds_total = 0.0
+        self.checkout_seconds_max = 0.0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def record_checkout(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_seconds_total += seconds
+            if seconds > self.checkout_seconds_max:
+                self.checkout_seconds_max = seconds
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+
+# Pool name ("primary", "replica0", ...) -> stats; survives pool.recreate()
+pool_stats: Dict[str, PoolStats] = {}
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits for a connection."""
+
+    def connect(self):
+        stats = pool_stats.setdefault(self._orig_logging_name or "default", PoolStats())
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            stats.record_timeout()
+            raise
+        stats.record_checkout(time.perf_counter() - started)
+        return connection
+
+
+# name -> engine, for pool gauges
+engines: Dict[str, Engine] = {}
+
+
+def _create_engine(url: str, name: str = "primary") -> Engine:
+    # SQLite requires check_same_thread=False, PostgreSQL doesn't need it
+    if url.startswith("sqlite"):
+        new_engine = create_engine(url, connect_args={"check_same_thread": False})
+    elif settings.DB_PGBOUNCER_MODE:
+        # PgBouncer owns the pool; keeping idle connections here would pin server connections
+        new_engine = create_engine(url, poolclass=NullPool)
+    else:
+        new_engine = create_engine(
+            url,
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            pool_logging_name=name,
+        )
+    engines[name] = new_engine
+    return new_engine
+
+
+def pool_metrics() -> List[Dict]:
+    """Current gauges and checkout counters for every QueuePool-backed engine."""
+    result = []
+    for name, named_engine in engines.items():
+        pool = named_engine.pool
+        if not isinstance(pool, QueuePool):
+            continue
+        stats = pool_stats.get(name, PoolStats())
+        result.append({
+            "pool": name,
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "checkouts": stats.checkouts,
+            "checkout_seconds_total": stats.checkout_seconds_total,
+            "checkout_seconds_max": stats.checkout_seconds_max,
+            "timeouts": stats.timeouts,
+        })
+    return result
+
+
+engine = _create_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -24,3 +121,135 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# --- Read replicas ---------------------------------------------------------
+
+def measure_replica_lag(replica_engine: Engine) -> float:
+    """Return replication lag in seconds (0 for databases without streaming replication)."""
+    if replica_engine.dialect.name != "postgresql":
+        return 0.0
+    with replica_engine.connect() as conn:
+        lag = conn.execute(text(
+            "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+        )).scalar()
+    return float(lag or 0.0)
+
+
+class ReplicaRouter:
+    """
+    Chooses a replica engine for read-only requests.
+
+    - Replicas are used round-robin
+    - A replica whose measured lag exceeds max_lag_seconds is skipped
+    - A client that performed a write within read_your_writes_seconds reads
+      from the primary so it always sees its own changes
+
+    Recent-write tracking is per process; with several workers a client may
+    hit a worker that has not seen its write, and then relies on the lag check.
+    """
+
+    def __init__(
+        self,
+        replicas: List[Engine],
+        max_lag_seconds: float = 5.0,
+        lag_check_interval: float = 10.0,
+        read_your_writes_seconds: float = 10.0,
+        lag_probe=measure_replica_lag,
+    ):
+        self.replicas = list(replicas)
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_interval = lag_check_interval
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self._lag_probe = lag_probe
+        self._cycle = itertools.cycle(range(len(self.replicas)))
+        self._lag: Dict[int, Tuple[float, float]] = {}  # replica index -> (lag, measured_at)
+        self._recent_writes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark_write(self, key: Optional[str]) -> None:
+        """Record that the client identified by key just wrote to the primary."""
+        if not key:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._recent_writes[key] = now
+            if len(self._recent_writes) > 10000:
+                cutoff = now - self.read_your_writes_seconds
+                self._recent_writes = {k: t for k, t in self._recent_writes.items() if t >= cutoff}
+
+    def has_recent_write(self, key: Optional[str]) -> bool:
+        if not key:
+            return False
+        written_at = self._recent_writes.get(key)
+        return written_at is not None and time.monotonic() - written_at < self.read_your_writes_seconds
+
+    def replica_lag(self, index: int) -> float:
+        """Cached lag for a replica; unreachable replicas report infinite lag."""
+        now = time.monotonic()
+        cached = self._lag.get(index)
+        if cached is not None and now - cached[1] < self.lag_check_interval:
+            return cached[0]
+        try:
+            lag = self._lag_probe(self.replicas[index])
+        except Exception as e:
+            logger.warning(f"Replica {index} lag check failed: {e}")
+            lag = float("inf")
+        self._lag[index] = (lag, now)
+        return lag
+
+    def choose_replica(self, key: Optional[str] = None) -> Optional[Engine]:
+        """Return a healthy replica engine, or None to read from the primary."""
+        if not self.replicas or self.has_recent_write(key):
+            return None
+        for _ in range(len(self.replicas)):
+            index = next(self._cycle)
+            if self.replica_lag(index) <= self.max_lag_seconds:
+                return self.replicas[index]
+        return None
+
+
+class RoutingSession(Session):
+    """Session that reads from a replica but always flushes and writes to the primary."""
+
+    def __init__(self, replica: Optional[Engine] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.replica = replica
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.replica is not None and not self._flushing and not isinstance(clause, UpdateBase):
+            return self.replica
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+replica_router = ReplicaRouter(
+    replicas=[
+        _create_engine(url, name=f"replica{index}")
+        for index, url in enumerate(
+            u.strip() for u in (settings.DATABASE_REPLICA_URLS or "").split(",") if u.strip()
+        )
+    ],
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    lag_check_interval=settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+    read_your_writes_seconds=settings.READ_YOUR_WRITES_SECONDS,
+)
+
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+
+
+def read_your_writes_key(request: Request) -> Optional[str]:
+    """Identify the client by a hash of its Authorization header."""
+    authorization = request.headers.get("authorization")
+    if not authorization:
+        return None
+    return hashlib.sha256(authorization.encode()).hexdigest()
+
+
+def get_read_db(request: Request):
+    """Session for read-only endpoints, routed to a replica when one is available."""
+    replica = replica_router.choose_replica(read_your_writes_key(request))
+    db = ReadSessionLocal(replica=replica)
+    try:
+        yield db
+    finally:
+        db.close()
@@ -1,45 +1,273 @@
-from cryptography.fernet import Fernet
+"""
+Field encryption for notes and card data.
+
+New values use an AES-GCM envelope format (version 2):
+
+    0x02 | master key id (1) | data key id (4) | nonce (12) | ciphertext | tag (16)
+
+- the master key is ENCRYPTION_KEY. It never encrypts data itself; data
+  keys are derived from it with HKDF-SHA256, one per calendar month (the
+  data key id is the month, so a month's rows share one key)
+- derived keys are kept in an LRU cache (ENCRYPTION_DATA_KEY_CACHE_SIZE);
+  a cached key costs one AES-GCM call per field, with no HMAC pass and no
+  CBC padding
+- the header is authenticated as associated data
+- the master key id is the first byte of SHA-256 of the master key, so a
+  ciphertext names the key it needs
+
+encrypt_bytes()/decrypt_bytes() work on the raw format (34 bytes of
+overhead) for binary columns. encrypt()/decrypt() store it in the existing
+String columns as unpadded URL-safe base64.
+
+Version 1 is Fernet, which every value written before this format has.
+decrypt() recognises it by its 0x80 version byte (a leading "g" in base64)
+and still decrypts it. Set ENCRYPTION_ENVELOPE=false to keep writing Fernet,
+e.g. while older app instances that can't read version 2 are still running.
+
+Key rotation: ENCRYPTION_OLD_KEYS lists previous master keys, which are
+only used to decrypt (like MultiFernet). After changing ENCRYPTION_KEY and
+moving the old one there, rotate_encryption_keys.py re-encrypts stored
+values with the new key (app/services/key_rotation.py); once it has
+finished the old key can be dropped.
+
+The cryptography imports happen on first use, so building the global
+instance at import time costs nothing.
+"""
 import base64
+import hashlib
+import os
+import struct
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from functools import cached_property
+from typing import List, Optional, Sequence, Tuple, Union
+
 from app.core.config import settings
+from app.core.metrics import timed_operation
+
+FORMAT_FERNET = 0x80
+FORMAT_ENVELOPE = 0x02
+
+_HEADER = struct.Struct(">BBI")  # format, master key id, data key id
+NONCE_SIZE = 12
+TAG_SIZE = 16
+HEADER_SIZE = _HEADER.size + NONCE_SIZE
+ENVELOPE_OVERHEAD = HEADER_SIZE + TAG_SIZE
+
+_HKDF_SALT = b"ewallet-envelope-v2"
+
+
+def data_key_id(moment: Optional[datetime] = None) -> int:
+    """Id of the data key for the month of `moment` (months since year 0)."""
+    moment = moment or datetime.utcnow()
+    return moment.year * 12 + moment.month - 1
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _decode_master_key(key: Union[str, bytes]) -> bytes:
+    try:
+        if isinstance(key, str):
+            key = key.encode()
+        raw = base64.urlsafe_b64decode(key)
+        if len(raw) != 32:
+            raise ValueError("Fernet keys are 32 bytes")
+        return raw
+    except Exception as e:
+        raise ValueError(
+            f"Invalid ENCRYPTION_KEY. Generate a valid key with: "
+            f"python -c 'from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())'"
+        ) from e
+
+
+def _decrypt_error(cause: Optional[Exception] = None) -> ValueError:
+    error = ValueError("Failed to decrypt data. The encryption key may have changed.")
+    error.__cause__ = cause
+    return error
+
 
 class EncryptionService:
-    def __init__(self, key: str = None):
+    def __init__(self, key: str = None, old_keys: Optional[Sequence[str]] = None,
+                 envelope: Optional[bool] = None, cache_size: Optional[int] = None):
         """
         Initialize encryption service with a Fernet key.
-        
+
         Args:
-            key: Base64-encoded Fernet key. If None, loads from settings.
+            key: Base64-encoded Fernet key, used as the master key. If None, loads from settings.
+            old_keys: Previous master keys, tried when decrypting only. If None, loads ENCRYPTION_OLD_KEYS.
+            envelope: Write the AES-GCM envelope format (default ENCRYPTION_ENVELOPE); False writes Fernet.
+            cache_size: Derived data keys kept in memory (default ENCRYPTION_DATA_KEY_CACHE_SIZE).
         """
-        if key is None:
-            key = settings.ENCRYPTION_KEY
-            
-        # Validate and convert key
+        self._key = key
+        self._old_keys = list(old_keys) if old_keys is not None else None
+        self.envelope = settings.ENCRYPTION_ENVELOPE if envelope is None else envelope
+        self.cache_size = cache_size or settings.ENCRYPTION_DATA_KEY_CACHE_SIZE
+        # (master key index, data key id) -> AESGCM; index 0 is the current master key
+        self._data_keys: "OrderedDict[Tuple[int, int], object]" = OrderedDict()
+        self._data_keys_lock = threading.Lock()
+
+    def __reduce__(self):
+        # Rebuilt from its settings, e.g. in the re-encryption job's worker processes
+        return (EncryptionService, (self._key, self._old_keys, self.envelope, self.cache_size))
+
+    @cached_property
+    def master_keys(self) -> List[bytes]:
+        """Current master key first, then the old ones."""
+        key = self._key if self._key is not None else settings.ENCRYPTION_KEY
+        old_keys = self._old_keys
+        if old_keys is None:
+            old_keys = [k.strip() for k in settings.ENCRYPTION_OLD_KEYS.split(",") if k.strip()]
+        return [_decode_master_key(k) for k in [key, *old_keys]]
+
+    def validate_keys(self) -> None:
+        """Raise ValueError now if ENCRYPTION_KEY or ENCRYPTION_OLD_KEYS is malformed.
+
+        Only decodes the keys, so it is cheap enough for startup: the ciphers
+        themselves are still created on first use.
+        """
+        self.master_keys
+
+    @cached_property
+    def master_key(self) -> bytes:
+        return self.master_keys[0]
+
+    @cached_property
+    def master_key_ids(self) -> List[int]:
+        return [hashlib.sha256(key).digest()[0] for key in self.master_keys]
+
+    @property
+    def master_key_id(self) -> int:
+        return self.master_key_ids[0]
+
+    @cached_property
+    def fernets(self) -> list:
+        """One Fernet per master key, current first."""
+        from cryptography.fernet import Fernet
+
+        return [Fernet(base64.urlsafe_b64encode(key)) for key in self.master_keys]
+
+    @property
+    def fernet(self):
+        return self.fernets[0]
+
+    # --- Data keys ----------------------------------------------------------
+
+    def data_key(self, key_id: int, master_index: int = 0):
+        """AES-GCM cipher for data key `key_id` under a master key, derived on first use and cached (LRU)."""
+        cache_key = (master_index, key_id)
+        with self._data_keys_lock:
+            cipher = self._data_keys.get(cache_key)
+            if cipher is not None:
+                self._data_keys.move_to_end(cache_key)
+                return cipher
+
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+        with timed_operation("data_key_derive"):
+            key = HKDF(
+                algorithm=hashes.SHA256(), length=32, salt=_HKDF_SALT, info=b"data-key:%d" % key_id,
+            ).derive(self.master_keys[master_index])
+            cipher = AESGCM(key)
+        with self._data_keys_lock:
+            self._data_keys[cache_key] = cipher
+            while len(self._data_keys) > self.cache_size:
+                self._data_keys.popitem(last=False)
+        return cipher
+
+    # --- Binary format ------------------------------------------------------
+
+    def encrypt_bytes(self, data: Union[str, bytes], moment: Optional[datetime] = None) -> bytes:
+        """Encrypt to the raw version 2 format."""
+        if isinstance(data, str):
+            data = data.encode()
+        key_id = data_key_id(moment)
+        header = _HEADER.pack(FORMAT_ENVELOPE, self.master_key_id, key_id)
+        nonce = os.urandom(NONCE_SIZE)
+        with timed_operation("envelope_encrypt"):
+            return header + nonce + self.data_key(key_id).encrypt(nonce, data, header)
+
+    def decrypt_bytes(self, blob: bytes) -> str:
+        """Decrypt the raw version 2 format."""
+        return self._decrypt_envelope(blob)[0]
+
+    def _decrypt_envelope(self, blob: bytes) -> Tuple[str, int]:
+        """Plaintext and the index of the master key that decrypted it."""
         try:
-            if isinstance(key, str):
-                key = key.encode()
-            # Test if it's a valid Fernet key
-            self.fernet = Fernet(key)
+            version, master_key_id, key_id = _HEADER.unpack_from(blob)
         except Exception as e:
-            raise ValueError(
-                f"Invalid ENCRYPTION_KEY. Generate a valid key with: "
-                f"python -c 'from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())'"
-            ) from e
+            raise _decrypt_error(e)
+        if version != FORMAT_ENVELOPE:
+            raise _decrypt_error(ValueError(f"Unknown ciphertext version {version}"))
+        nonce = blob[_HEADER.size:HEADER_SIZE]
+        error = ValueError("Ciphertext was written with an unknown master key")
+        # The id is one byte, so two master keys can share it; try each match
+        for index, candidate in enumerate(self.master_key_ids):
+            if candidate != master_key_id:
+                continue
+            try:
+                with timed_operation("envelope_decrypt"):
+                    plaintext = self.data_key(key_id, index).decrypt(nonce, blob[HEADER_SIZE:], blob[:_HEADER.size])
+                return plaintext.decode(), index
+            except Exception as e:
+                error = e
+        raise _decrypt_error(error)
+
+    # --- Text columns -------------------------------------------------------
 
     def encrypt(self, data: str) -> str:
         """Encrypt a string and return base64-encoded result."""
         if not data:
             return None
-        return self.fernet.encrypt(data.encode()).decode()
+        if not self.envelope:
+            with timed_operation("fernet_encrypt"):
+                return self.fernet.encrypt(data.encode()).decode()
+        return _b64encode(self.encrypt_bytes(data))
 
     def decrypt(self, token: str) -> str:
-        """Decrypt a base64-encoded encrypted string."""
+        """Decrypt a base64-encoded encrypted string (either format, any configured key)."""
         if not token:
             return None
+        return self._decrypt_token(token)[0]
+
+    def _decrypt_token(self, token: str) -> Tuple[str, int]:
+        if token[0] == "g":  # 0x80: Fernet
+            error = None
+            for index, fernet in enumerate(self.fernets):
+                try:
+                    with timed_operation("fernet_decrypt"):
+                        return fernet.decrypt(token.encode()).decode(), index
+                except Exception as e:
+                    error = e
+            raise _decrypt_error(error)
         try:
-            return self.fernet.decrypt(token.encode()).decode()
+            blob = _b64decode(token)
         except Exception as e:
-            # Log the error in production
-            raise ValueError("Failed to decrypt data. The encryption key may have changed.") from e
+            raise _decrypt_error(e)
+        return self._decrypt_envelope(blob)
+
+    def rotate(self, token: str) -> Optional[str]:
+        """
+        Re-encrypt `token` with the current key and format.
+
+        Returns None when it already uses them (or is empty). Raises ValueError
+        if no configured key can decrypt it.
+        """
+        if not token:
+            return None
+        plaintext, index = self._decrypt_token(token)
+        is_fernet = token[0] == "g"
+        if index == 0 and is_fernet != self.envelope:
+            return None
+        return self.encrypt(plaintext)
 
 # Global instance
 encryption_service = EncryptionService()
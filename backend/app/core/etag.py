@@ -0,0 +1,83 @@
+"""
+Conditional GET support for read endpoints.
+
+Usage in an endpoint that declares `response: Response`:
+
+    rows = query.all()
+    not_modified = conditional_get(request, response, rows)
+    if not_modified:
+        return not_modified
+    return rows
+
+The validator is a digest of the column values the endpoint already loaded
+(ORM instances or plain column tuples), so it changes whenever anything in
+the body could change. `max(updated_at)` plus a row count is not enough
+here: wallets and bank cards have no updated_at, and SQLite timestamps only
+have second resolution, so two edits within one second would keep the same
+tag. Hashing a handful of rows costs microseconds; a 304 skips response
+model validation, JSON serialization and (for bank cards) decryption.
+
+ETags are weak (`W/"..."`): two bodies with the same tag are semantically
+equal but not promised to be byte-identical (e.g. after compression).
+"""
+import hashlib
+from typing import Any, Iterable, Optional
+
+from fastapi import Request, Response
+
+# Per-user data: caches may store it but must revalidate on every use
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def _row_values(row: Any) -> Any:
+    table = getattr(row, "__table__", None)
+    if table is not None:
+        return tuple(getattr(row, column.key) for column in table.columns)
+    if isinstance(row, (list, tuple)):
+        return tuple(_row_values(item) for item in row)
+    return row
+
+
+def compute_etag(*parts: Any) -> str:
+    """Weak ETag over ORM rows, column tuples or plain values."""
+    digest = hashlib.blake2b(repr(_row_values(parts)).encode(), digest_size=16)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def _opaque_tags(header: str) -> Iterable[str]:
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            yield tag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of `etag` against the request's If-None-Match."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag[2:] in set(_opaque_tags(header))
+
+
+def conditional_get(
+    request: Request,
+    response: Response,
+    *parts: Any,
+    cache_control: str = PRIVATE_CACHE_CONTROL,
+) -> Optional[Response]:
+    """
+    Tag the response; return a bodiless 304 if the client's copy is current.
+
+    `response` is the FastAPI-injected response whose headers are merged
+    into the normal 200 reply.
+    """
+    etag = compute_etag(*parts)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
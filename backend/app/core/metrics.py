@@ -0,0 +1,278 @@
+"""
+Lightweight Prometheus-style metrics.
+
+- MetricsMiddleware records a latency histogram per route template and status
+- SQLAlchemy cursor events count DB statements and DB time per request
+- Services report timed operations (bcrypt, Fernet, push, email) through
+  `observe_operation` / `timed_operation`
+
+Everything is kept in process memory and rendered by GET /metrics in the
+Prometheus text exposition format. Recording one observation is a dict
+lookup, a bisect and a few additions under a lock (a few microseconds);
+tests/test_metrics.py enforces that budget.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.database import pool_metrics
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative histogram with labels."""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        names = self.labels + ("le",)
+        with self._lock:
+            for label_values, (bucket_counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{self.name}_bucket{_format_labels(names, label_values + (le,))} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {count}")
+        return lines
+
+
+# --- Registry ---------------------------------------------------------------
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", labels=("method", "route", "status"),
+)
+REQUEST_DB_STATEMENTS = Histogram(
+    "http_request_db_statements", "DB statements executed per request", labels=("route",),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 250),
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "DB time per request", labels=("route",),
+)
+DB_STATEMENTS = Counter("db_statements_total", "DB statements executed")
+DB_SECONDS = Counter("db_statement_seconds_total", "Time spent executing DB statements")
+OPERATION_SECONDS = Histogram(
+    "operation_duration_seconds", "Duration of instrumented operations (bcrypt, fernet, push, email)",
+    labels=("operation",),
+)
+QUEUE_LAG_SECONDS = Histogram(
+    "queue_lag_seconds", "Time background jobs wait in their queue before starting", labels=("queue",),
+)
+
+REGISTRY = [
+    REQUEST_LATENCY,
+    REQUEST_DB_STATEMENTS,
+    REQUEST_DB_SECONDS,
+    DB_STATEMENTS,
+    DB_SECONDS,
+    OPERATION_SECONDS,
+    QUEUE_LAG_SECONDS,
+]
+
+
+# --- Service hooks ----------------------------------------------------------
+
+def observe_operation(operation: str, seconds: float) -> None:
+    """Record the duration of an operation such as "bcrypt_verify" or "fernet_decrypt"."""
+    OPERATION_SECONDS.observe(seconds, operation)
+
+
+@contextmanager
+def timed_operation(operation: str):
+    """Context manager form of observe_operation."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        OPERATION_SECONDS.observe(time.perf_counter() - started, operation)
+
+
+def observe_queue_lag(queue: str, enqueued_at: float) -> None:
+    """Record how long a job waited; enqueued_at is a time.perf_counter() value."""
+    QUEUE_LAG_SECONDS.observe(time.perf_counter() - enqueued_at, queue)
+
+
+# --- DB statement tracking ---------------------------------------------------
+
+class RequestDBStats:
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+_request_db_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("request_db_stats", default=None)
+
+
+# The start time lives on the execution context, which is dropped with the statement:
+# a statement that fails never reaches after_cursor_execute and leaves nothing behind
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    DB_STATEMENTS.inc(1)
+    DB_SECONDS.inc(elapsed)
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += elapsed
+
+
+# --- Middleware -------------------------------------------------------------
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and DB usage per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def _route_template(scope) -> str:
+        """
+        Full path template of the matched route, e.g. /api/v1/cards/{card_id}.
+
+        Depending on the FastAPI version scope["route"] is either the mounted
+        route or the one declared on its APIRouter, whose path lacks the
+        include prefix. The prefix is recovered from the request path by
+        stripping the concrete (parameter-filled) route path.
+        """
+        route = scope.get("route")
+        route_path = getattr(route, "path", None)
+        if not route_path:
+            # Unmatched paths share one label to keep cardinality bounded
+            return "unmatched"
+        path_format = getattr(route, "path_format", route_path)
+        try:
+            concrete = path_format.format(**scope.get("path_params", {}))
+        except (KeyError, IndexError, ValueError):
+            return route_path
+        path = scope.get("path", "")
+        if concrete and path.endswith(concrete):
+            return path[: len(path) - len(concrete)] + route_path
+        return route_path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_holder = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        stats = RequestDBStats()
+        token = _request_db_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_db_stats.reset(token)
+            template = self._route_template(scope)
+            REQUEST_LATENCY.observe(elapsed, scope["method"], template, str(status_holder[0]))
+            REQUEST_DB_STATEMENTS.observe(stats.statements, template)
+            REQUEST_DB_SECONDS.observe(stats.seconds, template)
+
+
+# --- Exposition -------------------------------------------------------------
+
+POOL_GAUGES = [
+    ("db_pool_size", "size", "gauge", "Configured pool size"),
+    ("db_pool_checked_out", "checked_out", "gauge", "Connections currently in use"),
+    ("db_pool_checked_in", "checked_in", "gauge", "Idle connections in the pool"),
+    ("db_pool_overflow", "overflow", "gauge", "Overflow connections currently open"),
+    ("db_pool_checkouts_total", "checkouts", "counter", "Connection checkouts"),
+    ("db_pool_checkout_wait_seconds_total", "checkout_seconds_total", "counter", "Time spent waiting for a connection"),
+    ("db_pool_checkout_wait_seconds_max", "checkout_seconds_max", "gauge", "Longest wait for a connection"),
+    ("db_pool_timeouts_total", "timeouts", "counter", "Checkouts that timed out"),
+]
+
+
+def render_metrics() -> str:
+    """Render all metrics in Prometheus text format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+
+    pools = pool_metrics()
+    for metric, key, metric_type, help_text in POOL_GAUGES:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {metric_type}")
+        for pool in pools:
+            lines.append(f'{metric}{{pool="{pool["pool"]}"}} {pool[key]}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,43 @@
+"""
+Money is stored and computed as integer minor units.
+
+VND has no sub-unit in circulation (ISO 4217 exponent 0), so one minor unit
+is one đồng and amounts are plain integers in BIGINT columns. Integer math
+keeps ledger arithmetic exact and lets the database SUM integers natively.
+"""
+from decimal import Decimal
+from numbers import Integral
+from typing import Any
+
+from sqlalchemy import BigInteger, cast, func
+
+MINOR_UNITS_PER_DONG = 1
+
+
+def to_minor_units(value: Any) -> int:
+    """
+    Convert an amount in đồng (int, whole float/Decimal or numeric string)
+    to minor units. Fractional đồng are rejected rather than rounded.
+    """
+    if isinstance(value, bool):
+        raise ValueError("Số tiền không hợp lệ")
+    if isinstance(value, Integral):
+        return int(value) * MINOR_UNITS_PER_DONG
+    try:
+        amount = Decimal(str(value).strip()) * MINOR_UNITS_PER_DONG
+    except ArithmeticError:
+        raise ValueError("Số tiền không hợp lệ")
+    if not amount.is_finite() or amount != amount.to_integral_value():
+        raise ValueError("Số tiền phải là số nguyên đồng")
+    return int(amount)
+
+
+def sum_money(column):
+    """
+    SUM of a money column as BIGINT, 0 when there are no rows.
+
+    PostgreSQL returns NUMERIC for SUM(bigint); the cast keeps the result an
+    int in Python on every backend.
+    """
+    return cast(func.coalesce(func.sum(column), 0), BigInteger)
+
@@ -0,0 +1,25 @@
+"""
+orjson-backed JSON responses for large list endpoints.
+
+List endpoints that build rows by hand (transaction history, saved bills,
+bill history, bank cards) select plain column tuples, turn them into dicts
+and return `ORJSONResponse(rows)` directly. Returning a Response skips
+FastAPI's response_model validation; the response_model is still declared
+on the route so the OpenAPI schema is unchanged.
+
+Output matches what Pydantic would produce for these models: datetimes in
+ISO 8601 with "Z" for UTC, numbers and strings as-is.
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse serialized with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
@@ -1,8 +1,9 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Any, Union
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.metrics import timed_operation
 
 # Load configuration from settings
 SECRET_KEY = settings.SECRET_KEY
@@ -10,7 +11,11 @@ ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@lru_cache(maxsize=None)
+def _pwd_context():
+    """passlib is imported on first hash/verify rather than at startup."""
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def _truncate_password(password: str, max_bytes: int = 72) -> str:
     """Truncate password to max_bytes when encoded as UTF-8."""
@@ -27,12 +32,14 @@ def _truncate_password(password: str, max_bytes: int = 72) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     # Truncate password to 72 bytes for bcrypt compatibility
     truncated_password = _truncate_password(plain_password)
-    return pwd_context.verify(truncated_password, hashed_password)
+    with timed_operation("bcrypt_verify"):
+        return _pwd_context().verify(truncated_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     # Truncate password to 72 bytes for bcrypt compatibility
     truncated_password = _truncate_password(password)
-    return pwd_context.hash(truncated_password)
+    with timed_operation("bcrypt_hash"):
+        return _pwd_context().hash(truncated_password)
 
 def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
     if expires_delta:
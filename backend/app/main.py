@@ -1,19 +1,61 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.core.config import settings
+from app.core.blind_index import blind_index_root_key
+from app.core.compression import CompressionMiddleware
 from app.core.rate_limit import limiter
+from app.core.database import SessionLocal, replica_router, read_your_writes_key
+from app.core.encryption import encryption_service
+from app.core.metrics import MetricsMiddleware, render_metrics
 from app.api.v1.api import api_router
+from app.services.alert_engine import alert_engine
+from app.services.bill_gateway import close_bill_gateway
+from app.services.bill_provider_registry import bill_provider_registry
+from app.services.event_bus import event_bus
+from app.services import event_subscribers  # noqa: F401  (registers the default subscribers)
+from app.services.fcm_service import warm_up_firebase
+from app.services.login_recorder import login_recorder
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keys are decoded lazily; check them here so a bad key stops startup instead of the first request
+    encryption_service.validate_keys()
+    blind_index_root_key()
+    # Firebase is imported and initialized off the request path
+    if settings.FIREBASE_WARM_UP:
+        warm_up_firebase()
+    # Bill providers are served from memory; a failure here only means the first lookup loads them
+    db = SessionLocal()
+    try:
+        bill_provider_registry.load(db)
+    except Exception as e:
+        logger.warning(f"Could not preload bill providers: {e}")
+    finally:
+        db.close()
+    yield
+    await close_bill_gateway()
+    login_recorder.stop()
+    event_bus.shutdown()
+    alert_engine.stop()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="E-Wallet API with secure authentication, wallet operations, and transaction management",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Add rate limiting
@@ -29,6 +71,15 @@ async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
 if settings.RATE_LIMIT_ENABLED:
     app.add_middleware(SlowAPIMiddleware)
 
+# Track successful writes so the same client reads from the primary afterwards
+if replica_router.replicas:
+    @app.middleware("http")
+    async def track_client_writes(request: Request, call_next):
+        response = await call_next(request)
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            replica_router.mark_write(read_your_writes_key(request))
+        return response
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -41,6 +92,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON bodies (and streamed exports) for clients that accept it
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+# Metrics middleware is added last so it is outermost and times the whole stack
+app.add_middleware(MetricsMiddleware)
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to E-Wallet API", "docs": "/docs"}
@@ -48,3 +111,8 @@ def read_root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy", "version": "1.0.0"}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Request, DB, operation and connection pool metrics in Prometheus text format."""
+    return render_metrics()
@@ -8,9 +8,11 @@ from .saved_bill import SavedBill
 from .bill_transaction import BillTransaction
 from .budget import Budget
 from .savings_goal import SavingsGoal
+from .savings_auto_deposit import SavingsAutoDeposit
 from .notification import Notification
 from .notification_settings import NotificationSettings
 from .alert_settings import AlertSettings
 from .alert import Alert
 from .user_device import UserDevice
 from .security_history import SecurityHistory
+from .otp_challenge import OtpChallenge
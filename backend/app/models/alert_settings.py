@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey, Boolean, Float, DateTime
+from sqlalchemy import Column, String, ForeignKey, Boolean, BigInteger, Float, DateTime
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -11,8 +11,8 @@ class AlertSettings(Base):
     user_id = Column(String, ForeignKey("users.id"), nullable=False, unique=True, index=True)
     
     # Alert thresholds
-    large_transaction_threshold = Column(Float, nullable=True)  # Alert if transaction > this amount
-    low_balance_threshold = Column(Float, nullable=True)  # Alert if balance < this amount
+    large_transaction_threshold = Column(BigInteger, nullable=True)  # Alert if transaction > this amount
+    low_balance_threshold = Column(BigInteger, nullable=True)  # Alert if balance < this amount
     budget_warning_percentage = Column(Float, default=80.0)  # Alert if budget usage > 80%
     
     # Alert toggles
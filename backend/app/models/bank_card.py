@@ -1,18 +1,26 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, String, ForeignKey, Boolean, DateTime, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class BankCard(Base):
     __tablename__ = "bank_cards"
+    __table_args__ = (
+        UniqueConstraint("user_id", "card_hash", name="uq_bank_cards_user_id_card_hash"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
     card_number_encrypted = Column(String, nullable=False)
+    card_hash = Column(String(64), nullable=True)  # Blind index of the card number (app/core/blind_index.py)
     card_holder_name = Column(String, nullable=False)
     expiry_date_encrypted = Column(String, nullable=False)
     cvv_encrypted = Column(String, nullable=False)
+    # Plain display fields derived when the card is added (see app/services/card_display.py)
+    last4 = Column(String(4), nullable=True)
+    brand = Column(String(20), nullable=True)
+    expiry_masked = Column(String(5), nullable=True)  # **/YY
     bank_name = Column(String, nullable=False)
     card_type = Column(String, nullable=False)  # VISA, MASTERCARD, ATM
     is_verified = Column(Boolean, default=False)
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey, Numeric, DateTime
+from sqlalchemy import Column, String, ForeignKey, BigInteger, DateTime
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -11,12 +11,18 @@ class BillTransaction(Base):
     user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
     provider_id = Column(String, ForeignKey("bill_providers.id"), nullable=False)
     customer_code = Column(String, nullable=False)
-    amount = Column(Numeric(15, 2), nullable=False)
+    amount = Column(BigInteger, nullable=False)  # Minor units (đồng)
     bill_period = Column(String, nullable=True)  # Tháng/Năm (e.g., "12/2024")
-    transaction_id = Column(String, ForeignKey("transactions.id"), nullable=False)
+    # No foreign key: on PostgreSQL transactions is partitioned and its primary key is
+    # (id, timestamp), so transactions.id alone can't be referenced (migration 7a1c3e9d2b40)
+    transaction_id = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User", backref="bill_transactions")
     provider = relationship("BillProvider", backref="bill_transactions")
-    transaction = relationship("Transaction", backref="bill_transaction")
+    transaction = relationship(
+        "Transaction",
+        primaryjoin="foreign(BillTransaction.transaction_id) == Transaction.id",
+        backref="bill_transaction",
+    )
 
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey, Float, Integer, DateTime
+from sqlalchemy import Column, String, ForeignKey, BigInteger, Integer, DateTime
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -10,7 +10,7 @@ class Budget(Base):
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
     category = Column(String, nullable=False)  # e.g., "FOOD", "SHOPPING", "BILLS", "TRANSPORT", "OTHER"
-    amount = Column(Float, nullable=False)  # Budget amount
+    amount = Column(BigInteger, nullable=False)  # Budget amount (đồng)
     period = Column(String, nullable=False, default="MONTH")  # MONTH, YEAR
     month = Column(Integer, nullable=True)  # 1-12 for monthly budgets
     year = Column(Integer, nullable=False)  # e.g., 2024
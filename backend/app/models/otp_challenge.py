@@ -0,0 +1,20 @@
+import uuid
+from sqlalchemy import Column, String, ForeignKey, Integer, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class OtpChallenge(Base):
+    """An outstanding OTP; at most one per user, purpose and target."""
+    __tablename__ = "otp_challenges"
+    __table_args__ = (
+        UniqueConstraint("user_id", "purpose", "target", name="uq_otp_challenges_user_purpose_target"),
+    )
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    purpose = Column(String, nullable=False)  # REGISTRATION, TRANSFER, BANK_CARD
+    target = Column(String, nullable=False, default="")  # What the code confirms: receiver email, card id, ...
+    code_hash = Column(String(64), nullable=False)  # HMAC-SHA256 of the code
+    attempts = Column(Integer, nullable=False, default=0)  # Wrong codes entered so far
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,20 @@
+import uuid
+from sqlalchemy import Column, String, ForeignKey, BigInteger, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class SavingsAutoDeposit(Base):
+    """One scheduled auto-deposit attempt; at most one per goal and period."""
+    __tablename__ = "savings_auto_deposits"
+    __table_args__ = (
+        UniqueConstraint("goal_id", "period", name="uq_savings_auto_deposits_goal_period"),
+    )
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
+    goal_id = Column(String, ForeignKey("savings_goals.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    period = Column(String, nullable=False)  # "YYYY-MM"
+    amount = Column(BigInteger, nullable=False)  # Minor units (đồng); amount attempted
+    status = Column(String, nullable=False)  # COMPLETED, INSUFFICIENT_FUNDS
+    transaction_id = Column(String, nullable=True)  # Set when COMPLETED
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
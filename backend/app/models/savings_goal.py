@@ -1,19 +1,29 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey, Float, DateTime, Date, Boolean
+from sqlalchemy import Column, String, ForeignKey, BigInteger, DateTime, Date, Boolean, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class SavingsGoal(Base):
     __tablename__ = "savings_goals"
+    # Partial index: the auto-deposit scheduler only ever looks at active, scheduled goals
+    __table_args__ = (
+        Index(
+            "ix_savings_goals_next_auto_deposit_at",
+            "next_auto_deposit_at",
+            postgresql_where=text("auto_deposit_amount IS NOT NULL AND NOT is_completed"),
+            sqlite_where=text("auto_deposit_amount IS NOT NULL AND is_completed = 0"),
+        ),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
     name = Column(String, nullable=False)  # Goal name, e.g., "Vacation", "New Car"
-    target_amount = Column(Float, nullable=False)  # Target amount to save
-    current_amount = Column(Float, default=0.0)  # Current saved amount
+    target_amount = Column(BigInteger, nullable=False)  # Target amount to save
+    current_amount = Column(BigInteger, default=0)  # Current saved amount
     deadline = Column(Date, nullable=True)  # Optional deadline
-    auto_deposit_amount = Column(Float, nullable=True)  # Auto deposit amount per month
+    auto_deposit_amount = Column(BigInteger, nullable=True)  # Auto deposit amount per month
+    next_auto_deposit_at = Column(DateTime(timezone=True), nullable=True)  # When the next auto deposit is due
     is_completed = Column(Boolean, default=False)  # Whether goal is completed
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,14 +1,22 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey, Float, DateTime
+from sqlalchemy import Column, String, ForeignKey, BigInteger, DateTime, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    # On PostgreSQL this table is partitioned by month on timestamp (see app/services/partition_service.py)
+    # and its primary key is (id, timestamp), since it must include the partition key (migration
+    # 7a1c3e9d2b40). The mapping keeps id alone as the primary key on purpose: ids are UUIDs, unique
+    # on their own, and rows are looked up and referenced (bill_transactions) by id only.
+    __table_args__ = (
+        Index("ix_transactions_sender_id_timestamp", "sender_id", "timestamp"),
+        Index("ix_transactions_receiver_id_timestamp", "receiver_id", "timestamp"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
     sender_id = Column(String, ForeignKey("users.id"), nullable=True) # Nullable for deposit
     receiver_id = Column(String, ForeignKey("users.id"), nullable=True) # Nullable for withdraw
-    amount = Column(Float, nullable=False)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    amount = Column(BigInteger, nullable=False)  # Minor units (đồng)
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     encrypted_note = Column(String, nullable=True)
@@ -1,11 +1,14 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, String, ForeignKey, DateTime, Boolean, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class UserDevice(Base):
     __tablename__ = "user_devices"
+    __table_args__ = (
+        UniqueConstraint("user_id", "fingerprint", name="uq_user_devices_user_id_fingerprint"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
@@ -14,6 +17,7 @@ class UserDevice(Base):
     device_type = Column(String, nullable=False)  # IOS, ANDROID, WEB
     ip_address = Column(String, nullable=True)  # IPv4 or IPv6
     user_agent = Column(String, nullable=True)  # Browser/App user agent
+    fingerprint = Column(String(64), nullable=True)  # SHA-256 of IP + user agent, see services/device_detection.py
     last_login = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     is_active = Column(Boolean, default=True)
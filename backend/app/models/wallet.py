@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey, Float
+from sqlalchemy import Column, String, ForeignKey, BigInteger
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -7,8 +7,8 @@ class Wallet(Base):
     __tablename__ = "wallets"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
-    user_id = Column(String, ForeignKey("users.id"))
-    balance = Column(Float, default=0.0)
+    user_id = Column(String, ForeignKey("users.id"), index=True)
+    balance = Column(BigInteger, default=0)  # Minor units (đồng)
     currency = Column(String, default="VND")
 
     user = relationship("User", backref="wallet")
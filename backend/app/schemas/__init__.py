@@ -1,8 +1,9 @@
+from .money import Money
 from .user import UserCreate, UserLogin, Token, TokenData, OTPVerify, ResendOTP, ChangePassword, UserResponse, TransactionPinRequest, TransactionPinVerify
 from .wallet import WalletResponse, DepositRequest, WithdrawRequest, TransferRequest, TransferOTPRequest, TransactionResponse
 from .contact import ContactCreate, ContactUpdate, ContactResponse, ContactStatsResponse
 from .bank_card import BankCardCreate, BankCardUpdate, BankCardResponse, BankCardVerifyRequest, DepositFromCardRequest, WithdrawToCardRequest
-from .bill import BillProviderResponse, SavedBillCreate, SavedBillUpdate, SavedBillResponse, BillCheckRequest, BillCheckResponse, BillInfo, BillPayRequest, BillPayResponse, BillHistoryResponse
+from .bill import BillProviderResponse, SavedBillCreate, SavedBillUpdate, SavedBillResponse, BillCheckRequest, BillCheckResponse, BillInfo, BillCheckBatchItem, BillCheckBatchRequest, BillCheckBatchResult, BillCheckBatchResponse, BillPayRequest, BillPayResponse, BillPayBatchItem, BillPayBatchRequest, BillPayBatchResult, BillPayBatchResponse, BillHistoryResponse
 from .budget import BudgetCreate, BudgetUpdate, BudgetResponse, BudgetStatusResponse
 from .savings_goal import SavingsGoalCreate, SavingsGoalUpdate, SavingsGoalResponse, SavingsGoalDepositRequest, SavingsGoalWithdrawRequest
 from .analytics import SpendingAnalyticsRequest, SpendingAnalyticsResponse, SpendingCategorySummary, SpendingPeriodSummary, BudgetComparisonResponse, TrendsResponse, DailyBreakdownItem
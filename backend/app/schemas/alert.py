@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 
+from .money import Money
+
 class AlertBase(BaseModel):
     type: str = Field(..., pattern="^(LARGE_TRANSACTION|LOW_BALANCE|BUDGET_WARNING|NEW_DEVICE)$")
     title: str
@@ -19,8 +21,8 @@ class AlertResponse(AlertBase):
         from_attributes = True
 
 class AlertSettingsBase(BaseModel):
-    large_transaction_threshold: Optional[float] = Field(None, gt=0)
-    low_balance_threshold: Optional[float] = Field(None, gt=0)
+    large_transaction_threshold: Optional[Money] = Field(None, gt=0)
+    low_balance_threshold: Optional[Money] = Field(None, gt=0)
     budget_warning_percentage: float = Field(default=80.0, ge=0, le=100)
     enable_large_transaction_alert: bool = True
     enable_low_balance_alert: bool = True
@@ -37,8 +39,8 @@ class AlertSettingsResponse(AlertSettingsBase):
         from_attributes = True
 
 class AlertSettingsUpdate(BaseModel):
-    large_transaction_threshold: Optional[float] = Field(None, gt=0)
-    low_balance_threshold: Optional[float] = Field(None, gt=0)
+    large_transaction_threshold: Optional[Money] = Field(None, gt=0)
+    low_balance_threshold: Optional[Money] = Field(None, gt=0)
     budget_warning_percentage: Optional[float] = Field(None, ge=0, le=100)
     enable_large_transaction_alert: Optional[bool] = None
     enable_low_balance_alert: Optional[bool] = None
@@ -2,15 +2,17 @@ from pydantic import BaseModel, Field
 from typing import Optional, List, Dict
 from datetime import datetime, date
 
+from .money import Money
+
 class SpendingCategorySummary(BaseModel):
     category: str
-    total_amount: float
+    total_amount: Money
     transaction_count: int
     percentage: float = Field(..., ge=0, le=100, description="Percentage of total spending")
 
 class SpendingPeriodSummary(BaseModel):
     period: str  # e.g., "2024-01", "2024-Q1", "2024"
-    total_amount: float
+    total_amount: Money
     transaction_count: int
     categories: List[SpendingCategorySummary]
 
@@ -22,31 +24,31 @@ class SpendingAnalyticsRequest(BaseModel):
 
 class DailyBreakdownItem(BaseModel):
     date: str  # ISO date string like "2024-01-01"
-    amount: float
+    amount: Money
 
 class SpendingAnalyticsResponse(BaseModel):
     period: str
     start_date: date
     end_date: date
-    total_spending: float
-    total_income: float
-    net_amount: float
+    total_spending: Money
+    total_income: Money
+    net_amount: Money
     transaction_count: int
     categories: List[SpendingCategorySummary]
     daily_breakdown: Optional[List[DailyBreakdownItem]] = None
 
 class BudgetComparisonResponse(BaseModel):
     category: str
-    budget_amount: float
-    spent_amount: float
-    remaining_amount: float
+    budget_amount: Money
+    spent_amount: Money
+    remaining_amount: Money
     percentage_used: float
     is_over_budget: bool
 
 class TrendsResponse(BaseModel):
     period: str
-    current_period_amount: float
-    previous_period_amount: float
+    current_period_amount: Money
+    previous_period_amount: Money
     change_percentage: float
     trend: str = Field(..., pattern="^(up|down|stable)$")
 
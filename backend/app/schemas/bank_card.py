@@ -3,6 +3,8 @@ from typing import Optional
 from datetime import datetime
 import re
 
+from .money import Money
+
 class BankCardBase(BaseModel):
     card_holder_name: str = Field(..., min_length=1, max_length=255)
     bank_name: str = Field(..., min_length=1, max_length=100)
@@ -46,7 +48,8 @@ class BankCardResponse(BankCardBase):
     id: str
     user_id: str
     card_number_masked: str  # Last 4 digits only
-    expiry_date_masked: str  # MM/YY format (not encrypted in response)
+    expiry_date_masked: str  # **/YY; the month is never returned
+    brand: Optional[str] = None  # VISA, MASTERCARD, NAPAS, ... detected from the card number
     is_verified: bool
     created_at: datetime
 
@@ -58,11 +61,11 @@ class BankCardVerifyRequest(BaseModel):
 
 class DepositFromCardRequest(BaseModel):
     card_id: str
-    amount: float = Field(..., gt=0)
+    amount: Money = Field(..., gt=0)
     transaction_pin: str = Field(..., min_length=4, max_length=6, pattern=r'^\d{4,6}$')
 
 class WithdrawToCardRequest(BaseModel):
     card_id: str
-    amount: float = Field(..., gt=0)
+    amount: Money = Field(..., gt=0)
     transaction_pin: str = Field(..., min_length=4, max_length=6, pattern=r'^\d{4,6}$')
 
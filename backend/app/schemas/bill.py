@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
 from datetime import datetime
 
+from .money import Money
+
 # Bill Provider Schemas
 class BillProviderResponse(BaseModel):
     id: str
@@ -49,7 +51,7 @@ class BillCheckRequest(BaseModel):
 class BillInfo(BaseModel):
     customer_code: str
     customer_name: Optional[str] = None
-    amount: float
+    amount: Money
     bill_period: Optional[str] = None  # e.g., "12/2024"
     due_date: Optional[datetime] = None
     description: Optional[str] = None
@@ -59,11 +61,40 @@ class BillCheckResponse(BaseModel):
     bill_info: Optional[BillInfo] = None
     message: Optional[str] = None
 
+# Batch Bill Check Schemas
+class BillCheckBatchItem(BaseModel):
+    """A saved bill, or a provider/customer code pair."""
+    saved_bill_id: Optional[str] = None
+    provider_id: Optional[str] = None
+    customer_code: Optional[str] = Field(None, min_length=1, max_length=100)
+
+    @model_validator(mode='after')
+    def check_target(self):
+        if not self.saved_bill_id and not (self.provider_id and self.customer_code):
+            raise ValueError('Either saved_bill_id or provider_id and customer_code is required')
+        return self
+
+class BillCheckBatchRequest(BaseModel):
+    items: List[BillCheckBatchItem] = Field(default_factory=list)  # Empty = all saved bills
+
+class BillCheckBatchResult(BaseModel):
+    saved_bill_id: Optional[str] = None
+    provider_id: Optional[str] = None
+    customer_code: Optional[str] = None
+    status: str  # OK, NOT_FOUND, TIMEOUT, ERROR
+    has_bill: bool = False
+    bill_info: Optional[BillInfo] = None
+    message: Optional[str] = None
+
+class BillCheckBatchResponse(BaseModel):
+    results: List[BillCheckBatchResult]
+    complete: bool  # False when some providers did not answer in time
+
 # Bill Pay Schemas
 class BillPayRequest(BaseModel):
     provider_id: str
     customer_code: str = Field(..., min_length=1, max_length=100)
-    amount: float = Field(..., gt=0)
+    amount: Money = Field(..., gt=0)
     transaction_pin: str = Field(..., min_length=4, max_length=6, pattern=r'^\d{4,6}$')
     save_bill: bool = Field(default=False)  # Lưu hóa đơn để thanh toán lại
     alias: Optional[str] = Field(None, max_length=100)  # Tên gợi nhớ nếu lưu
@@ -71,17 +102,48 @@ class BillPayRequest(BaseModel):
 class BillPayResponse(BaseModel):
     bill_transaction_id: str
     transaction_id: str
-    amount: float
+    amount: Money
     bill_period: Optional[str] = None
     paid_at: datetime
 
+# Batch Bill Pay Schemas
+class BillPayBatchItem(BaseModel):
+    provider_id: str
+    customer_code: str = Field(..., min_length=1, max_length=100)
+    amount: Money = Field(..., gt=0)
+    save_bill: bool = Field(default=False)
+    alias: Optional[str] = Field(None, max_length=100)
+
+class BillPayBatchRequest(BaseModel):
+    items: List[BillPayBatchItem] = Field(..., min_length=1)
+    transaction_pin: str = Field(..., min_length=4, max_length=6, pattern=r'^\d{4,6}$')
+    # all_or_nothing: any rejected bill fails the whole batch; best_effort: pay what can be paid
+    mode: str = Field(default='all_or_nothing', pattern=r'^(all_or_nothing|best_effort)$')
+
+class BillPayBatchResult(BaseModel):
+    provider_id: str
+    customer_code: str
+    amount: Money
+    status: str  # PAID, PROVIDER_NOT_FOUND, DUPLICATE, INSUFFICIENT_FUNDS, SKIPPED
+    message: Optional[str] = None
+    bill_transaction_id: Optional[str] = None
+    transaction_id: Optional[str] = None
+    bill_period: Optional[str] = None
+    paid_at: Optional[datetime] = None
+
+class BillPayBatchResponse(BaseModel):
+    results: List[BillPayBatchResult]
+    paid_count: int
+    total_paid: Money
+    balance: Money
+
 # Bill History Schemas
 class BillHistoryResponse(BaseModel):
     id: str
     provider_id: str
     provider_name: str
     customer_code: str
-    amount: float
+    amount: Money
     bill_period: Optional[str] = None
     transaction_id: str
     created_at: datetime
@@ -2,6 +2,8 @@ from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime
 
+from .money import Money
+
 class ContactBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
     email: EmailStr
@@ -32,8 +34,8 @@ class ContactStatsResponse(BaseModel):
     contact_id: str
     contact_name: str
     total_transactions: int
-    total_amount_sent: float
-    total_amount_received: float
+    total_amount_sent: Money
+    total_amount_received: Money
     last_transaction_date: Optional[datetime] = None
     
     class Config:
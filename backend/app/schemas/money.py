@@ -0,0 +1,8 @@
+from typing import Annotated
+
+from pydantic import BeforeValidator
+
+from app.core.money import to_minor_units
+
+# Integer đồng; whole-number floats such as 50000.0 from older clients are accepted
+Money = Annotated[int, BeforeValidator(to_minor_units)]
@@ -2,27 +2,30 @@ from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime, date
 
+from .money import Money
+
 class SavingsGoalBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
-    target_amount: float = Field(..., gt=0, description="Target amount must be greater than 0")
+    target_amount: Money = Field(..., gt=0, description="Target amount must be greater than 0")
     deadline: Optional[date] = None
-    auto_deposit_amount: Optional[float] = Field(None, gt=0, description="Auto deposit amount per month")
+    auto_deposit_amount: Optional[Money] = Field(None, gt=0, description="Auto deposit amount per month")
 
 class SavingsGoalCreate(SavingsGoalBase):
     pass
 
 class SavingsGoalUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=255)
-    target_amount: Optional[float] = Field(None, gt=0)
+    target_amount: Optional[Money] = Field(None, gt=0)
     deadline: Optional[date] = None
-    auto_deposit_amount: Optional[float] = Field(None, gt=0)
+    auto_deposit_amount: Optional[Money] = Field(None, gt=0)
     is_completed: Optional[bool] = None
 
 class SavingsGoalResponse(SavingsGoalBase):
     id: str
     user_id: str
-    current_amount: float
+    current_amount: Money
     is_completed: bool
+    next_auto_deposit_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
     
@@ -30,8 +33,8 @@ class SavingsGoalResponse(SavingsGoalBase):
         from_attributes = True
 
 class SavingsGoalDepositRequest(BaseModel):
-    amount: float = Field(..., gt=0, description="Amount to deposit into savings goal")
+    amount: Money = Field(..., gt=0, description="Amount to deposit into savings goal")
 
 class SavingsGoalWithdrawRequest(BaseModel):
-    amount: float = Field(..., gt=0, description="Amount to withdraw from savings goal")
+    amount: Money = Field(..., gt=0, description="Amount to withdraw from savings goal")
 
@@ -2,19 +2,21 @@ from pydantic import BaseModel, UUID4, Field
 from typing import Optional, List
 from datetime import datetime
 
+from .money import Money
+
 class WalletBase(BaseModel):
     currency: str = "VND"
 
 class WalletResponse(WalletBase):
     id: UUID4
     user_id: UUID4
-    balance: float
+    balance: Money
     
     class Config:
         from_attributes = True
 
 class TransactionBase(BaseModel):
-    amount: float = Field(..., gt=0)
+    amount: Money = Field(..., gt=0)
 
 class DepositRequest(TransactionBase):
     source_type: str = Field(default="manual", pattern=r'^(manual|bank_card|momo|zalopay)$')  # manual, bank_card, momo, zalopay
@@ -33,7 +35,7 @@ class TransferRequest(TransactionBase):
     otp_code: str = Field(..., min_length=6, max_length=6)
 
 class TransferOTPRequest(BaseModel):
-    amount: float = Field(..., gt=0)
+    amount: Money = Field(..., gt=0)
     receiver_email: str
     transaction_pin: str = Field(..., min_length=4, max_length=6, pattern=r'^\d{4,6}$')
 
@@ -41,7 +43,7 @@ class TransactionResponse(BaseModel):
     id: UUID4
     sender_id: Optional[UUID4]
     receiver_id: Optional[UUID4]
-    amount: float
+    amount: Money
     timestamp: datetime
     note: Optional[str] = None # Decrypted note
     type: str # "deposit", "withdraw", "transfer_in", "transfer_out"
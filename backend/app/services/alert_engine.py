@@ -0,0 +1,475 @@
+"""
+Alert engine: turns money movements and logins into rows in `alerts`.
+
+Endpoints publish an event after their commit. publish() only puts the
+event on an in-memory queue, so the request path pays a few microseconds.
+A background worker drains the queue in batches
+(ALERT_BATCH_SIZE events or ALERT_FLUSH_INTERVAL_MS, whichever comes
+first), evaluates them and inserts the resulting alerts with one
+executemany per batch.
+
+Evaluation works from memory:
+- each user's AlertSettings row is compiled into a UserRules (disabled
+  rules become None) and cached for ALERT_RULES_CACHE_TTL_SECONDS; rules
+  missing from the cache are loaded for the whole batch in one query
+- budget usage is tracked incrementally per user and month. The first
+  outgoing payment of a month in this process scans that period's
+  transactions once; after that each payment just adds its amount, so a
+  budget warning never needs a rescan. Payments already counted by the
+  scan are recognised by transaction id and not added twice. Payments
+  whose event is still queued or being processed (including the one that
+  triggered the scan) are left out of the scan, so their event adds them
+  and can raise the warning they cause.
+- a budget warns once when usage crosses budget_warning_percentage and
+  once more when it goes over 100%; low balance warns when the balance
+  crosses the threshold, not on every payment below it
+
+Commits that change AlertSettings or Budget rows through the ORM drop the
+affected user's cached rules or budget usage.
+"""
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Union
+
+from sqlalchemy import and_, event, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import observe_operation, observe_queue_lag
+from app.models import Alert, AlertSettings, Budget, Transaction
+
+logger = logging.getLogger(__name__)
+
+ALERT_LARGE_TRANSACTION = "LARGE_TRANSACTION"
+ALERT_LOW_BALANCE = "LOW_BALANCE"
+ALERT_BUDGET_WARNING = "BUDGET_WARNING"
+ALERT_NEW_DEVICE = "NEW_DEVICE"
+
+DIRECTION_OUT = "out"
+DIRECTION_IN = "in"
+
+
+@dataclass(frozen=True)
+class MoneyMovement:
+    """Money left (out) or entered (in) a user's wallet."""
+    user_id: str
+    direction: str
+    amount: int
+    balance_after: int
+    note: str = ""
+    transaction_id: Optional[str] = None
+    occurred_at: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass(frozen=True)
+class LoginEvent:
+    """A successful login."""
+    user_id: str
+    device_id: str
+    device_name: str
+    is_new_device: bool
+    ip_address: Optional[str] = None
+    occurred_at: datetime = field(default_factory=datetime.utcnow)
+
+
+AlertEvent = Union[MoneyMovement, LoginEvent]
+
+
+@dataclass(frozen=True)
+class UserRules:
+    """A user's alert settings compiled for evaluation; None means the rule is off."""
+    large_transaction_threshold: Optional[int] = None
+    low_balance_threshold: Optional[int] = None
+    budget_warning_percentage: Optional[float] = 80.0
+    new_device: bool = True
+
+    @classmethod
+    def compile(cls, row: Optional[AlertSettings]) -> "UserRules":
+        if row is None:
+            return cls()
+        return cls(
+            large_transaction_threshold=(
+                row.large_transaction_threshold if row.enable_large_transaction_alert is not False else None
+            ),
+            low_balance_threshold=row.low_balance_threshold if row.enable_low_balance_alert is not False else None,
+            budget_warning_percentage=(
+                (row.budget_warning_percentage or 80.0) if row.enable_budget_alert is not False else None
+            ),
+            new_device=row.enable_new_device_alert is not False,
+        )
+
+
+@dataclass
+class _BudgetUsage:
+    budget_id: str
+    category: str
+    amount: int
+    period: str
+    spent: int
+    warned: bool = False
+    exceeded: bool = False
+
+
+@dataclass
+class _UserMonth:
+    year: int
+    month: int
+    budgets: Dict[str, List[_BudgetUsage]]  # by category
+    counted: Set[str]  # transaction ids included by the initial scan
+
+
+def _categorize(note: str) -> str:
+    # Same categorisation the budget status endpoint uses
+    from app.api.v1.endpoints.budgets import _categorize_transaction
+    return _categorize_transaction(note)
+
+
+def _month_bounds(year: int, month: int):
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+
+class AlertEngine:
+    """Evaluates alert events in a background worker and writes alerts in batches."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+        rules_ttl_seconds: Optional[float] = None,
+        background: bool = True,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.ALERT_BATCH_SIZE
+        self.flush_interval = (flush_interval_ms or settings.ALERT_FLUSH_INTERVAL_MS) / 1000
+        self.rules_ttl_seconds = (
+            rules_ttl_seconds if rules_ttl_seconds is not None else settings.ALERT_RULES_CACHE_TTL_SECONDS
+        )
+        self.background = background
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._rules: Dict[str, tuple] = {}  # user_id -> (UserRules, loaded_at)
+        self._usage: Dict[str, _UserMonth] = {}
+        self._usage_epoch = 0
+        self._pending_tx: Set[str] = set()  # ids of published, not yet evaluated outgoing payments
+        self._pending_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._start_lock = threading.Lock()
+        self._process_lock = threading.Lock()
+
+    # --- Request path -------------------------------------------------------
+
+    def publish(self, alert_event: AlertEvent) -> None:
+        """Queue an event for evaluation. Call it after the commit."""
+        if (isinstance(alert_event, MoneyMovement) and alert_event.direction == DIRECTION_OUT
+                and alert_event.transaction_id):
+            with self._pending_lock:
+                self._pending_tx.add(alert_event.transaction_id)
+        self._queue.put((time.perf_counter(), alert_event))
+        if self.background and self._worker is None:
+            self._start_worker()
+
+    def _start_worker(self) -> None:
+        with self._start_lock:
+            if self._worker is None:
+                self._stopping.clear()
+                self._worker = threading.Thread(target=self._run, name="alert-engine", daemon=True)
+                self._worker.start()
+
+    # --- Cache invalidation -------------------------------------------------
+
+    def invalidate_rules(self, user_id: Optional[str] = None) -> None:
+        if user_id is None:
+            self._rules = {}
+        else:
+            self._rules.pop(user_id, None)
+
+    def invalidate_budgets(self, user_id: Optional[str] = None) -> None:
+        self._usage_epoch += 1
+        if user_id is None:
+            self._usage = {}
+        else:
+            self._usage.pop(user_id, None)
+
+    def reset(self) -> None:
+        """Drop queued events and all cached state."""
+        while self._drain(self.batch_size):
+            pass
+        with self._pending_lock:
+            self._pending_tx = set()
+        self.invalidate_rules()
+        self.invalidate_budgets()
+
+    # --- Worker -------------------------------------------------------------
+
+    def _drain(self, limit: int) -> List[tuple]:
+        items = []
+        while len(items) < limit:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._process_safely(batch)
+
+    def _process_safely(self, batch: List[tuple]) -> int:
+        try:
+            return self.process(batch)
+        except Exception as e:
+            logger.error(f"Alert engine dropped {len(batch)} events: {e}")
+            return 0
+
+    def flush(self) -> int:
+        """Evaluate everything queued now, in the calling thread. Returns alerts written."""
+        written = 0
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                return written
+            written += self._process_safely(batch)
+
+    def stop(self) -> None:
+        """Stop the worker and write what is still queued."""
+        worker = self._worker
+        if worker is not None:
+            self._stopping.set()
+            worker.join(timeout=5)
+            self._worker = None
+        self.flush()
+
+    # --- Evaluation ---------------------------------------------------------
+
+    def process(self, batch: List[tuple]) -> int:
+        """Evaluate a batch of (enqueued_at, event) and insert the alerts."""
+        with self._process_lock:
+            started = time.perf_counter()
+            for enqueued_at, _ in batch:
+                observe_queue_lag("alerts", enqueued_at)
+            events = [alert_event for _, alert_event in batch]
+            db = self.session_factory()
+            try:
+                rules = self._load_rules(db, {alert_event.user_id for alert_event in events})
+                alerts = []
+                for alert_event in events:
+                    try:
+                        alerts.extend(self.evaluate(db, alert_event, rules[alert_event.user_id]))
+                    finally:
+                        self._done(alert_event)
+                if alerts:
+                    db.execute(Alert.__table__.insert(), alerts)
+                    db.commit()
+            finally:
+                db.close()
+            observe_operation("alert_batch", time.perf_counter() - started)
+            return len(alerts)
+
+    def _done(self, alert_event: AlertEvent) -> None:
+        if isinstance(alert_event, MoneyMovement) and alert_event.transaction_id:
+            with self._pending_lock:
+                self._pending_tx.discard(alert_event.transaction_id)
+
+    def _load_rules(self, db: Session, user_ids: Iterable[str]) -> Dict[str, UserRules]:
+        now = time.monotonic()
+        rules, missing = {}, []
+        for user_id in user_ids:
+            cached = self._rules.get(user_id)
+            if cached and now - cached[1] <= self.rules_ttl_seconds:
+                rules[user_id] = cached[0]
+            else:
+                missing.append(user_id)
+        if missing:
+            rows = {row.user_id: row for row in db.query(AlertSettings).filter(AlertSettings.user_id.in_(missing))}
+            for user_id in missing:
+                compiled = UserRules.compile(rows.get(user_id))
+                self._rules[user_id] = (compiled, now)
+                rules[user_id] = compiled
+        return rules
+
+    def evaluate(self, db: Session, alert_event: AlertEvent, rules: UserRules) -> List[dict]:
+        """Alert rows (as insert parameters) produced by one event."""
+        if isinstance(alert_event, LoginEvent):
+            if rules.new_device and alert_event.is_new_device:
+                return [self._alert(
+                    alert_event, ALERT_NEW_DEVICE, "WARNING", "Đăng nhập từ thiết bị mới",
+                    f"Tài khoản của bạn vừa đăng nhập từ {alert_event.device_name}"
+                    + (f" ({alert_event.ip_address})" if alert_event.ip_address else "")
+                    + ". Nếu không phải bạn, hãy đổi mật khẩu ngay.",
+                    {"device_id": alert_event.device_id, "ip_address": alert_event.ip_address},
+                )]
+            return []
+
+        alerts = []
+        threshold = rules.large_transaction_threshold
+        if threshold is not None and alert_event.amount > threshold:
+            verb = "chi" if alert_event.direction == DIRECTION_OUT else "nhận"
+            alerts.append(self._alert(
+                alert_event, ALERT_LARGE_TRANSACTION, "WARNING", "Giao dịch lớn",
+                f"Bạn vừa {verb} {alert_event.amount:,}₫, vượt ngưỡng cảnh báo {threshold:,}₫",
+                {"transaction_id": alert_event.transaction_id, "amount": alert_event.amount, "threshold": threshold},
+            ))
+
+        if alert_event.direction != DIRECTION_OUT:
+            return alerts
+
+        threshold = rules.low_balance_threshold
+        balance = alert_event.balance_after
+        if threshold is not None and balance < threshold <= balance + alert_event.amount:
+            alerts.append(self._alert(
+                alert_event, ALERT_LOW_BALANCE, "WARNING", "Số dư thấp",
+                f"Số dư ví còn {balance:,}₫, dưới ngưỡng {threshold:,}₫",
+                {"balance": balance, "threshold": threshold},
+            ))
+
+        if rules.budget_warning_percentage is not None:
+            alerts.extend(self._budget_alerts(db, alert_event, rules.budget_warning_percentage))
+        return alerts
+
+    def _budget_alerts(self, db: Session, alert_event: MoneyMovement, percentage: float) -> List[dict]:
+        usage = self._usage.get(alert_event.user_id)
+        if usage is None or (usage.year, usage.month) != (alert_event.occurred_at.year, alert_event.occurred_at.month):
+            usage = self._load_usage(db, alert_event.user_id, alert_event.occurred_at, percentage)
+        if alert_event.transaction_id and alert_event.transaction_id in usage.counted:
+            # Already included by the initial scan
+            return []
+
+        alerts = []
+        category = _categorize(alert_event.note)
+        for budget in usage.budgets.get(category, ()):
+            budget.spent += alert_event.amount
+            if not budget.exceeded and budget.spent > budget.amount:
+                budget.exceeded = budget.warned = True
+                alerts.append(self._alert(
+                    alert_event, ALERT_BUDGET_WARNING, "CRITICAL", "Vượt ngân sách",
+                    f"Chi tiêu {category} đã vượt ngân sách: {budget.spent:,}₫ / {budget.amount:,}₫",
+                    {"budget_id": budget.budget_id, "spent": budget.spent, "amount": budget.amount},
+                ))
+            elif not budget.warned and budget.spent * 100 >= budget.amount * percentage:
+                budget.warned = True
+                alerts.append(self._alert(
+                    alert_event, ALERT_BUDGET_WARNING, "WARNING", "Sắp hết ngân sách",
+                    f"Chi tiêu {category} đã dùng {budget.spent * 100 // budget.amount}% ngân sách "
+                    f"({budget.spent:,}₫ / {budget.amount:,}₫)",
+                    {"budget_id": budget.budget_id, "spent": budget.spent, "amount": budget.amount},
+                ))
+        return alerts
+
+    def _load_usage(self, db: Session, user_id: str, moment: datetime, percentage: float) -> _UserMonth:
+        """Scan this month's (and year's, for yearly budgets) spending once."""
+        epoch = self._usage_epoch
+        year, month = moment.year, moment.month
+        budgets = db.query(Budget).filter(
+            Budget.user_id == user_id,
+            Budget.year == year,
+            or_(and_(Budget.period == "MONTH", Budget.month == month), Budget.period == "YEAR"),
+        ).all()
+        usage = _UserMonth(year=year, month=month, budgets={}, counted=set())
+
+        if budgets:
+            from app.core.encryption import encryption_service
+
+            month_start, month_end = _month_bounds(year, month)
+            scan_start = datetime(year, 1, 1) if any(b.period == "YEAR" for b in budgets) else month_start
+            rows = db.execute(
+                select(Transaction.id, Transaction.amount, Transaction.encrypted_note, Transaction.timestamp)
+                .where(Transaction.sender_id == user_id, Transaction.timestamp >= scan_start,
+                       Transaction.timestamp < month_end)
+            ).all()
+            with self._pending_lock:
+                pending = set(self._pending_tx)
+            month_spent: Dict[str, int] = {}
+            year_spent: Dict[str, int] = {}
+            for tx_id, amount, encrypted_note, timestamp in rows:
+                if tx_id in pending:
+                    continue  # its event adds it (and raises any alert it causes)
+                try:
+                    note = encryption_service.decrypt(encrypted_note) if encrypted_note else ""
+                except Exception:
+                    note = ""
+                category = _categorize(note)
+                year_spent[category] = year_spent.get(category, 0) + amount
+                if timestamp.replace(tzinfo=None) >= month_start:
+                    month_spent[category] = month_spent.get(category, 0) + amount
+                    usage.counted.add(tx_id)
+
+            for budget in budgets:
+                spent = (month_spent if budget.period == "MONTH" else year_spent).get(budget.category, 0)
+                usage.budgets.setdefault(budget.category, []).append(_BudgetUsage(
+                    budget_id=budget.id,
+                    category=budget.category,
+                    amount=budget.amount,
+                    period=budget.period,
+                    spent=spent,
+                    # Don't repeat warnings that were due before this process started
+                    warned=spent * 100 >= budget.amount * percentage,
+                    exceeded=spent > budget.amount,
+                ))
+
+        if epoch == self._usage_epoch:
+            self._usage[user_id] = usage
+        return usage
+
+    @staticmethod
+    def _alert(alert_event: AlertEvent, alert_type: str, severity: str, title: str, message: str, data: dict) -> dict:
+        return {
+            "id": str(uuid.uuid4()),
+            "user_id": alert_event.user_id,
+            "type": alert_type,
+            "title": title,
+            "message": message,
+            "severity": severity,
+            "is_read": False,
+            "data": json.dumps(data),
+            "created_at": alert_event.occurred_at,
+        }
+
+
+alert_engine = AlertEngine()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_alert_inputs(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, AlertSettings):
+            session.info.setdefault("alert_settings_users", set()).add(obj.user_id)
+        elif isinstance(obj, Budget):
+            session.info.setdefault("budget_users", set()).add(obj.user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_alert_caches(session):
+    for user_id in session.info.pop("alert_settings_users", ()):
+        alert_engine.invalidate_rules(user_id)
+    for user_id in session.info.pop("budget_users", ()):
+        alert_engine.invalidate_budgets(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_alert_inputs(session):
+    session.info.pop("alert_settings_users", None)
+    session.info.pop("budget_users", None)
@@ -0,0 +1,236 @@
+"""
+Monthly auto-deposits from wallets into savings goals.
+
+The scheduler picks due goals through the partial index on
+savings_goals.next_auto_deposit_at and handles them in chunks, one
+transaction per chunk:
+- wallet balances for the chunk are read once (locked on PostgreSQL) and
+  each goal's deposit is checked against what is left after the goals
+  before it
+- wallet debits and goal credits are applied as set-based UPDATEs, guarded
+  by `balance >= amount` and `next_auto_deposit_at <= now`
+- wallet transactions and one savings_auto_deposits row per goal are bulk
+  inserted; goals whose wallet lacks funds get an INSUFFICIENT_FUNDS row and
+  are not retried until the next period
+- every processed goal moves to the first day of next month
+
+A deposit is idempotent per (goal, period): the savings_auto_deposits row
+is unique on it and written in the same transaction as the money movement,
+so a crash either loses the whole chunk (it is redone on restart) or none
+of it. Missed months are not charged retroactively.
+"""
+import logging
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import BigInteger, DateTime, String, select
+from sqlalchemy.orm import Session
+
+from app.core.bulk_update import keyed_update
+from app.core.config import settings
+from app.core.encryption import encryption_service
+from app.models import SavingsAutoDeposit, SavingsGoal, Transaction, Wallet
+
+logger = logging.getLogger(__name__)
+
+STATUS_COMPLETED = "COMPLETED"
+STATUS_INSUFFICIENT_FUNDS = "INSUFFICIENT_FUNDS"
+
+
+class ConcurrentUpdateError(Exception):
+    """A guarded UPDATE matched fewer rows than expected."""
+
+
+@dataclass
+class AutoDepositResult:
+    """Outcome of one scheduler run."""
+    processed: int = 0
+    deposited: int = 0
+    insufficient_funds: int = 0
+    already_done: int = 0
+    amount: int = 0
+    chunks: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def goals_per_second(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return float(self.processed)
+        return self.processed / self.elapsed_seconds
+
+
+def period_key(moment: datetime) -> str:
+    """Billing period of a moment, e.g. "2025-01"."""
+    return f"{moment.year:04d}-{moment.month:02d}"
+
+
+def start_of_next_month(moment: datetime) -> datetime:
+    if moment.month == 12:
+        return datetime(moment.year + 1, 1, 1)
+    return datetime(moment.year, moment.month + 1, 1)
+
+
+class AutoDepositScheduler:
+    """Runs due savings-goal auto-deposits in chunked, bounded transactions."""
+
+    def __init__(self, chunk_size: Optional[int] = None, max_retries: int = 3):
+        self.chunk_size = chunk_size or settings.AUTO_DEPOSIT_CHUNK_SIZE
+        self.max_retries = max_retries
+
+    def _due_goals(self, db: Session, now: datetime):
+        goals = SavingsGoal.__table__
+        query = (
+            select(
+                goals.c.id, goals.c.user_id, goals.c.name, goals.c.auto_deposit_amount,
+                goals.c.current_amount, goals.c.target_amount,
+            )
+            .where(
+                goals.c.auto_deposit_amount.isnot(None),
+                goals.c.is_completed == False,
+                goals.c.next_auto_deposit_at <= now,
+            )
+            .order_by(goals.c.next_auto_deposit_at, goals.c.id)
+            .limit(self.chunk_size)
+        )
+        if db.get_bind().dialect.name == "postgresql":
+            # Parallel workers take disjoint chunks
+            query = query.with_for_update(skip_locked=True)
+        return db.execute(query).all()
+
+    def _wallet_balances(self, db: Session, user_ids) -> Dict[str, int]:
+        wallets = Wallet.__table__
+        query = select(wallets.c.user_id, wallets.c.balance).where(wallets.c.user_id.in_(user_ids))
+        if db.get_bind().dialect.name == "postgresql":
+            query = query.order_by(wallets.c.user_id).with_for_update()
+        return {user_id: balance or 0 for user_id, balance in db.execute(query)}
+
+    def process_chunk(self, db: Session, goals, now: datetime, result: AutoDepositResult) -> None:
+        """Deposit for one chunk of due goals and commit."""
+        period = period_key(now)
+        next_run = start_of_next_month(now)
+        goal_ids = [goal.id for goal in goals]
+
+        done = set(db.execute(
+            select(SavingsAutoDeposit.goal_id).where(
+                SavingsAutoDeposit.goal_id.in_(goal_ids),
+                SavingsAutoDeposit.period == period,
+            )
+        ).scalars())
+        balances = self._wallet_balances(db, {goal.user_id for goal in goals})
+
+        debits: Dict[str, int] = defaultdict(int)
+        credits, transactions, records = [], [], []
+        deposited = insufficient = amount_total = 0
+        for goal in goals:
+            if goal.id in done:
+                # Already handled this period (e.g. next run was reset); only reschedule
+                credits.append({"id": goal.id, "amount": 0})
+                continue
+            amount = max(0, min(goal.auto_deposit_amount, goal.target_amount - (goal.current_amount or 0)))
+            if amount == 0:
+                # Target already reached; the credit UPDATE marks it completed
+                credits.append({"id": goal.id, "amount": 0})
+                continue
+            if balances.get(goal.user_id, 0) - debits[goal.user_id] < amount:
+                credits.append({"id": goal.id, "amount": 0})
+                records.append({
+                    "goal_id": goal.id, "user_id": goal.user_id, "period": period,
+                    "amount": amount, "status": STATUS_INSUFFICIENT_FUNDS, "transaction_id": None,
+                })
+                insufficient += 1
+                continue
+
+            debits[goal.user_id] += amount
+            transaction_id = str(uuid.uuid4())
+            transactions.append({
+                "id": transaction_id,
+                "sender_id": goal.user_id,
+                "receiver_id": None,
+                "amount": amount,
+                "timestamp": now,
+                "encrypted_note": encryption_service.encrypt(f"Tự động gửi tiết kiệm: {goal.name}"),
+            })
+            credits.append({"id": goal.id, "amount": amount})
+            records.append({
+                "goal_id": goal.id, "user_id": goal.user_id, "period": period,
+                "amount": amount, "status": STATUS_COMPLETED, "transaction_id": transaction_id,
+            })
+            deposited += 1
+            amount_total += amount
+
+        try:
+            if debits:
+                matched = keyed_update(
+                    db, Wallet.__table__, "user_id",
+                    [("user_id", String()), ("amount", BigInteger())],
+                    [{"user_id": user_id, "amount": amount} for user_id, amount in debits.items()],
+                    lambda t, src: ({"balance": t.c.balance - src["amount"]}, [t.c.balance >= src["amount"]]),
+                )
+                if matched != len(debits):
+                    raise ConcurrentUpdateError("wallet balance changed during auto-deposit")
+
+            matched = keyed_update(
+                db, SavingsGoal.__table__, "id",
+                [("id", String()), ("amount", BigInteger()), ("next_run", DateTime())],
+                [dict(credit, next_run=next_run) for credit in credits],
+                lambda t, src: (
+                    {
+                        "current_amount": t.c.current_amount + src["amount"],
+                        "is_completed": t.c.current_amount + src["amount"] >= t.c.target_amount,
+                        "next_auto_deposit_at": src["next_run"],
+                    },
+                    [t.c.next_auto_deposit_at <= now],
+                ),
+            )
+            if matched != len(credits):
+                raise ConcurrentUpdateError("savings goal was rescheduled during auto-deposit")
+
+            if transactions:
+                db.execute(Transaction.__table__.insert(), transactions)
+            if records:
+                db.execute(SavingsAutoDeposit.__table__.insert(), records)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        result.processed += len(goals)
+        result.deposited += deposited
+        result.insufficient_funds += insufficient
+        result.already_done += len(done)
+        result.amount += amount_total
+        result.chunks += 1
+
+    def run(self, db: Session, now: Optional[datetime] = None) -> AutoDepositResult:
+        """Process every goal due at `now` (default: current UTC time)."""
+        now = now or datetime.utcnow()
+        result = AutoDepositResult()
+        started = time.perf_counter()
+        retries = 0
+
+        while True:
+            goals = self._due_goals(db, now)
+            if not goals:
+                db.rollback()
+                break
+            try:
+                self.process_chunk(db, goals, now, result)
+                retries = 0
+            except ConcurrentUpdateError as e:
+                retries += 1
+                logger.warning(f"Auto-deposit chunk retried ({retries}/{self.max_retries}): {e}")
+                if retries >= self.max_retries:
+                    raise
+
+        result.elapsed_seconds = time.perf_counter() - started
+        logger.info(
+            f"Auto-deposit {period_key(now)}: {result.deposited} deposited "
+            f"({result.amount:,}₫), {result.insufficient_funds} insufficient funds, "
+            f"{result.already_done} already done, {result.processed} goals in "
+            f"{result.elapsed_seconds:.2f}s = {result.goals_per_second:,.0f} goals/s"
+        )
+        return result
@@ -0,0 +1,254 @@
+"""
+Async gateway to bill providers and the batch bill checker.
+
+A BillGateway asks one provider whether a customer code has an unpaid bill.
+Two implementations ship:
+- SimulatedBillGateway: the demo behaviour (a random bill ~70% of the time),
+  used when BILL_GATEWAY_URL is not set
+- HttpBillGateway: calls a provider aggregator over HTTP,
+  GET {BILL_GATEWAY_URL}/providers/{code}/bills/{customer_code}; the mock
+  server in mock_bill_provider.py implements the same API for local testing
+
+BillCheckDispatcher runs many checks concurrently for POST /bills/check-batch:
+- at most BILL_PROVIDER_MAX_CONCURRENCY calls in flight per provider, shared
+  by all requests in the process, so one user's batch cannot flood a provider
+- each call is cut off after BILL_CHECK_TIMEOUT_SECONDS
+- the whole batch returns after BILL_CHECK_BATCH_TIMEOUT_SECONDS with
+  whatever has finished; the rest are reported as TIMEOUT
+"""
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Hashable, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from app.core.config import settings
+from app.core.metrics import observe_operation
+from app.core.money import to_minor_units
+from app.services.bill_provider_registry import ProviderInfo
+
+logger = logging.getLogger(__name__)
+
+STATUS_OK = "OK"
+STATUS_NOT_FOUND = "NOT_FOUND"
+STATUS_TIMEOUT = "TIMEOUT"
+STATUS_ERROR = "ERROR"
+
+
+class BillGatewayError(Exception):
+    """The provider answered with an error or an unreadable response."""
+
+
+@dataclass
+class BillLookup:
+    """A provider's answer for one customer code."""
+    has_bill: bool
+    customer_name: Optional[str] = None
+    amount: Optional[int] = None
+    bill_period: Optional[str] = None
+    due_date: Optional[datetime] = None
+    description: Optional[str] = None
+
+
+@dataclass
+class BillCheckOutcome:
+    """Result of one check in a batch."""
+    status: str
+    lookup: Optional[BillLookup] = None
+    error: Optional[str] = None
+    elapsed_seconds: float = 0.0
+
+
+class BillGateway(ABC):
+    """Interface to the bill providers."""
+
+    @abstractmethod
+    async def check(self, provider: ProviderInfo, customer_code: str) -> BillLookup:
+        """Look up the unpaid bill of `customer_code` at `provider`."""
+
+    async def aclose(self) -> None:
+        """Release connections held by the gateway."""
+
+
+class SimulatedBillGateway(BillGateway):
+    """Demo gateway: returns a random bill about 70% of the time."""
+
+    async def check(self, provider: ProviderInfo, customer_code: str) -> BillLookup:
+        if random.random() >= 0.7:
+            return BillLookup(has_bill=False)
+        bill_period = datetime.now().strftime("%m/%Y")
+        return BillLookup(
+            has_bill=True,
+            customer_name=f"Khách hàng {customer_code[-4:]}",
+            amount=random.randint(50000, 500000),
+            bill_period=bill_period,
+            due_date=datetime.now() + timedelta(days=15),
+            description=f"Hóa đơn {provider.name} tháng {bill_period}",
+        )
+
+
+class HttpBillGateway(BillGateway):
+    """Gateway calling a provider aggregator's HTTP API."""
+
+    def __init__(self, base_url: str, timeout: float, transport=None):
+        import httpx  # Imported lazily to keep app startup fast
+
+        self._client = httpx.AsyncClient(base_url=base_url, timeout=timeout, transport=transport)
+
+    async def check(self, provider: ProviderInfo, customer_code: str) -> BillLookup:
+        import httpx
+
+        try:
+            response = await self._client.get(f"/providers/{provider.code}/bills/{quote(customer_code, safe='')}")
+        except httpx.TimeoutException:
+            raise asyncio.TimeoutError()
+        except httpx.HTTPError as e:
+            raise BillGatewayError(f"{provider.code}: {e}") from e
+
+        if response.status_code == 404:
+            return BillLookup(has_bill=False)
+        if response.status_code != 200:
+            raise BillGatewayError(f"{provider.code}: HTTP {response.status_code}")
+        try:
+            data = response.json()
+            has_bill = bool(data.get("has_bill", True))
+            return BillLookup(
+                has_bill=has_bill,
+                customer_name=data.get("customer_name"),
+                # A bill must carry a whole-đồng amount; anything else is the provider's error
+                amount=to_minor_units(data.get("amount")) if has_bill else None,
+                bill_period=data.get("bill_period"),
+                due_date=datetime.fromisoformat(data["due_date"]) if data.get("due_date") else None,
+                description=data.get("description"),
+            )
+        except (ValueError, TypeError, AttributeError) as e:
+            raise BillGatewayError(f"{provider.code}: invalid response ({e})") from e
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def stable_bill(provider: ProviderInfo, customer_code: str) -> BillLookup:
+    """Deterministic bill for a customer code, used by the mock provider server."""
+    digest = int(hashlib.sha256(f"{provider.code}:{customer_code}".encode()).hexdigest(), 16)
+    if digest % 10 >= 7:
+        return BillLookup(has_bill=False)
+    bill_period = datetime.now().strftime("%m/%Y")
+    return BillLookup(
+        has_bill=True,
+        customer_name=f"Khách hàng {customer_code[-4:]}",
+        amount=50000 + (digest // 10 % 451) * 1000,
+        bill_period=bill_period,
+        due_date=datetime.now().replace(microsecond=0) + timedelta(days=15),
+        description=f"Hóa đơn {provider.name} tháng {bill_period}",
+    )
+
+
+class BillCheckDispatcher:
+    """Runs bill checks concurrently with per-provider limits and timeouts."""
+
+    def __init__(
+        self,
+        gateway: BillGateway,
+        max_per_provider: Optional[int] = None,
+        timeout: Optional[float] = None,
+        batch_timeout: Optional[float] = None,
+    ):
+        self.gateway = gateway
+        self.max_per_provider = max_per_provider or settings.BILL_PROVIDER_MAX_CONCURRENCY
+        self.timeout = timeout if timeout is not None else settings.BILL_CHECK_TIMEOUT_SECONDS
+        self.batch_timeout = batch_timeout if batch_timeout is not None else settings.BILL_CHECK_BATCH_TIMEOUT_SECONDS
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _semaphore(self, provider_code: str) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop; start over if the loop changed
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphores = {}
+        semaphore = self._semaphores.get(provider_code)
+        if semaphore is None:
+            semaphore = self._semaphores[provider_code] = asyncio.Semaphore(self.max_per_provider)
+        return semaphore
+
+    async def check(self, provider: ProviderInfo, customer_code: str) -> BillCheckOutcome:
+        """Check one customer code, waiting for a free slot at the provider."""
+        async with self._semaphore(provider.code):
+            started = time.perf_counter()
+            try:
+                lookup = await asyncio.wait_for(self.gateway.check(provider, customer_code), self.timeout)
+                outcome = BillCheckOutcome(status=STATUS_OK, lookup=lookup)
+            except asyncio.TimeoutError:
+                outcome = BillCheckOutcome(status=STATUS_TIMEOUT)
+            except BillGatewayError as e:
+                logger.warning(f"Bill check failed at {provider.code}: {e}")
+                outcome = BillCheckOutcome(status=STATUS_ERROR, error=str(e))
+            outcome.elapsed_seconds = time.perf_counter() - started
+            observe_operation(f"bill_check_{provider.code}", outcome.elapsed_seconds)
+            return outcome
+
+    async def check_many(
+        self, checks: Sequence[Tuple[Hashable, ProviderInfo, str]]
+    ) -> Tuple[Dict[Hashable, BillCheckOutcome], bool]:
+        """
+        Run (key, provider, customer_code) checks concurrently.
+
+        Returns outcomes by key and whether every check finished before the
+        batch deadline. Checks still running at the deadline are cancelled
+        and reported as TIMEOUT.
+        """
+        if not checks:
+            return {}, True
+        tasks: Dict[asyncio.Task, Hashable] = {
+            asyncio.create_task(self.check(provider, customer_code)): key
+            for key, provider, customer_code in checks
+        }
+        done, pending = await asyncio.wait(tasks, timeout=self.batch_timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            pending_keys = {tasks[task] for task in pending}
+            slow = sorted({provider.code for key, provider, _ in checks if key in pending_keys})
+            logger.warning(f"Bill check batch returned partial results; still waiting on {', '.join(slow)}")
+
+        outcomes: Dict[Hashable, BillCheckOutcome] = {}
+        for task, key in tasks.items():
+            if task in pending:
+                outcomes[key] = BillCheckOutcome(status=STATUS_TIMEOUT, elapsed_seconds=self.batch_timeout)
+            elif task.exception() is not None:
+                logger.error(f"Bill check crashed: {task.exception()!r}")
+                outcomes[key] = BillCheckOutcome(status=STATUS_ERROR, error=str(task.exception()))
+            else:
+                outcomes[key] = task.result()
+        return outcomes, not pending
+
+
+_dispatcher: Optional[BillCheckDispatcher] = None
+
+
+def build_gateway() -> BillGateway:
+    if settings.BILL_GATEWAY_URL:
+        return HttpBillGateway(settings.BILL_GATEWAY_URL, timeout=settings.BILL_CHECK_TIMEOUT_SECONDS)
+    return SimulatedBillGateway()
+
+
+def get_bill_check_dispatcher() -> BillCheckDispatcher:
+    """FastAPI dependency returning the process-wide dispatcher."""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = BillCheckDispatcher(build_gateway())
+    return _dispatcher
+
+
+async def close_bill_gateway() -> None:
+    global _dispatcher
+    if _dispatcher is not None:
+        await _dispatcher.gateway.aclose()
+        _dispatcher = None
@@ -0,0 +1,142 @@
+"""
+In-process registry of bill providers.
+
+bill_providers is a handful of rows that almost never change, so the whole
+table is kept in memory and bill endpoints look providers up by id or code
+(and fill in provider_name on history and saved-bill lists) without a query
+or join.
+
+The snapshot is refreshed:
+- at startup (see app.main lifespan)
+- when it is older than BILL_PROVIDER_CACHE_TTL_SECONDS
+- right after a commit that added, changed or deleted a BillProvider
+  through the ORM in this process
+- on a lookup miss, at most once per MISS_REFRESH_SECONDS, so a provider
+  added by another process is found without waiting for the TTL
+
+Lookups take the request's Session so a refresh uses the same database as
+the rest of the request.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import BillProvider
+
+logger = logging.getLogger(__name__)
+
+MISS_REFRESH_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class ProviderInfo:
+    """Immutable copy of a bill_providers row."""
+    id: str
+    name: str
+    code: str
+    logo_url: Optional[str]
+    is_active: bool
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    loaded_at: float
+    by_id: Dict[str, ProviderInfo]
+    by_code: Dict[str, ProviderInfo]
+    active: Tuple[ProviderInfo, ...]
+
+
+class BillProviderRegistry:
+    """Bill providers cached in memory with TTL and change-based refresh."""
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.BILL_PROVIDER_CACHE_TTL_SECONDS
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> None:
+        """Reload all providers from the database."""
+        columns = BillProvider.__table__.c
+        rows = db.execute(
+            select(columns.id, columns.name, columns.code, columns.logo_url, columns.is_active)
+            .order_by(columns.name)
+        ).all()
+        providers = [
+            ProviderInfo(id=row.id, name=row.name, code=row.code, logo_url=row.logo_url, is_active=bool(row.is_active))
+            for row in rows
+        ]
+        self._snapshot = _Snapshot(
+            loaded_at=time.monotonic(),
+            by_id={provider.id: provider for provider in providers},
+            by_code={provider.code: provider for provider in providers},
+            active=tuple(provider for provider in providers if provider.is_active),
+        )
+        logger.debug(f"Loaded {len(providers)} bill providers")
+
+    def invalidate(self) -> None:
+        """Drop the snapshot; the next lookup reloads it."""
+        self._snapshot = None
+
+    def _current(self, db: Session) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot.loaded_at > self.ttl_seconds:
+            with self._lock:
+                if self._snapshot is snapshot:
+                    self.load(db)
+                snapshot = self._snapshot
+        return snapshot
+
+    def _refresh_on_miss(self, db: Session) -> _Snapshot:
+        snapshot = self._current(db)
+        if time.monotonic() - snapshot.loaded_at > MISS_REFRESH_SECONDS:
+            with self._lock:
+                if self._snapshot is snapshot:
+                    self.load(db)
+            snapshot = self._snapshot
+        return snapshot
+
+    def get(self, db: Session, provider_id: str) -> Optional[ProviderInfo]:
+        provider = self._current(db).by_id.get(provider_id)
+        if provider is None:
+            provider = self._refresh_on_miss(db).by_id.get(provider_id)
+        return provider
+
+    def get_by_code(self, db: Session, code: str) -> Optional[ProviderInfo]:
+        provider = self._current(db).by_code.get(code)
+        if provider is None:
+            provider = self._refresh_on_miss(db).by_code.get(code)
+        return provider
+
+    def name(self, db: Session, provider_id: str) -> str:
+        """Provider name for list enrichment ("" if the provider is unknown)."""
+        provider = self.get(db, provider_id)
+        return provider.name if provider else ""
+
+    def active(self, db: Session) -> List[ProviderInfo]:
+        return list(self._current(db).active)
+
+
+bill_provider_registry = BillProviderRegistry()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_provider_changes(session, flush_context):
+    if any(isinstance(obj, BillProvider) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info["bill_providers_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_provider_commit(session):
+    if session.info.pop("bill_providers_changed", False):
+        bill_provider_registry.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_provider_changes(session):
+    session.info.pop("bill_providers_changed", None)
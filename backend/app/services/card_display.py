@@ -0,0 +1,58 @@
+"""
+Display fields of bank cards.
+
+The card number, expiry and CVV are stored encrypted. What the app shows
+(the last four digits, the card brand and the expiry year as **/YY) is
+derived once, when the card is added, and stored in plain columns next to
+them (bank_cards.last4, brand, expiry_masked), so listing cards or writing
+a "•••• 1234" transaction note never decrypts anything. The expiry month
+stays encrypted only.
+"""
+from typing import Dict, Optional
+
+UNKNOWN_LAST4 = "****"
+UNKNOWN_EXPIRY = "**/**"
+
+# (brand, IIN prefix ranges as (low, high) of the given length), checked in order
+_BRAND_RANGES = [
+    ("NAPAS", [(9704, 9704)]),
+    ("AMEX", [(34, 34), (37, 37)]),
+    ("JCB", [(3528, 3589)]),
+    ("UNIONPAY", [(62, 62)]),
+    ("MASTERCARD", [(51, 55), (2221, 2720)]),
+    ("VISA", [(4, 4)]),
+]
+
+
+def detect_brand(card_number: str) -> Optional[str]:
+    """Card network from the issuer prefix, or None if unknown."""
+    for brand, ranges in _BRAND_RANGES:
+        for low, high in ranges:
+            prefix = card_number[:len(str(low))]
+            if prefix.isdigit() and low <= int(prefix) <= high:
+                return brand
+    return None
+
+
+def mask_expiry(expiry_date: str) -> Optional[str]:
+    """**/YY from an MM/YY expiry, or None if it is not in that format."""
+    month, _, year = expiry_date.partition("/")
+    if len(month) != 2 or len(year) != 2 or not year.isdigit():
+        return None
+    return f"**/{year}"
+
+
+def card_display_fields(card_number: str, expiry_date: str) -> Dict[str, Optional[str]]:
+    """Column values for BankCard.last4, brand and expiry_masked."""
+    return {
+        "last4": card_number[-4:] if len(card_number) > 4 else None,
+        "brand": detect_brand(card_number),
+        "expiry_masked": mask_expiry(expiry_date),
+    }
+
+
+def mask_card_number(last4: Optional[str]) -> str:
+    """Masked card number from the stored last four digits."""
+    if not last4:
+        return UNKNOWN_LAST4
+    return "**** " * 3 + last4
@@ -0,0 +1,72 @@
+"""
+Device detection from the login request.
+
+parse_user_agent() maps a User-Agent string to a device type and display
+name. Clients send the same few hundred user agents over and over, so
+results are memoized in an LRU cache.
+
+device_fingerprint() is the fixed-size key a device is matched on: a
+SHA-256 over the IP address and user agent, stored in
+user_devices.fingerprint with a unique index on (user_id, fingerprint),
+so finding a user's device is one index probe instead of comparing two
+unbounded strings.
+"""
+import hashlib
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+USER_AGENT_CACHE_SIZE = 1024
+
+
+class DeviceInfo(NamedTuple):
+    device_type: str  # IOS, ANDROID, WEB
+    device_name: str
+
+
+@lru_cache(maxsize=USER_AGENT_CACHE_SIZE)
+def parse_user_agent(user_agent: str) -> DeviceInfo:
+    """Detect device type and name from a user agent."""
+    device_type = _detect_device_type(user_agent)
+    return DeviceInfo(device_type, _get_device_name(user_agent, device_type))
+
+
+def device_fingerprint(ip_address: Optional[str], user_agent: Optional[str]) -> str:
+    """Hex SHA-256 identifying a device by IP address and user agent."""
+    return hashlib.sha256(f"{ip_address or ''}\n{user_agent or ''}".encode("utf-8")).hexdigest()
+
+
+def _detect_device_type(user_agent: str) -> str:
+    """Detect device type from user agent string."""
+    user_agent_lower = user_agent.lower()
+    if 'iphone' in user_agent_lower or 'ipad' in user_agent_lower or 'ipod' in user_agent_lower:
+        return 'IOS'
+    elif 'android' in user_agent_lower:
+        return 'ANDROID'
+    else:
+        return 'WEB'
+
+
+def _get_device_name(user_agent: str, device_type: str) -> str:
+    """Extract device name from user agent."""
+    user_agent_lower = user_agent.lower()
+    if device_type == 'IOS':
+        if 'iphone' in user_agent_lower:
+            return 'iPhone'
+        elif 'ipad' in user_agent_lower:
+            return 'iPad'
+        return 'iOS Device'
+    elif device_type == 'ANDROID':
+        if 'samsung' in user_agent_lower:
+            return 'Samsung Device'
+        elif 'xiaomi' in user_agent_lower:
+            return 'Xiaomi Device'
+        return 'Android Device'
+    else:
+        # Browser name; Chrome's user agent also mentions Safari, so check it first
+        if 'chrome' in user_agent_lower:
+            return 'Chrome Browser'
+        elif 'firefox' in user_agent_lower:
+            return 'Firefox Browser'
+        elif 'safari' in user_agent_lower:
+            return 'Safari Browser'
+        return 'Web Browser'
@@ -1,12 +1,9 @@
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import smtplib
 from typing import Optional, Callable
-import requests
 import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
 from app.core.config import settings
+from app.core.metrics import observe_queue_lag, timed_operation
 
 
 class MicrosoftGraphEmailService:
@@ -49,6 +46,8 @@ class MicrosoftGraphEmailService:
         }
         
         print(f"[Microsoft Graph] Acquiring access token via direct HTTP request...")
+        # requests is imported on first send to keep it out of application startup
+        import requests
         try:
             # Reduced timeout to 5 seconds for faster fallback to SMTP
             response = requests.post(token_url, data=data, headers=headers, timeout=5)
@@ -121,6 +120,7 @@ class MicrosoftGraphEmailService:
         }
         print(f"[Microsoft Graph] Request headers prepared (token: {access_token[:20]}...)")
         
+        import requests
         try:
             # Reduced timeout to 5 seconds for faster fallback to SMTP
             print(f"[Microsoft Graph] Making POST request...")
@@ -171,6 +171,7 @@ class SMTPEmailService:
         
     def _create_connection(self):
         """Create and return an SMTP connection with timeout."""
+        import smtplib
         print(f"[SMTP] Connecting to {self.smtp_host}:{self.smtp_port}...")
         server = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=10)
         print(f"[SMTP] Starting TLS...")
@@ -182,6 +183,9 @@ class SMTPEmailService:
     
     def send_email(self, to_email: str, subject: str, html_content: str) -> bool:
         """Send an email via SMTP."""
+        import smtplib
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
         try:
             print(f"[SMTP] Preparing email message...")
             message = MIMEMultipart("alternative")
@@ -375,10 +379,13 @@ def send_email_async(
     Returns:
         None (fire-and-forget, returns immediately)
     """
+    enqueued_at = time.perf_counter()
     def _send_sync():
+        observe_queue_lag("email", enqueued_at)
         try:
             print(f"[Background Email] Starting email send to {to_email}...")
-            success = email_service.send_email(to_email, subject, html_content)
+            with timed_operation("email_send"):
+                success = email_service.send_email(to_email, subject, html_content)
             if success:
                 print(f"[Background Email] ✓ Email sent successfully to {to_email}")
             else:
@@ -415,15 +422,18 @@ def send_otp_email_async(
     Returns:
         None (fire-and-forget, returns immediately)
     """
+    enqueued_at = time.perf_counter()
     def _send_sync():
+        observe_queue_lag("email", enqueued_at)
         try:
             print(f"[Background Email] Starting OTP email send to {to_email}...")
-            success = email_service.send_otp_email(
-                to_email=to_email,
-                otp_code=otp_code,
-                user_name=user_name,
-                subject=subject
-            )
+            with timed_operation("email_send"):
+                success = email_service.send_otp_email(
+                    to_email=to_email,
+                    otp_code=otp_code,
+                    user_name=user_name,
+                    subject=subject
+                )
             if success:
                 print(f"[Background Email] ✓ OTP email sent successfully to {to_email}")
             else:
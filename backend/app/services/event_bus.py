@@ -0,0 +1,310 @@
+"""
+In-process domain event bus for post-commit side effects.
+
+Endpoints describe what happened with a typed event and publish it against
+their session:
+
+    event_bus.publish_after_commit(db, DepositCompleted(...))
+    db.commit()
+
+The event is held in session.info and dispatched only once the commit
+succeeds; a rollback discards it. Side effects (notifications, alerts,
+logging) live in subscribers (see app/services/event_subscribers.py)
+instead of being repeated inline in every endpoint.
+
+Subscribers:
+- sync (default): run in the committing thread, right after the commit.
+  Keep them cheap, e.g. putting work on a queue.
+- background=True: run on a small thread pool, off the request path.
+- coroutine functions: scheduled on the running event loop when there is
+  one, otherwise run to completion on the thread pool.
+
+Each subscriber call is isolated: an exception is logged and does not reach
+the endpoint or the other subscribers. Every call is timed into
+operation_duration_seconds as "event_<Event>_<subscriber>".
+
+When EVENT_QUEUE_DIR is set every event is also appended (fsynced) to a
+JSON Lines file there before subscribers run, as a durable hand-off for
+consumers in other processes.
+
+Subscribers must not use the session that is committing; they get their
+own from event_bus.session().
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Type
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import observe_operation, observe_queue_lag
+
+logger = logging.getLogger(__name__)
+
+PENDING_EVENTS_KEY = "pending_domain_events"
+
+
+# --- Events -------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class DomainEvent:
+    occurred_at: datetime = field(default_factory=datetime.utcnow, kw_only=True)
+
+
+@dataclass(frozen=True)
+class TransferCompleted(DomainEvent):
+    transaction_id: str
+    sender_id: str
+    receiver_id: str
+    sender_email: str
+    receiver_email: str
+    amount: int
+    note: str
+    sender_balance: int
+    receiver_balance: int
+
+
+@dataclass(frozen=True)
+class DepositCompleted(DomainEvent):
+    transaction_id: str
+    user_id: str
+    amount: int
+    note: str
+    balance_after: int
+
+
+@dataclass(frozen=True)
+class WithdrawCompleted(DomainEvent):
+    transaction_id: str
+    user_id: str
+    amount: int
+    note: str
+    balance_after: int
+
+
+@dataclass(frozen=True)
+class BillPaid(DomainEvent):
+    transaction_id: str
+    bill_transaction_id: str
+    user_id: str
+    provider_id: str
+    customer_code: str
+    amount: int
+    note: str
+    balance_after: int
+
+
+@dataclass(frozen=True)
+class SavingsGoalMoneyMoved(DomainEvent):
+    """Money moved between the wallet and a savings goal ("deposit" or "withdraw")."""
+    transaction_id: str
+    user_id: str
+    goal_id: str
+    direction: str
+    amount: int
+    note: str
+    balance_after: int
+
+
+@dataclass(frozen=True)
+class LoginSucceeded(DomainEvent):
+    user_id: str
+    device_id: str
+    device_name: str
+    is_new_device: bool
+    ip_address: Optional[str] = None
+
+
+# --- Durable hand-off ---------------------------------------------------------
+
+def event_record(event: DomainEvent) -> dict:
+    data = asdict(event)
+    occurred_at = data.pop("occurred_at")
+    return {"type": type(event).__name__, "occurred_at": occurred_at.isoformat(), "data": data}
+
+
+class JsonlEventQueue:
+    """Appends events to one JSON Lines file per day, fsynced before returning."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def put(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        path = os.path.join(self.directory, f"events-{datetime.utcnow():%Y%m%d}.jsonl")
+        with self._lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+# --- Bus ----------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class _Subscriber:
+    handler: Callable
+    name: str
+    background: bool
+    is_coroutine: bool
+
+
+class EventBus:
+    """Dispatches domain events to subscribers after the publishing commit."""
+
+    def __init__(self, max_workers: Optional[int] = None, durable_queue=None):
+        self.max_workers = max_workers or settings.EVENT_BUS_WORKERS
+        self.durable_queue = durable_queue
+        self.session_factory: Callable[[], Session] = SessionLocal
+        # Tests set this so background subscribers finish before the response
+        self.run_background_inline = False
+        self._subscribers: Dict[Type[DomainEvent], List[_Subscriber]] = defaultdict(list)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._tasks = set()
+
+    # --- Registration -------------------------------------------------------
+
+    def subscribe(self, event_type: Type[DomainEvent], handler: Optional[Callable] = None, *,
+                  background: bool = False, name: Optional[str] = None):
+        """Register `handler` for `event_type` (and its subclasses). Usable as a decorator."""
+        def register(fn):
+            self._subscribers[event_type].append(_Subscriber(
+                handler=fn,
+                name=name or fn.__name__,
+                background=background,
+                is_coroutine=asyncio.iscoroutinefunction(fn),
+            ))
+            return fn
+        return register(handler) if handler is not None else register
+
+    def unsubscribe(self, event_type: Type[DomainEvent], handler: Callable) -> None:
+        self._subscribers[event_type] = [s for s in self._subscribers[event_type] if s.handler is not handler]
+
+    def subscribers(self, event_type: Type[DomainEvent]) -> List[_Subscriber]:
+        found = []
+        for cls in event_type.__mro__:
+            found.extend(self._subscribers.get(cls, ()))
+        return found
+
+    # --- Publishing ---------------------------------------------------------
+
+    def publish_after_commit(self, session: Session, event: DomainEvent) -> None:
+        """Dispatch `event` once `session` commits; drop it if the session rolls back."""
+        # Without an open transaction a rollback is a no-op and fires no
+        # rollback hook, which would leave the event for the next commit
+        if not session.in_transaction():
+            session.begin()
+        session.info.setdefault(PENDING_EVENTS_KEY, []).append(event)
+
+    def publish(self, event: DomainEvent) -> None:
+        """Dispatch `event` now."""
+        if self.durable_queue is not None:
+            try:
+                self.durable_queue.put(event_record(event))
+            except Exception as e:
+                logger.error(f"Could not hand off {type(event).__name__} to the durable queue: {e}")
+
+        for subscriber in self.subscribers(type(event)):
+            inline = not subscriber.background or self.run_background_inline
+            if subscriber.is_coroutine and inline and self._schedule_on_loop(subscriber, event):
+                continue
+            if subscriber.background and not self.run_background_inline:
+                self._submit(subscriber, event)
+            else:
+                self._call(subscriber, event)
+
+    # --- Execution ----------------------------------------------------------
+
+    def _call(self, subscriber: _Subscriber, event: DomainEvent, enqueued_at: Optional[float] = None) -> None:
+        if enqueued_at is not None:
+            observe_queue_lag("events", enqueued_at)
+        started = time.perf_counter()
+        try:
+            if subscriber.is_coroutine:
+                asyncio.run(subscriber.handler(event))
+            else:
+                subscriber.handler(event)
+        except Exception:
+            logger.exception(f"Subscriber {subscriber.name} failed on {type(event).__name__}")
+        finally:
+            self._observe(subscriber, event, started)
+
+    def _schedule_on_loop(self, subscriber: _Subscriber, event: DomainEvent) -> bool:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+
+        async def run():
+            started = time.perf_counter()
+            try:
+                await subscriber.handler(event)
+            except Exception:
+                logger.exception(f"Subscriber {subscriber.name} failed on {type(event).__name__}")
+            finally:
+                self._observe(subscriber, event, started)
+
+        task = loop.create_task(run())
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    def _submit(self, subscriber: _Subscriber, event: DomainEvent) -> None:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="events")
+        self._executor.submit(self._call, subscriber, event, time.perf_counter())
+
+    @staticmethod
+    def _observe(subscriber: _Subscriber, event: DomainEvent, started: float) -> None:
+        observe_operation(f"event_{type(event).__name__}_{subscriber.name}", time.perf_counter() - started)
+
+    @contextmanager
+    def session(self):
+        """A session of its own for a subscriber."""
+        db = self.session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Wait for background subscribers to finish."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+def _build_bus() -> EventBus:
+    durable_queue = JsonlEventQueue(settings.EVENT_QUEUE_DIR) if settings.EVENT_QUEUE_DIR else None
+    return EventBus(durable_queue=durable_queue)
+
+
+event_bus = _build_bus()
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_pending_events(session):
+    pending = session.info.pop(PENDING_EVENTS_KEY, None)
+    for domain_event in pending or ():
+        event_bus.publish(domain_event)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_events(session, previous_transaction):
+    session.info.pop(PENDING_EVENTS_KEY, None)
@@ -0,0 +1,117 @@
+"""
+Default subscribers of the domain event bus.
+
+Imported once by app.main; importing registers the handlers on event_bus.
+"""
+import logging
+
+from app.services.alert_engine import DIRECTION_IN, DIRECTION_OUT, LoginEvent, MoneyMovement, alert_engine
+from app.services.event_bus import (
+    BillPaid,
+    DepositCompleted,
+    DomainEvent,
+    LoginSucceeded,
+    SavingsGoalMoneyMoved,
+    TransferCompleted,
+    WithdrawCompleted,
+    event_bus,
+)
+from app.services.notification_service import create_transaction_notification
+
+logger = logging.getLogger(__name__)
+
+
+# --- Logging ----------------------------------------------------------------
+
+@event_bus.subscribe(DomainEvent)
+def log_event(event: DomainEvent) -> None:
+    transaction_id = getattr(event, "transaction_id", None)
+    amount = getattr(event, "amount", None)
+    if amount is not None:
+        logger.info(f"{type(event).__name__} {transaction_id}: {amount:,}₫")
+    else:
+        logger.info(f"{type(event).__name__} for user {getattr(event, 'user_id', '?')}")
+
+
+# --- Alerts (queued; evaluated by the alert engine's worker) ---------------------
+
+@event_bus.subscribe(TransferCompleted)
+def alert_on_transfer(event: TransferCompleted) -> None:
+    alert_engine.publish(MoneyMovement(
+        user_id=event.sender_id, direction=DIRECTION_OUT, amount=event.amount,
+        balance_after=event.sender_balance, note=event.note, transaction_id=event.transaction_id,
+        occurred_at=event.occurred_at,
+    ))
+    alert_engine.publish(MoneyMovement(
+        user_id=event.receiver_id, direction=DIRECTION_IN, amount=event.amount,
+        balance_after=event.receiver_balance, note=event.note, transaction_id=event.transaction_id,
+        occurred_at=event.occurred_at,
+    ))
+
+
+@event_bus.subscribe(DepositCompleted)
+def alert_on_deposit(event: DepositCompleted) -> None:
+    alert_engine.publish(MoneyMovement(
+        user_id=event.user_id, direction=DIRECTION_IN, amount=event.amount,
+        balance_after=event.balance_after, note=event.note, transaction_id=event.transaction_id,
+        occurred_at=event.occurred_at,
+    ))
+
+
+@event_bus.subscribe(WithdrawCompleted)
+@event_bus.subscribe(BillPaid)
+def alert_on_payment(event) -> None:
+    alert_engine.publish(MoneyMovement(
+        user_id=event.user_id, direction=DIRECTION_OUT, amount=event.amount,
+        balance_after=event.balance_after, note=event.note, transaction_id=event.transaction_id,
+        occurred_at=event.occurred_at,
+    ))
+
+
+@event_bus.subscribe(SavingsGoalMoneyMoved)
+def alert_on_savings(event: SavingsGoalMoneyMoved) -> None:
+    alert_engine.publish(MoneyMovement(
+        user_id=event.user_id,
+        direction=DIRECTION_OUT if event.direction == "deposit" else DIRECTION_IN,
+        amount=event.amount, balance_after=event.balance_after, note=event.note,
+        transaction_id=event.transaction_id, occurred_at=event.occurred_at,
+    ))
+
+
+@event_bus.subscribe(LoginSucceeded)
+def alert_on_login(event: LoginSucceeded) -> None:
+    alert_engine.publish(LoginEvent(
+        user_id=event.user_id, device_id=event.device_id, device_name=event.device_name,
+        is_new_device=event.is_new_device, ip_address=event.ip_address, occurred_at=event.occurred_at,
+    ))
+
+
+# --- Notifications (own session, off the request path) --------------------------
+
+@event_bus.subscribe(TransferCompleted, background=True)
+def notify_transfer(event: TransferCompleted) -> None:
+    with event_bus.session() as db:
+        create_transaction_notification(
+            db=db, user_id=event.sender_id, transaction_type='transfer_out',
+            amount=event.amount, note=f"Chuyển đến {event.receiver_email}",
+        )
+        create_transaction_notification(
+            db=db, user_id=event.receiver_id, transaction_type='transfer_in',
+            amount=event.amount, note=f"Nhận từ {event.sender_email}",
+        )
+
+
+@event_bus.subscribe(DepositCompleted, background=True)
+def notify_deposit(event: DepositCompleted) -> None:
+    with event_bus.session() as db:
+        create_transaction_notification(
+            db=db, user_id=event.user_id, transaction_type='deposit', amount=event.amount, note=event.note,
+        )
+
+
+@event_bus.subscribe(WithdrawCompleted, background=True)
+def notify_withdraw(event: WithdrawCompleted) -> None:
+    with event_bus.session() as db:
+        create_transaction_notification(
+            db=db, user_id=event.user_id, transaction_type='withdraw', amount=event.amount, note=event.note,
+        )
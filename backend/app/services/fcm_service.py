@@ -1,17 +1,27 @@
 """
 Firebase Cloud Messaging (FCM) service for sending push notifications.
+
+firebase_admin (and the google-auth/httpx stack behind it) is imported on
+first use rather than at module import, so it stays out of application
+startup. warm_up_firebase() initializes it in a background thread when the
+app starts, so the first push does not pay for the import and credential
+loading either.
 """
 import logging
 import os
-from typing import Optional, Dict, Any, List
-from firebase_admin import messaging, credentials, initialize_app, get_app, App
+import threading
+from typing import TYPE_CHECKING, Optional, Dict, Any, List
+
+if TYPE_CHECKING:
+    from firebase_admin import App
 
 logger = logging.getLogger(__name__)
 
-_firebase_app: Optional[App] = None
+_firebase_app: Optional["App"] = None
+_init_lock = threading.Lock()
 
 
-def initialize_firebase() -> Optional[App]:
+def initialize_firebase() -> Optional["App"]:
     """
     Initialize Firebase Admin SDK.
     
@@ -26,12 +36,21 @@ def initialize_firebase() -> Optional[App]:
     
     if _firebase_app is not None:
         return _firebase_app
-    
+
+    with _init_lock:
+        if _firebase_app is None:
+            _firebase_app = _initialize_firebase_app()
+    return _firebase_app
+
+
+def _initialize_firebase_app() -> Optional["App"]:
+    from firebase_admin import credentials, initialize_app, get_app
+
     try:
         # Try to get existing app
-        _firebase_app = get_app()
+        firebase_app = get_app()
         logger.info("Firebase app already initialized")
-        return _firebase_app
+        return firebase_app
     except ValueError:
         # App doesn't exist, need to initialize
         pass
@@ -53,14 +72,28 @@ def initialize_firebase() -> Optional[App]:
     
     try:
         cred = credentials.Certificate(cred_path)
-        _firebase_app = initialize_app(cred)
+        firebase_app = initialize_app(cred)
         logger.info(f"Firebase initialized successfully from {cred_path}")
-        return _firebase_app
+        return firebase_app
     except Exception as e:
         logger.error(f"Failed to initialize Firebase: {e}")
         return None
 
 
+def warm_up_firebase() -> threading.Thread:
+    """Import firebase_admin and initialize the app in a background thread."""
+    def _warm_up():
+        try:
+            if initialize_firebase() is not None:
+                from firebase_admin import messaging  # noqa: F401
+        except Exception as e:
+            logger.error(f"Firebase warm-up failed: {e}")
+
+    thread = threading.Thread(target=_warm_up, name="firebase-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
 def send_push_notification(
     device_token: str,
     title: str,
@@ -88,6 +121,8 @@ def send_push_notification(
     if app is None:
         logger.warning("Firebase not initialized, cannot send push notification")
         return False
+
+    from firebase_admin import messaging
     
     try:
         # Build the message
@@ -138,6 +173,8 @@ def send_multicast_notification(
     if app is None:
         logger.warning("Firebase not initialized, cannot send push notification")
         return {"success_count": 0, "failure_count": len(device_tokens)}
+
+    from firebase_admin import messaging
     
     try:
         message = messaging.MulticastMessage(
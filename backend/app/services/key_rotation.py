@@ -0,0 +1,277 @@
+"""
+Re-encryption job for encryption key rotation.
+
+Once ENCRYPTION_KEY is changed and the previous key moved to
+ENCRYPTION_OLD_KEYS, the app decrypts old values and writes new ones with
+the new key. This job rewrites the values already stored, while the API
+keeps running:
+- rows are streamed in primary-key order, KEY_ROTATION_CHUNK_SIZE at a
+  time (keyset pagination, so each chunk is an index range scan), and
+  each chunk is written in its own short transaction
+- decryption and re-encryption run in a process pool when workers > 1
+- each UPDATE is guarded on the ciphertexts that were read, so a row the
+  API rewrote in the meantime (with the current key already) is left
+  alone and counted as a conflict
+- the job sleeps between chunks to stay under KEY_ROTATION_ROWS_PER_SECOND
+- after every chunk the last id and the unreadable count so far per table
+  are saved to a JSON checkpoint (KEY_ROTATION_CHECKPOINT_PATH), so a
+  stopped or crashed run resumes where it left off and still reports the
+  unreadable values seen before the stop. The checkpoint belongs to the
+  current master key; a run for a newer key starts over.
+
+Values that already use the current key and format are not rewritten, so
+re-running is harmless. Values no configured key can decrypt are left
+untouched, logged with their row id and counted as unreadable; the old
+key must stay in ENCRYPTION_OLD_KEYS until a run reports none. A finished
+table is skipped by later runs only if it had no unreadable values;
+otherwise it is scanned again, so the count reflects what is stored now.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import String, select
+from sqlalchemy.orm import Session
+
+from app.core.bulk_update import keyed_update
+from app.core.config import settings
+from app.core.encryption import EncryptionService, encryption_service
+from app.models import BankCard, Transaction
+
+logger = logging.getLogger(__name__)
+
+UNREADABLE = "\x00unreadable"  # stands in for a value no key could decrypt
+
+
+@dataclass
+class RotationTarget:
+    """Encrypted columns of one table."""
+    model: type
+    columns: Tuple[str, ...]
+
+    @property
+    def table_name(self) -> str:
+        return self.model.__tablename__
+
+
+@dataclass
+class RotationResult:
+    """Outcome of re-encrypting one table."""
+    table: str
+    scanned: int = 0
+    rotated: int = 0
+    conflicts: int = 0
+    unreadable: int = 0
+    chunks: int = 0
+    elapsed_seconds: float = 0.0
+    resumed_from: Optional[str] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return float(self.scanned)
+        return self.scanned / self.elapsed_seconds
+
+
+def get_default_targets() -> List[RotationTarget]:
+    return [
+        RotationTarget(Transaction, ("encrypted_note",)),
+        RotationTarget(BankCard, ("card_number_encrypted", "expiry_date_encrypted", "cvv_encrypted")),
+    ]
+
+
+def rotate_values(service: EncryptionService, tokens: Sequence[Optional[str]]) -> List[Optional[str]]:
+    """New ciphertext per token; None where it is current already, UNREADABLE where no key decrypts it."""
+    rotated = []
+    for token in tokens:
+        try:
+            rotated.append(service.rotate(token))
+        except ValueError:
+            rotated.append(UNREADABLE)
+    return rotated
+
+
+_worker_service: Optional[EncryptionService] = None
+
+
+def _init_worker(service: EncryptionService) -> None:
+    global _worker_service
+    _worker_service = service
+
+
+def _rotate_in_worker(tokens: List[Optional[str]]) -> List[Optional[str]]:
+    return rotate_values(_worker_service, tokens)
+
+
+class KeyRotationJob:
+    """Re-encrypts stored values with the current key in throttled, checkpointed chunks."""
+
+    def __init__(
+        self,
+        service: Optional[EncryptionService] = None,
+        chunk_size: Optional[int] = None,
+        workers: int = 1,
+        rows_per_second: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+        targets: Optional[List[RotationTarget]] = None,
+    ):
+        self.service = service or encryption_service
+        self.chunk_size = chunk_size or settings.KEY_ROTATION_CHUNK_SIZE
+        self.workers = max(1, workers)
+        self.rows_per_second = settings.KEY_ROTATION_ROWS_PER_SECOND if rows_per_second is None else rows_per_second
+        self.checkpoint_path = checkpoint_path or settings.KEY_ROTATION_CHECKPOINT_PATH
+        self.targets = targets or get_default_targets()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    # --- Checkpoint ---------------------------------------------------------
+
+    @property
+    def key_fingerprint(self) -> str:
+        return hashlib.sha256(self.service.master_key).hexdigest()[:16]
+
+    def load_checkpoint(self) -> Dict:
+        """Progress of the current key's rotation: {"tables": {name: {"last_id", "done", "unreadable"}}}."""
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            checkpoint = {}
+        if checkpoint.get("key") != self.key_fingerprint:
+            return {"key": self.key_fingerprint, "tables": {}}
+        return checkpoint
+
+    def save_checkpoint(self, checkpoint: Dict) -> None:
+        # Written to a temporary file and renamed, so a crash never leaves half a checkpoint
+        directory = os.path.dirname(os.path.abspath(self.checkpoint_path))
+        os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.checkpoint_path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f, indent=2)
+        os.replace(temporary, self.checkpoint_path)
+
+    # --- Crypto -------------------------------------------------------------
+
+    def _rotate(self, tokens: List[Optional[str]]) -> List[Optional[str]]:
+        if self.workers == 1 or len(tokens) < self.workers:
+            return rotate_values(self.service, tokens)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(self.service,),
+            )
+        size = -(-len(tokens) // self.workers)
+        slices = [tokens[i:i + size] for i in range(0, len(tokens), size)]
+        return [token for rotated in self._pool.map(_rotate_in_worker, slices) for token in rotated]
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    # --- Tables -------------------------------------------------------------
+
+    def _throttle(self, rows: int, started: float) -> None:
+        if self.rows_per_second <= 0:
+            return
+        ahead = rows / self.rows_per_second - (time.perf_counter() - started)
+        if ahead > 0:
+            time.sleep(ahead)
+
+    def rotate_chunk(self, db: Session, target: RotationTarget, rows, result: RotationResult) -> None:
+        """Re-encrypt one chunk of rows and commit."""
+        columns = target.columns
+        tokens = [row[name] for row in rows for name in columns]
+        rotated = iter(self._rotate(tokens))
+
+        updates = []
+        for row in rows:
+            changed = {}
+            for name in columns:
+                new = next(rotated)
+                if new == UNREADABLE:
+                    result.unreadable += 1
+                    logger.warning(f"Cannot decrypt {target.table_name}.{name} of row {row['id']} with any configured key")
+                elif new is not None:
+                    changed[name] = new
+            if changed:
+                update = {"id": row["id"]}
+                for name in columns:
+                    update[f"old_{name}"] = row[name]
+                    update[f"new_{name}"] = changed.get(name, row[name])
+                updates.append(update)
+
+        if updates:
+            def build(table, src):
+                assignments = {name: src[f"new_{name}"] for name in columns}
+                # Rows changed since they were read already hold current ciphertexts
+                conditions = [table.c[name].is_not_distinct_from(src[f"old_{name}"]) for name in columns]
+                return assignments, conditions
+
+            update_columns = [("id", String())]
+            for name in columns:
+                update_columns += [(f"old_{name}", String()), (f"new_{name}", String())]
+            try:
+                matched = keyed_update(db, target.model.__table__, "id", update_columns, updates, build)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            result.rotated += matched
+            result.conflicts += len(updates) - matched
+        else:
+            db.rollback()  # ends the read transaction
+        result.scanned += len(rows)
+        result.chunks += 1
+
+    def rotate_table(self, db: Session, target: RotationTarget, checkpoint: Dict) -> RotationResult:
+        """Re-encrypt one table from its checkpoint to the end."""
+        table = target.model.__table__
+        progress = checkpoint["tables"].setdefault(target.table_name, {"last_id": None, "done": False, "unreadable": 0})
+        if progress["done"]:
+            if not progress.get("unreadable"):
+                return RotationResult(table=target.table_name, resumed_from=progress["last_id"])
+            # Unreadable values may have been fixed (or a key added) since: count them again
+            progress.update(last_id=None, done=False, unreadable=0)
+        # Values found unreadable before a stop are not scanned again but still count
+        result = RotationResult(
+            table=target.table_name, resumed_from=progress["last_id"], unreadable=progress.get("unreadable", 0),
+        )
+
+        started = time.perf_counter()
+        query = select(table.c.id, *[table.c[name] for name in target.columns]).order_by(table.c.id)
+        while True:
+            chunk_query = query
+            if progress["last_id"] is not None:
+                chunk_query = chunk_query.where(table.c.id > progress["last_id"])
+            rows = db.execute(chunk_query.limit(self.chunk_size)).mappings().all()
+            if not rows:
+                break
+
+            self.rotate_chunk(db, target, rows, result)
+            progress["last_id"] = rows[-1]["id"]
+            progress["unreadable"] = result.unreadable
+            self.save_checkpoint(checkpoint)
+            if len(rows) < self.chunk_size:
+                break
+            self._throttle(result.scanned, started)
+
+        progress["done"] = True
+        self.save_checkpoint(checkpoint)
+        result.elapsed_seconds = time.perf_counter() - started
+        logger.info(
+            f"Re-encrypted {result.rotated} of {result.scanned} {result.table} rows "
+            f"({result.conflicts} conflicts, {result.unreadable} unreadable values)"
+        )
+        return result
+
+    def run(self, db: Session, restart: bool = False) -> List[RotationResult]:
+        """Re-encrypt every target table, resuming from the checkpoint unless `restart`."""
+        checkpoint = {"key": self.key_fingerprint, "tables": {}} if restart else self.load_checkpoint()
+        try:
+            return [self.rotate_table(db, target, checkpoint) for target in self.targets]
+        finally:
+            self.close()
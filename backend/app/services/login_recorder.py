@@ -0,0 +1,342 @@
+"""
+Login recorder: write-behind for the device and audit rows of a login.
+
+The login endpoint only checks credentials and issues tokens; it hands the
+rest to record(), which puts a LoginRecord on an in-memory queue. A
+background worker drains the queue in batches (LOGIN_RECORD_BATCH_SIZE
+logins or LOGIN_RECORD_FLUSH_INTERVAL_MS, whichever comes first) and, in
+one transaction per batch:
+- resolves each (user, device fingerprint) to a device, from memory or
+  with a single SELECT on the (user_id, fingerprint) index for the whole
+  batch, inserts unknown devices and reactivates removed ones
+- updates last_login, debounced: a device whose last_login was written
+  less than DEVICE_LAST_LOGIN_DEBOUNCE_SECONDS before is not touched
+  again, and several logins of one device in a batch become one update
+- inserts one security_history row per login (never debounced)
+Each statement is a single executemany. LoginSucceeded is published after
+the batch commits, so new-device alerts follow the batch.
+
+Durability: a login is acknowledged before its rows are written. Until its
+batch commits it exists only in this process, so a crash can lose at most
+the logins of the last flush interval (plus whatever is queued behind a
+slow database). A graceful shutdown drains the queue (stop() in the app
+lifespan). A batch that fails is retried once; if that fails too, every
+login in it is logged at ERROR level with its user, IP and time so the
+audit trail can be rebuilt from the logs.
+
+Commits that change UserDevice rows through the ORM (renaming, removing
+or deactivating a device) drop that user's cached devices.
+"""
+import logging
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, event, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import observe_operation, observe_queue_lag
+from app.models import SecurityHistory, UserDevice
+from app.services.device_detection import device_fingerprint
+from app.services.event_bus import LoginSucceeded, event_bus
+
+logger = logging.getLogger(__name__)
+
+# Cached device ids; cleared wholesale past this size
+MAX_CACHED_DEVICES = 100_000
+
+DeviceKey = Tuple[str, str]  # (user_id, device fingerprint)
+
+
+@dataclass(frozen=True)
+class LoginRecord:
+    """A successful login, waiting to be written."""
+    user_id: str
+    ip_address: Optional[str]
+    user_agent: str
+    device_type: str
+    device_name: str
+    occurred_at: datetime = field(default_factory=datetime.utcnow)
+
+    @property
+    def device_key(self) -> DeviceKey:
+        return (self.user_id, device_fingerprint(self.ip_address, self.user_agent))
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+_touch_device = (
+    UserDevice.__table__.update()
+    .where(UserDevice.__table__.c.id == bindparam("device_id"))
+    .values(last_login=bindparam("last_login"))
+)
+_reactivate_device = (
+    UserDevice.__table__.update()
+    .where(UserDevice.__table__.c.id == bindparam("device_id"))
+    .values(is_active=True, device_name=bindparam("device_name"), device_type=bindparam("device_type"),
+            last_login=bindparam("last_login"))
+)
+
+
+class LoginRecorder:
+    """Writes device touches and security history for logins in batches."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+        debounce_seconds: Optional[float] = None,
+        background: bool = True,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.LOGIN_RECORD_BATCH_SIZE
+        self.flush_interval = (flush_interval_ms or settings.LOGIN_RECORD_FLUSH_INTERVAL_MS) / 1000
+        self.debounce_seconds = (
+            debounce_seconds if debounce_seconds is not None else settings.DEVICE_LAST_LOGIN_DEBOUNCE_SECONDS
+        )
+        self.background = background
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._devices: Dict[DeviceKey, str] = {}
+        self._last_written: Dict[str, datetime] = {}  # device_id -> last_login as written
+        self._worker: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._start_lock = threading.Lock()
+        self._process_lock = threading.Lock()
+
+    # --- Request path -------------------------------------------------------
+
+    def record(self, login: LoginRecord) -> None:
+        """Queue a login to be written."""
+        self._queue.put((time.perf_counter(), login))
+        if self.background and self._worker is None:
+            self._start_worker()
+
+    def _start_worker(self) -> None:
+        with self._start_lock:
+            if self._worker is None:
+                self._stopping.clear()
+                self._worker = threading.Thread(target=self._run, name="login-recorder", daemon=True)
+                self._worker.start()
+
+    # --- Cache invalidation -------------------------------------------------
+
+    def invalidate_devices(self, user_id: Optional[str] = None) -> None:
+        if user_id is None:
+            self._devices = {}
+            self._last_written = {}
+            return
+        for key in [key for key in self._devices if key[0] == user_id]:
+            self._last_written.pop(self._devices.pop(key, None), None)
+
+    def reset(self) -> None:
+        """Drop queued logins and cached devices."""
+        while self._drain(self.batch_size):
+            pass
+        self.invalidate_devices()
+
+    # --- Worker -------------------------------------------------------------
+
+    def _drain(self, limit: int) -> List[tuple]:
+        items = []
+        while len(items) < limit:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._process_safely(batch)
+
+    def _process_safely(self, batch: List[tuple]) -> int:
+        for attempt in (1, 2):
+            try:
+                return self.process(batch)
+            except Exception as e:
+                # The cache may now name devices that were never inserted
+                self.invalidate_devices()
+                if attempt == 1:
+                    logger.warning(f"Login batch of {len(batch)} failed, retrying: {e}")
+                    continue
+                logger.error(f"Login recorder dropped {len(batch)} logins: {e}")
+                for _, login in batch:
+                    logger.error(
+                        f"Unrecorded login: user={login.user_id} ip={login.ip_address} "
+                        f"at={login.occurred_at.isoformat()} agent={login.user_agent!r}"
+                    )
+        return 0
+
+    def flush(self) -> int:
+        """Write everything queued now, in the calling thread. Returns logins written."""
+        written = 0
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                return written
+            written += self._process_safely(batch)
+
+    def stop(self) -> None:
+        """Stop the worker and write what is still queued."""
+        worker = self._worker
+        if worker is not None:
+            self._stopping.set()
+            worker.join(timeout=5)
+            self._worker = None
+        self.flush()
+
+    # --- Writing ------------------------------------------------------------
+
+    def process(self, batch: List[tuple]) -> int:
+        """Write a batch of (enqueued_at, LoginRecord) in one transaction."""
+        with self._process_lock:
+            started = time.perf_counter()
+            for enqueued_at, _ in batch:
+                observe_queue_lag("logins", enqueued_at)
+            logins = [login for _, login in batch]
+            db = self.session_factory()
+            try:
+                keys = [login.device_key for login in logins]
+                inactive = self._resolve_devices(db, keys)
+                new_devices, reactivated, touches, history = [], [], {}, []
+                for login, key in zip(logins, keys):
+                    device_id = self._devices.get(key)
+                    is_new_device = device_id is None
+                    if is_new_device:
+                        # A removed device that logs in again is reactivated, and alerted on like a new one
+                        device_id = inactive.pop(key, None)
+                        row = {
+                            "device_id": device_id or str(uuid.uuid4()),
+                            "device_name": login.device_name,
+                            "device_type": login.device_type,
+                            "last_login": login.occurred_at,
+                        }
+                        if device_id is not None:
+                            reactivated.append(row)
+                        else:
+                            device_id = row["device_id"]
+                            new_devices.append({
+                                **row,
+                                "user_id": login.user_id,
+                                "ip_address": login.ip_address,
+                                "user_agent": login.user_agent,
+                                "fingerprint": key[1],
+                                "created_at": login.occurred_at,
+                                "is_active": True,
+                            })
+                        self._devices[key] = device_id
+                        self._last_written[device_id] = login.occurred_at
+                    elif self._due_for_touch(device_id, login.occurred_at):
+                        self._last_written[device_id] = login.occurred_at
+                        touches[device_id] = login.occurred_at
+                    history.append({
+                        "id": str(uuid.uuid4()),
+                        "user_id": login.user_id,
+                        "action_type": "LOGIN",
+                        "description": f"Đăng nhập từ {login.device_name}",
+                        "ip_address": login.ip_address,
+                        "user_agent": login.user_agent,
+                        "device_id": device_id,
+                        "created_at": login.occurred_at,
+                    })
+                    event_bus.publish_after_commit(db, LoginSucceeded(
+                        user_id=login.user_id, device_id=device_id, device_name=login.device_name,
+                        is_new_device=is_new_device, ip_address=login.ip_address, occurred_at=login.occurred_at,
+                    ))
+
+                if new_devices:
+                    db.execute(UserDevice.__table__.insert(), [
+                        {"id": row.pop("device_id"), **row} for row in new_devices
+                    ])
+                if reactivated:
+                    db.execute(_reactivate_device, reactivated)
+                if touches:
+                    db.execute(_touch_device, [
+                        {"device_id": device_id, "last_login": at} for device_id, at in touches.items()
+                    ])
+                db.execute(SecurityHistory.__table__.insert(), history)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+            observe_operation("login_record_batch", time.perf_counter() - started)
+            return len(logins)
+
+    def _resolve_devices(self, db: Session, keys: List[DeviceKey]) -> Dict[DeviceKey, str]:
+        """
+        Look up, in one query, the devices of this batch that aren't cached.
+
+        Active devices go into the cache; removed ones are returned so they
+        can be reactivated.
+        """
+        missing = {key for key in keys if key not in self._devices}
+        if not missing:
+            return {}
+        if len(self._devices) > MAX_CACHED_DEVICES:
+            self.invalidate_devices()
+        rows = db.execute(
+            select(UserDevice.id, UserDevice.user_id, UserDevice.fingerprint, UserDevice.is_active,
+                   UserDevice.last_login)
+            .where(tuple_(UserDevice.user_id, UserDevice.fingerprint).in_(missing))
+        ).all()
+        inactive = {}
+        for row in rows:
+            key = (row.user_id, row.fingerprint)
+            if row.is_active:
+                self._devices[key] = row.id
+                self._last_written[row.id] = _naive_utc(row.last_login)
+            else:
+                inactive[key] = row.id
+        return inactive
+
+    def _due_for_touch(self, device_id: str, at: datetime) -> bool:
+        last = self._last_written.get(device_id)
+        return last is None or (at - last).total_seconds() >= self.debounce_seconds
+
+
+login_recorder = LoginRecorder()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_device_changes(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, UserDevice):
+            session.info.setdefault("device_users", set()).add(obj.user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_device_cache(session):
+    for user_id in session.info.pop("device_users", ()):
+        login_recorder.invalidate_devices(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_device_changes(session):
+    session.info.pop("device_users", None)
@@ -4,10 +4,12 @@ Service for creating and sending notifications.
 import json
 import logging
 import threading
+import time
 from typing import Optional
 from sqlalchemy.orm import Session
 from app.models import Notification, NotificationSettings
 from app.services.fcm_service import send_push_notification
+from app.core.metrics import observe_queue_lag, timed_operation
 
 logger = logging.getLogger(__name__)
 
@@ -56,7 +58,7 @@ def create_transaction_notification(
     db: Session,
     user_id: str,
     transaction_type: str,  # 'deposit', 'withdraw', 'transfer_in', 'transfer_out'
-    amount: float,
+    amount: int,
     note: Optional[str] = None
 ) -> Optional[Notification]:
     """
@@ -76,19 +78,19 @@ def create_transaction_notification(
     # Determine title and message based on transaction type
     if transaction_type == 'deposit':
         title = "Nạp tiền thành công"
-        message = f"Bạn đã nạp {amount:,.0f}₫ vào ví"
+        message = f"Bạn đã nạp {amount:,}₫ vào ví"
     elif transaction_type == 'withdraw':
         title = "Rút tiền thành công"
-        message = f"Bạn đã rút {amount:,.0f}₫ từ ví"
+        message = f"Bạn đã rút {amount:,}₫ từ ví"
     elif transaction_type == 'transfer_in':
         title = "Nhận tiền"
-        message = f"Bạn đã nhận {amount:,.0f}₫"
+        message = f"Bạn đã nhận {amount:,}₫"
     elif transaction_type == 'transfer_out':
         title = "Chuyển tiền thành công"
-        message = f"Bạn đã chuyển {amount:,.0f}₫"
+        message = f"Bạn đã chuyển {amount:,}₫"
     else:
         title = "Giao dịch mới"
-        message = f"Giao dịch {amount:,.0f}₫ đã được thực hiện"
+        message = f"Giao dịch {amount:,}₫ đã được thực hiện"
     
     if note:
         message += f": {note}"
@@ -120,14 +122,17 @@ def create_transaction_notification(
             notification_data["note"] = note
         
         # Send push notification in background thread to avoid blocking
+        enqueued_at = time.perf_counter()
         def send_notification_background():
+            observe_queue_lag("push", enqueued_at)
             try:
-                send_push_notification(
-                    device_token=settings.device_token,
-                    title=title,
-                    body=message,
-                    data=notification_data
-                )
+                with timed_operation("fcm_send"):
+                    send_push_notification(
+                        device_token=settings.device_token,
+                        title=title,
+                        body=message,
+                        data=notification_data
+                    )
             except Exception as e:
                 # Don't fail notification creation if push fails
                 logger.error(f"Failed to send push notification for user {user_id}: {e}")
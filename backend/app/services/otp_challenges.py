@@ -0,0 +1,258 @@
+"""
+OTP challenge store.
+
+Each OTP the app sends is a row in otp_challenges: who it is for, what it
+is for (purpose), what it confirms (target: the receiver of a transfer,
+the card being verified, ...), a keyed hash of the code, the wrong
+attempts so far and when it expires. A user can have one outstanding
+challenge per purpose and target, and none of this touches the users row,
+which every authenticated request reads.
+
+issue() replaces any earlier challenge for the same purpose and target and
+returns the code to send. verify() returns one of the OTP_* statuses:
+- challenges are served from an in-memory cache, filled when the issuing
+  transaction commits and on a miss from the database (e.g. the challenge
+  was issued by another worker). Expired entries are dropped on access and
+  by purge_expired().
+- a wrong code is counted with a single UPDATE ... SET attempts =
+  attempts + 1 on the challenge row, on its own connection and committed
+  right away, so it survives the request failing without committing
+  anything the caller has pending; after OTP_MAX_ATTEMPTS the challenge is
+  locked until a new one is issued
+- a correct code deletes the challenge in the caller's transaction. The
+  DELETE must hit the row and only takes it while it is not locked, so a
+  code can't be used twice even when two workers both have it cached, and
+  attempts counted by another worker still lock it.
+
+purge_expired() deletes expired challenges in batches; it runs with the
+other retention jobs in purge_old_records.py.
+"""
+import hashlib
+import hmac
+import logging
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, event, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import OtpChallenge
+from app.services.otp import otp_service
+
+logger = logging.getLogger(__name__)
+
+OTP_PURPOSE_REGISTRATION = "REGISTRATION"
+OTP_PURPOSE_TRANSFER = "TRANSFER"
+OTP_PURPOSE_BANK_CARD = "BANK_CARD"
+
+OTP_OK = "OK"
+OTP_MISSING = "MISSING"
+OTP_EXPIRED = "EXPIRED"
+OTP_INVALID = "INVALID"
+OTP_LOCKED = "LOCKED"
+
+PENDING_CHALLENGES_KEY = "pending_otp_challenges"
+
+ChallengeKey = Tuple[str, str, str]  # (user_id, purpose, target)
+
+
+@dataclass
+class _Challenge:
+    id: str
+    code_hash: str
+    expires_at: datetime
+    attempts: int = 0
+
+
+def _hash_code(challenge_id: str, code: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), f"{challenge_id}:{code}".encode(), hashlib.sha256).hexdigest()
+
+
+class OtpChallengeStore:
+    """Issues and checks OTP challenges; in-memory cache in front of otp_challenges."""
+
+    def __init__(self, max_attempts: Optional[int] = None, max_entries: Optional[int] = None):
+        self.max_attempts = max_attempts or settings.OTP_MAX_ATTEMPTS
+        self.max_entries = max_entries or settings.OTP_CACHE_MAX_ENTRIES
+        self._cache: Dict[ChallengeKey, _Challenge] = {}
+        self._lock = threading.Lock()
+
+    # --- Issuing ------------------------------------------------------------
+
+    def issue(self, db: Session, user_id: str, purpose: str, target: str = "",
+              ttl_minutes: Optional[float] = None) -> str:
+        """Create a challenge, replacing any earlier one for the same purpose and target; returns the code."""
+        key = (user_id, purpose, target)
+        now = datetime.utcnow()
+        code = otp_service.generate_otp(otp_service.generate_secret())
+        challenge_id = str(uuid.uuid4())
+        challenge = _Challenge(
+            id=challenge_id,
+            code_hash=_hash_code(challenge_id, code),
+            expires_at=now + timedelta(minutes=ttl_minutes or settings.OTP_EXPIRY_MINUTES),
+        )
+        table = OtpChallenge.__table__
+        db.execute(delete(table).where(self._matches(key)))
+        db.execute(table.insert().values(
+            id=challenge.id, user_id=user_id, purpose=purpose, target=target,
+            code_hash=challenge.code_hash, attempts=0, expires_at=challenge.expires_at, created_at=now,
+        ))
+        self._evict(key)
+        # Cached once the caller commits; until then only this transaction can see it
+        db.info.setdefault(PENDING_CHALLENGES_KEY, []).append((key, challenge))
+        return code
+
+    # --- Verifying ----------------------------------------------------------
+
+    def verify(self, db: Session, user_id: str, purpose: str, code: str, target: str = "") -> str:
+        """Check `code`; returns an OTP_* status. On OTP_OK the challenge is deleted with the caller's commit."""
+        key = (user_id, purpose, target)
+        now = datetime.utcnow()
+        challenge = self._cached(key)
+        from_cache = challenge is not None
+        if challenge is None:
+            challenge = self._load(db, key)
+            if challenge is None:
+                return OTP_MISSING
+
+        if challenge.expires_at <= now:
+            self._evict(key, challenge.id)
+            return OTP_EXPIRED
+        if challenge.attempts >= self.max_attempts:
+            return OTP_LOCKED
+
+        if not hmac.compare_digest(challenge.code_hash, _hash_code(challenge.id, code or "")):
+            if from_cache:
+                # Another worker may have issued a newer challenge or counted attempts
+                fresh = self._load(db, key)
+                if fresh is None:
+                    self._evict(key, challenge.id)
+                    return OTP_MISSING
+                if fresh.id != challenge.id:
+                    return self.verify(db, user_id, purpose, code, target)
+                challenge = fresh
+                if challenge.attempts >= self.max_attempts:
+                    return OTP_LOCKED
+            return self._record_attempt(db, challenge)
+
+        table = OtpChallenge.__table__
+        # The cached attempts may be stale, so the row's own count decides whether it is locked
+        consumed = db.execute(
+            delete(table).where(table.c.id == challenge.id, table.c.attempts < self.max_attempts)
+        ).rowcount
+        if consumed:
+            self._evict(key, challenge.id)
+            return OTP_OK
+        attempts = db.execute(select(table.c.attempts).where(table.c.id == challenge.id)).scalar()
+        if attempts is None:
+            self._evict(key, challenge.id)
+            return OTP_MISSING
+        challenge.attempts = attempts
+        return OTP_LOCKED
+
+    def _record_attempt(self, db: Session, challenge: _Challenge) -> str:
+        table = OtpChallenge.__table__
+        statement = update(table).where(table.c.id == challenge.id).values(attempts=table.c.attempts + 1)
+        # Committed on a connection of its own: the caller's transaction stays untouched
+        with db.get_bind(clause=statement).begin() as conn:
+            conn.execute(statement)
+            attempts = conn.execute(select(table.c.attempts).where(table.c.id == challenge.id)).scalar()
+        if attempts is None:
+            return OTP_MISSING
+        challenge.attempts = attempts
+        return OTP_LOCKED if challenge.attempts >= self.max_attempts else OTP_INVALID
+
+    # --- Cache --------------------------------------------------------------
+
+    @staticmethod
+    def _matches(key: ChallengeKey):
+        table = OtpChallenge.__table__
+        user_id, purpose, target = key
+        return and_(table.c.user_id == user_id, table.c.purpose == purpose, table.c.target == target)
+
+    def _load(self, db: Session, key: ChallengeKey) -> Optional[_Challenge]:
+        table = OtpChallenge.__table__
+        row = db.execute(
+            select(table.c.id, table.c.code_hash, table.c.expires_at, table.c.attempts).where(self._matches(key))
+        ).first()
+        if row is None:
+            return None
+        challenge = _Challenge(id=row.id, code_hash=row.code_hash, expires_at=row.expires_at, attempts=row.attempts)
+        self._put(key, challenge)
+        return challenge
+
+    def _cached(self, key: ChallengeKey) -> Optional[_Challenge]:
+        with self._lock:
+            return self._cache.get(key)
+
+    def _put(self, key: ChallengeKey, challenge: _Challenge) -> None:
+        with self._lock:
+            if key not in self._cache and len(self._cache) >= self.max_entries:
+                self._drop_expired(datetime.utcnow())
+                while len(self._cache) >= self.max_entries:
+                    # Oldest first; anything dropped is still in the database
+                    self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = challenge
+
+    def _evict(self, key: ChallengeKey, challenge_id: Optional[str] = None) -> None:
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and (challenge_id is None or cached.id == challenge_id):
+                del self._cache[key]
+
+    def _drop_expired(self, now: datetime) -> None:
+        for key in [key for key, challenge in self._cache.items() if challenge.expires_at <= now]:
+            del self._cache[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache = {}
+
+    # --- Cleanup ------------------------------------------------------------
+
+    def purge_expired(self, db: Session, now: Optional[datetime] = None, batch_size: Optional[int] = None) -> int:
+        """Delete expired challenges in batches, one short transaction each. Returns rows deleted."""
+        now = now or datetime.utcnow()
+        batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+        with self._lock:
+            self._drop_expired(now)
+        table = OtpChallenge.__table__
+        purged = 0
+        while True:
+            ids = db.execute(select(table.c.id).where(table.c.expires_at <= now).limit(batch_size)).scalars().all()
+            if not ids:
+                break
+            try:
+                db.execute(delete(table).where(table.c.id.in_(ids)))
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            purged += len(ids)
+            if len(ids) < batch_size:
+                break
+        logger.info(f"Purged {purged} expired OTP challenges")
+        return purged
+
+    def _cache_pending(self, pending: List[tuple]) -> None:
+        for key, challenge in pending:
+            self._put(key, challenge)
+
+
+otp_challenge_store = OtpChallengeStore()
+
+
+@event.listens_for(Session, "after_commit")
+def _cache_issued_challenges(session):
+    pending = session.info.pop(PENDING_CHALLENGES_KEY, None)
+    if pending:
+        otp_challenge_store._cache_pending(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_issued_challenges(session):
+    session.info.pop(PENDING_CHALLENGES_KEY, None)
@@ -0,0 +1,202 @@
+"""
+Maintenance for monthly range partitions of the transactions table.
+
+On PostgreSQL the `transactions` table is declaratively partitioned by
+RANGE ("timestamp") with one partition per calendar month and a DEFAULT
+partition (see migration 7a1c3e9d2b40). This service keeps future
+partitions created and detaches old ones so they can be archived or
+dropped independently.
+
+If maintenance misses a month, that month's rows land in the default
+partition, and PostgreSQL refuses to create a partition whose range has
+rows in the default one. create_partition() handles this: it detaches
+the default partition, creates the month's partition, moves the rows into
+it and attaches the default partition again, all in one transaction.
+
+On other databases (SQLite in development and tests) the table is a
+regular table and every function here is a logged no-op.
+"""
+import logging
+from datetime import date, datetime
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "transactions"
+
+
+def month_start(value: date) -> date:
+    """Return the first day of the month containing value."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    """Return the first day of the month `months` after value's month."""
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Partition table name for a month, e.g. transactions_y2025m01."""
+    return f"{PARENT_TABLE}_y{month.year}m{month.month:02d}"
+
+
+def parse_partition_month(name: str) -> Optional[date]:
+    """Inverse of partition_name; returns None for non-monthly partitions (e.g. default)."""
+    prefix = f"{PARENT_TABLE}_y"
+    if not name.startswith(prefix):
+        return None
+    try:
+        year, month = name[len(prefix):].split("m")
+        return date(int(year), int(month), 1)
+    except ValueError:
+        return None
+
+
+def is_partitioning_supported(db: Session) -> bool:
+    """Partitioning is only used on PostgreSQL."""
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def is_partitioned(db: Session) -> bool:
+    """Check whether the transactions table is a partitioned table."""
+    if not is_partitioning_supported(db):
+        return False
+    return db.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = :name"
+        ),
+        {"name": PARENT_TABLE},
+    ).first() is not None
+
+
+def list_partitions(db: Session) -> List[str]:
+    """Names of partitions currently attached to transactions."""
+    if not is_partitioned(db):
+        return []
+    rows = db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = :name ORDER BY child.relname"
+        ),
+        {"name": PARENT_TABLE},
+    ).all()
+    return [row[0] for row in rows]
+
+
+def default_partition(db: Session) -> Optional[str]:
+    """Name of the DEFAULT partition of transactions, if it has one."""
+    if not is_partitioned(db):
+        return None
+    return db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = :name AND pg_get_expr(child.relpartbound, child.oid) = 'DEFAULT'"
+        ),
+        {"name": PARENT_TABLE},
+    ).scalar()
+
+
+def create_partition(db: Session, month: date) -> str:
+    """
+    Create the partition for a month if it does not exist yet.
+
+    Rows of that month already in the default partition are moved into the
+    new partition. Runs in the caller's transaction; the parent table is
+    locked until it commits.
+    """
+    month = month_start(month)
+    name = partition_name(month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    create = text(
+        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{PARENT_TABLE}" '
+        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    )
+    default = default_partition(db)
+    in_range = 'WHERE "timestamp" >= :start AND "timestamp" < :end'
+    bounds = {"start": month, "end": add_months(month, 1)}
+    if default is None or db.execute(text(f'SELECT 1 FROM "{default}" {in_range} LIMIT 1'), bounds).first() is None:
+        db.execute(create)
+        return name
+
+    db.execute(text(f'ALTER TABLE "{PARENT_TABLE}" DETACH PARTITION "{default}"'))
+    db.execute(create)
+    moved = db.execute(text(f'INSERT INTO "{PARENT_TABLE}" SELECT * FROM "{default}" {in_range}'), bounds).rowcount
+    db.execute(text(f'DELETE FROM "{default}" {in_range}'), bounds)
+    db.execute(text(f'ALTER TABLE "{PARENT_TABLE}" ATTACH PARTITION "{default}" DEFAULT'))
+    logger.warning(f"Moved {moved} rows from {default} into the new partition {name}")
+    return name
+
+
+def ensure_partitions(db: Session, months_ahead: Optional[int] = None, today: Optional[date] = None) -> List[str]:
+    """
+    Make sure partitions exist for the current month and `months_ahead` months after it.
+
+    Each month is created in its own savepoint: a month that fails is
+    logged and skipped, and the months after it are still created.
+    Returns the names of partitions that were missing and have been created.
+    """
+    if not is_partitioned(db):
+        logger.info("transactions is not partitioned on this database; skipping partition creation")
+        return []
+
+    if months_ahead is None:
+        months_ahead = settings.TRANSACTION_PARTITION_MONTHS_AHEAD
+    current = month_start(today or datetime.utcnow().date())
+
+    existing = set(list_partitions(db))
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if partition_name(month) in existing:
+            continue
+        try:
+            with db.begin_nested():
+                created.append(create_partition(db, month))
+        except Exception:
+            logger.exception(f"Could not create the transaction partition {partition_name(month)}")
+    db.commit()
+
+    if created:
+        logger.info(f"Created transaction partitions: {', '.join(created)}")
+    return created
+
+
+def detach_old_partitions(db: Session, older_than_months: Optional[int] = None, today: Optional[date] = None) -> List[str]:
+    """
+    Detach monthly partitions that end before `older_than_months` ago.
+
+    Detached tables keep their data and can be dumped, moved to cheaper
+    storage or dropped without touching the live table.
+    """
+    if older_than_months is None:
+        older_than_months = settings.TRANSACTION_PARTITION_DETACH_AFTER_MONTHS
+    if older_than_months is None:
+        return []
+    if not is_partitioned(db):
+        logger.info("transactions is not partitioned on this database; skipping detach")
+        return []
+
+    cutoff = add_months(month_start(today or datetime.utcnow().date()), -older_than_months)
+    detached = []
+    for name in list_partitions(db):
+        month = parse_partition_month(name)
+        if month is not None and month < cutoff:
+            db.execute(text(f'ALTER TABLE "{PARENT_TABLE}" DETACH PARTITION "{name}"'))
+            detached.append(name)
+    db.commit()
+
+    if detached:
+        logger.info(f"Detached transaction partitions: {', '.join(detached)}")
+    return detached
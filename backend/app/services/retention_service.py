@@ -0,0 +1,190 @@
+"""
+Retention service for purging old notifications, alerts and security history.
+
+Rows are removed in small batches (one short transaction per batch) so the
+purge never holds long locks on tables that the API reads on every request.
+The per-user count limit first finds the users over it with one grouped
+query, then each of those users' excess rows with an index range scan on
+user_id, so the cost of a batch does not grow with the table.
+Each batch can optionally be archived to gzip-compressed JSON Lines files
+before it is deleted.
+"""
+import gzip
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Notification, Alert, SecurityHistory
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RetentionPolicy:
+    """Age and count limits for one table."""
+    model: type
+    max_age_days: Optional[int] = None
+    max_per_user: Optional[int] = None
+
+    @property
+    def table_name(self) -> str:
+        return self.model.__tablename__
+
+
+@dataclass
+class RetentionResult:
+    """Outcome of applying one policy."""
+    table: str
+    purged: int = 0
+    archived: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return float(self.purged)
+        return self.purged / self.elapsed_seconds
+
+
+def get_default_policies() -> List[RetentionPolicy]:
+    """Build retention policies from settings."""
+    return [
+        RetentionPolicy(
+            model=Notification,
+            max_age_days=settings.NOTIFICATION_RETENTION_DAYS,
+            max_per_user=settings.NOTIFICATION_MAX_PER_USER,
+        ),
+        RetentionPolicy(
+            model=Alert,
+            max_age_days=settings.ALERT_RETENTION_DAYS,
+            max_per_user=settings.ALERT_MAX_PER_USER,
+        ),
+        RetentionPolicy(
+            model=SecurityHistory,
+            max_age_days=settings.SECURITY_HISTORY_RETENTION_DAYS,
+            max_per_user=settings.SECURITY_HISTORY_MAX_PER_USER,
+        ),
+    ]
+
+
+class RetentionService:
+    """Applies retention policies in chunked batches."""
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        archive_dir: Optional[str] = None,
+        archive: bool = True,
+    ):
+        self.batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+        self.archive_dir = archive_dir if archive_dir is not None else settings.RETENTION_ARCHIVE_DIR
+        self.archive = archive and bool(self.archive_dir)
+        self._run_stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+
+    def _archive_path(self, table_name: str) -> str:
+        directory = os.path.join(self.archive_dir, table_name)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{table_name}-{self._run_stamp}.jsonl.gz")
+
+    def _archive_rows(self, table_name: str, rows: List[Dict]) -> int:
+        """Append rows to this run's archive file (one gzip member per batch)."""
+        if not self.archive or not rows:
+            return 0
+        with gzip.open(self._archive_path(table_name), "at", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, default=str, ensure_ascii=False))
+                f.write("\n")
+        return len(rows)
+
+    def _purge_rows(self, db: Session, table, rows: List[Dict], result: RetentionResult) -> None:
+        """Archive one batch of rows, delete it and commit."""
+        ids = [row["id"] for row in rows]
+        try:
+            result.archived += self._archive_rows(table.name, rows)
+            db.execute(delete(table).where(table.c.id.in_(ids)))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        result.purged += len(ids)
+
+    def _purge_batches(self, db: Session, table, select_batch, result: RetentionResult) -> None:
+        """Repeatedly select a batch, archive it, delete it and commit."""
+        while True:
+            rows = [dict(row) for row in db.execute(select_batch.limit(self.batch_size)).mappings().all()]
+            if not rows:
+                break
+            self._purge_rows(db, table, rows, result)
+            if len(rows) < self.batch_size:
+                break
+
+    def _purge_ids(self, db: Session, table, ids: List, result: RetentionResult) -> None:
+        """Archive and delete the rows with the given ids, oldest first."""
+        rows = db.execute(
+            select(table).where(table.c.id.in_(ids)).order_by(table.c.created_at, table.c.id)
+        ).mappings().all()
+        if rows:
+            self._purge_rows(db, table, [dict(row) for row in rows], result)
+
+    def _purge_over_limit(self, db: Session, table, max_per_user: int, result: RetentionResult) -> None:
+        """Delete each user's rows beyond the newest `max_per_user`, in batches."""
+        users = db.execute(
+            select(table.c.user_id)
+            .group_by(table.c.user_id)
+            .having(func.count() > max_per_user)
+            .order_by(table.c.user_id)
+        ).scalars().all()
+        pending = []
+        for user_id in users:
+            pending.extend(db.execute(
+                select(table.c.id)
+                .where(table.c.user_id == user_id)
+                .order_by(table.c.created_at.desc(), table.c.id.desc())
+                .offset(max_per_user)
+            ).scalars().all())
+            while len(pending) >= self.batch_size:
+                self._purge_ids(db, table, pending[:self.batch_size], result)
+                pending = pending[self.batch_size:]
+        if pending:
+            self._purge_ids(db, table, pending, result)
+
+    def apply_policy(self, db: Session, policy: RetentionPolicy, now: Optional[datetime] = None) -> RetentionResult:
+        """Apply the age policy, then the per-user count policy, for one table."""
+        table = policy.model.__table__
+        result = RetentionResult(table=table.name)
+        started = time.perf_counter()
+
+        if policy.max_age_days is not None:
+            cutoff = (now or datetime.utcnow()) - timedelta(days=policy.max_age_days)
+            by_age = (
+                select(table)
+                .where(table.c.created_at < cutoff)
+                .order_by(table.c.created_at, table.c.id)
+            )
+            self._purge_batches(db, table, by_age, result)
+
+        if policy.max_per_user is not None:
+            self._purge_over_limit(db, table, policy.max_per_user, result)
+
+        result.elapsed_seconds = time.perf_counter() - started
+        logger.info(
+            f"Retention {result.table}: purged {result.purged} rows "
+            f"({result.archived} archived) in {result.elapsed_seconds:.2f}s "
+            f"= {result.rows_per_second:,.0f} rows/s"
+        )
+        return result
+
+    def run(self, db: Session, policies: Optional[List[RetentionPolicy]] = None) -> List[RetentionResult]:
+        """Apply all policies (defaults from settings) and return per-table results."""
+        if policies is None:
+            policies = get_default_policies()
+        now = datetime.utcnow()
+        return [self.apply_policy(db, policy, now=now) for policy in policies]
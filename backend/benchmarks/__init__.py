@@ -0,0 +1,8 @@
+"""
+Load and latency benchmarks for the wallet API.
+
+Run from the backend directory:
+    python -m benchmarks.run --start-server --output results.json
+
+See benchmarks/README.md for scenarios and options.
+"""
@@ -0,0 +1,127 @@
+"""
+CPU cost versus bytes saved for response compression.
+
+Builds payloads shaped like our large responses (transaction history,
+notification list, yearly analytics with daily breakdown), then for each
+encoding and level reports compressed size, ratio and compression time.
+Use it to pick COMPRESSION_GZIP_LEVEL / COMPRESSION_BROTLI_QUALITY and
+COMPRESSION_MINIMUM_SIZE.
+
+Usage:
+    python -m benchmarks.compression
+    python -m benchmarks.compression --repeat 50 --output compression.json
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+from app.core.compression import brotli, make_encoder
+from app.core.responses import ORJSONResponse
+from benchmarks.serialization import make_rows
+
+GZIP_LEVELS = (1, 6, 9)
+BROTLI_QUALITIES = (1, 4, 6, 11)
+
+
+def notification_payload(count: int) -> bytes:
+    user_id = str(uuid.uuid4())
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows = [{
+        "title": "Nhận tiền thành công",
+        "message": f"Bạn đã nhận {10000 + i * 500:,}₫ từ Nguyễn Văn A",
+        "type": "TRANSACTION",
+        "data": json.dumps({"transaction_id": str(uuid.uuid4()), "amount": 10000 + i * 500}),
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "is_read": i % 3 == 0,
+        "created_at": now - timedelta(hours=i),
+    } for i in range(count)]
+    return ORJSONResponse(rows).body
+
+
+def analytics_payload(days: int) -> bytes:
+    rng = random.Random(42)
+    start = date(2025, 1, 1)
+    categories = ["FOOD", "SHOPPING", "BILLS", "TRANSPORT", "TRANSFER", "OTHER"]
+    body = {
+        "period": "year",
+        "start_date": start,
+        "end_date": start + timedelta(days=days - 1),
+        "total_spending": 45_000_000,
+        "total_income": 60_000_000,
+        "net_amount": 15_000_000,
+        "transaction_count": days * 4,
+        "categories": [{"category": c, "total_amount": 7_500_000, "transaction_count": days,
+                        "percentage": 16.67} for c in categories],
+        "daily_breakdown": [{"date": (start + timedelta(days=i)).isoformat(),
+                             "amount": rng.randrange(0, 2_000_000, 1000)} for i in range(days)],
+    }
+    return ORJSONResponse(body).body
+
+
+def payloads() -> Dict[str, bytes]:
+    return {
+        "transactions_50": ORJSONResponse(make_rows(50)).body,
+        "transactions_500": ORJSONResponse(make_rows(500)).body,
+        "notifications_100": notification_payload(100),
+        "analytics_year": analytics_payload(365),
+    }
+
+
+def encoders() -> Dict[str, Callable]:
+    result = {f"gzip-{level}": (lambda level=level: make_encoder("gzip", gzip_level=level)) for level in GZIP_LEVELS}
+    if brotli is not None:
+        for quality in BROTLI_QUALITIES:
+            result[f"br-{quality}"] = lambda quality=quality: make_encoder("br", brotli_quality=quality)
+    return result
+
+
+def measure(data: bytes, new_encoder: Callable, repeat: int) -> Dict:
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        encoder = new_encoder()
+        compressed = encoder.compress(data) + encoder.finish()
+        best = min(best, time.perf_counter() - started)
+        size = len(compressed)
+    return {
+        "bytes": size,
+        "ratio": round(len(data) / size, 2),
+        "saved_pct": round(100 * (1 - size / len(data)), 1),
+        "cpu_us": round(best * 1_000_000, 1),
+        "us_per_kb_saved": round(best * 1_000_000 / max((len(data) - size) / 1024, 1e-9), 2),
+    }
+
+
+def run(repeat: int = 20) -> List[Dict]:
+    results = []
+    for payload_name, data in payloads().items():
+        for encoder_name, new_encoder in encoders().items():
+            results.append({"payload": payload_name, "original_bytes": len(data), "encoding": encoder_name,
+                            **measure(data, new_encoder, repeat)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response compression")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per payload/encoding; the fastest counts")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    print(f"{'payload':<20}{'encoding':<10}{'original':>10}{'compressed':>12}{'ratio':>8}{'cpu µs':>10}{'µs/KB saved':>13}")
+    for row in results:
+        print(f"{row['payload']:<20}{row['encoding']:<10}{row['original_bytes']:>10}{row['bytes']:>12}"
+              f"{row['ratio']:>8}{row['cpu_us']:>10}{row['us_per_kb_saved']:>13}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
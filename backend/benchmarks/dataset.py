@@ -0,0 +1,453 @@
+"""
+Deterministic synthetic dataset generator for benchmarks.
+
+The dataset size is controlled by a scale factor: SF1 is 10,000 users and
+1,000,000 transactions, and every other table scales with the user count
+(see PER_USER). The same seed and scale factor always produce the same
+rows and ids; timestamps are relative to `now` and ciphertexts are
+randomized by design.
+
+Unlike generate_dummy_data.py this never builds ORM objects:
+- users share one precomputed bcrypt password hash and PIN hash
+- notes and card fields are encrypted in a process pool
+- rows are written with executemany `insert()` batches, or with `COPY`
+  on PostgreSQL (psycopg2)
+- users are generated in blocks so memory stays flat at any scale
+
+Usage:
+    python -m benchmarks.dataset --scale 0.01            # 100 users, 10k transactions
+    python -m benchmarks.dataset --scale 1 --workers 8   # SF1
+"""
+import argparse
+import csv
+import io
+import random
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.blind_index import card_number_index
+from app.core.security import get_password_hash
+from app.models import (
+    Alert,
+    AlertSettings,
+    BankCard,
+    BillProvider,
+    BillTransaction,
+    Budget,
+    Contact,
+    Notification,
+    NotificationSettings,
+    SavedBill,
+    SavingsGoal,
+    SecurityHistory,
+    Transaction,
+    User,
+    UserDevice,
+    Wallet,
+)
+from app.services.card_display import card_display_fields
+from app.services.device_detection import device_fingerprint
+
+USERS_PER_SCALE = 10_000
+PASSWORD = "password123"
+PIN = "123456"
+ID_NAMESPACE = uuid.UUID("8f6b2a52-3c1d-4e2b-9a57-0d4c1f3e6b7a")
+
+# Rows per user at any scale factor (transactions: 100 x 10k users = 1M at SF1)
+PER_USER = {
+    "transactions": 100,
+    "bill_transactions": 5,
+    "notifications": 20,
+    "alerts": 3,
+    "security_history": 10,
+    "user_devices": 2,
+    "bank_cards": 1,
+    "contacts": 5,
+    "budgets": 3,
+    "savings_goals": 1,
+    "saved_bills": 2,
+}
+
+FIRST_NAMES = ["An", "Bình", "Cường", "Dũng", "Hùng", "Khang", "Long", "Minh", "Nam", "Phong"]
+LAST_NAMES = ["Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Huỳnh", "Phan", "Vũ", "Võ", "Đặng"]
+TRANSACTION_NOTES = [
+    "Nạp tiền thủ công", "Nạp tiền từ MoMo", "Rút tiền về ngân hàng", "Chuyển tiền mua hàng",
+    "Chuyển tiền ăn trưa", "Chuyển tiền chia tiền taxi", "Chuyển tiền học phí", "Transfer",
+]
+BANKS = ["Vietcombank", "Techcombank", "BIDV", "VietinBank", "MB Bank", "ACB"]
+CARD_TYPES = ["VISA", "MASTERCARD", "ATM"]
+BUDGET_CATEGORIES = ["FOOD", "SHOPPING", "BILLS", "TRANSPORT", "OTHER"]
+DEVICES = [
+    ("iPhone", "IOS", "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15"),
+    ("Android Device", "ANDROID", "Mozilla/5.0 (Linux; Android 14; SM-S911B) AppleWebKit/537.36"),
+    ("Chrome Browser", "WEB", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0"),
+]
+ALERT_TYPES = [
+    ("LARGE_TRANSACTION", "WARNING"), ("LOW_BALANCE", "WARNING"),
+    ("BUDGET_WARNING", "INFO"), ("NEW_DEVICE", "CRITICAL"),
+]
+DEFAULT_PROVIDERS = [
+    ("EVN (Điện lực)", "EVN"), ("SAVACO (Nước)", "SAVACO"), ("FPT Telecom", "FPT"),
+    ("Viettel Telecom", "VIETTEL"), ("VinaPhone", "VINAPHONE"), ("Mobifone", "MOBIFONE"),
+]
+
+
+def make_id(seed: int, table: str, n: int) -> str:
+    """Deterministic UUID for the n-th row of a table."""
+    return str(uuid.uuid5(ID_NAMESPACE, f"{seed}:{table}:{n}"))
+
+
+def _encrypt_chunk(texts: List[str]) -> List[str]:
+    from app.core.encryption import encryption_service
+    return [encryption_service.encrypt(text) for text in texts]
+
+
+class Encryptor:
+    """Encrypts lists of strings, in a process pool when workers > 1."""
+
+    def __init__(self, workers: int = 1, chunk_size: int = 5000):
+        self.chunk_size = chunk_size
+        self.pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    def encrypt(self, texts: List[str]) -> List[str]:
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        mapper = self.pool.map if self.pool is not None else map
+        return [token for chunk in mapper(_encrypt_chunk, chunks) for token in chunk]
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+class BulkLoader:
+    """Writes lists of row dicts with executemany inserts, or COPY on PostgreSQL."""
+
+    def __init__(self, db: Session, batch_size: int = 5000, use_copy: Optional[bool] = None):
+        self.db = db
+        self.batch_size = batch_size
+        bind = db.get_bind()
+        if use_copy is None:
+            use_copy = bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2"
+        self.use_copy = use_copy
+        self.counts: Dict[str, int] = {}
+
+    def load(self, model, rows: List[Dict]) -> None:
+        if not rows:
+            return
+        table = model.__table__
+        if self.use_copy:
+            self._copy(table.name, rows)
+        else:
+            for start in range(0, len(rows), self.batch_size):
+                self.db.execute(insert(table), rows[start:start + self.batch_size])
+        self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+
+    def _copy(self, table_name: str, rows: List[Dict]) -> None:
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_copy_value(row[column]) for column in columns])
+        buffer.seek(0)
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table_name} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+
+
+def _copy_value(value):
+    # Unquoted empty fields are NULL in COPY csv
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return value
+
+
+class DatasetGenerator:
+    """Generates users in blocks and writes every dependent table for each block."""
+
+    def __init__(
+        self,
+        db: Session,
+        scale: float = 1.0,
+        seed: int = 42,
+        days: int = 365,
+        block_size: int = 1000,
+        loader: Optional[BulkLoader] = None,
+        encryptor: Optional[Encryptor] = None,
+        now: Optional[datetime] = None,
+    ):
+        self.db = db
+        self.seed = seed
+        self.user_count = max(1, int(round(USERS_PER_SCALE * scale)))
+        self.days = days
+        self.block_size = block_size
+        self.loader = loader or BulkLoader(db)
+        self.encryptor = encryptor or Encryptor()
+        self.now = now or datetime.utcnow().replace(microsecond=0)
+        self.password_hash = get_password_hash(PASSWORD)
+        self.pin_hash = get_password_hash(PIN)
+        self.provider_ids: List[str] = []
+
+    def user_id(self, n: int) -> str:
+        return make_id(self.seed, "users", n)
+
+    def email(self, n: int) -> str:
+        return f"sf{self.seed}-user{n}@example.com"
+
+    def _timestamp(self, rng: random.Random) -> datetime:
+        return self.now - timedelta(seconds=rng.randrange(self.days * 86400))
+
+    def ensure_providers(self) -> None:
+        existing = {p.code: p.id for p in self.db.query(BillProvider).all()}
+        rows = [
+            {"id": make_id(self.seed, "bill_providers", i), "name": name, "code": code,
+             "logo_url": None, "is_active": True}
+            for i, (name, code) in enumerate(DEFAULT_PROVIDERS) if code not in existing
+        ]
+        self.loader.load(BillProvider, rows)
+        self.db.commit()
+        self.provider_ids = sorted(existing.values()) + [row["id"] for row in rows]
+
+    def generate(self, progress: bool = False) -> Dict[str, int]:
+        """Write the whole dataset; returns rows written per table."""
+        self.ensure_providers()
+        for start in range(0, self.user_count, self.block_size):
+            stop = min(start + self.block_size, self.user_count)
+            self._generate_block(start, stop)
+            self.db.commit()
+            if progress:
+                print(f"  ✓ users {stop:,}/{self.user_count:,}")
+        return dict(self.loader.counts)
+
+    def _generate_block(self, start: int, stop: int) -> None:
+        rng = random.Random(f"{self.seed}:{start}")
+        seed = self.seed
+        users, wallets, notification_settings, alert_settings = [], [], [], []
+        devices, cards, contacts, budgets, goals, saved_bills = [], [], [], [], [], []
+        transactions, bill_transactions, notifications, alerts, history = [], [], [], [], []
+        notes, card_secrets = [], []
+
+        for n in range(start, stop):
+            user_id = self.user_id(n)
+            created = self.now - timedelta(days=self.days)
+            users.append({
+                "id": user_id, "email": self.email(n), "hashed_password": self.password_hash,
+                "full_name": f"{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)}",
+                "is_active": True, "is_verified": True, "otp_secret": None, "otp_created_at": None,
+                "transaction_pin_hash": self.pin_hash,
+            })
+            wallets.append({
+                "id": make_id(seed, "wallets", n), "user_id": user_id,
+                "balance": rng.randrange(0, 50_000_000, 1000), "currency": "VND",
+            })
+            notification_settings.append({
+                "id": make_id(seed, "notification_settings", n), "user_id": user_id,
+                "enable_transaction_notifications": True, "enable_promotion_notifications": rng.random() < 0.5,
+                "enable_security_notifications": True, "enable_alert_notifications": True,
+                "device_token": None, "device_type": None, "created_at": created, "updated_at": created,
+            })
+            alert_settings.append({
+                "id": make_id(seed, "alert_settings", n), "user_id": user_id,
+                "large_transaction_threshold": 5_000_000, "low_balance_threshold": 100_000,
+                "budget_warning_percentage": 80.0, "enable_large_transaction_alert": True,
+                "enable_low_balance_alert": True, "enable_budget_alert": True, "enable_new_device_alert": True,
+                "created_at": created, "updated_at": created,
+            })
+
+            device_ids = []
+            for k in range(PER_USER["user_devices"]):
+                row_n = n * PER_USER["user_devices"] + k
+                name, device_type, user_agent = rng.choice(DEVICES)
+                ip_address = f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}"
+                device_ids.append(make_id(seed, "user_devices", row_n))
+                devices.append({
+                    "id": device_ids[-1], "user_id": user_id, "device_token": None,
+                    "device_name": name, "device_type": device_type,
+                    "ip_address": ip_address, "user_agent": user_agent,
+                    # Logins match devices on this, so seeded devices are recognised
+                    "fingerprint": device_fingerprint(ip_address, user_agent),
+                    "last_login": self._timestamp(rng), "created_at": created, "is_active": True,
+                })
+
+            for k in range(PER_USER["bank_cards"]):
+                row_n = n * PER_USER["bank_cards"] + k
+                card_number = f"4{rng.randrange(10 ** 14, 10 ** 15)}"
+                expiry_date = f"{rng.randrange(1, 13):02d}/{rng.randrange(27, 32)}"
+                card_secrets.extend([card_number, expiry_date, f"{rng.randrange(1000):03d}"])
+                cards.append({
+                    "id": make_id(seed, "bank_cards", row_n), "user_id": user_id,
+                    "card_holder_name": users[-1]["full_name"], "bank_name": rng.choice(BANKS),
+                    "card_type": rng.choice(CARD_TYPES), "is_verified": True, "created_at": created,
+                    "card_hash": card_number_index.hash(card_number),
+                    **card_display_fields(card_number, expiry_date),
+                })
+
+            for k in range(PER_USER["contacts"]):
+                row_n = n * PER_USER["contacts"] + k
+                other = rng.randrange(self.user_count)
+                contacts.append({
+                    "id": make_id(seed, "contacts", row_n), "user_id": user_id,
+                    "name": f"Contact {other}", "email": self.email(other), "phone": None,
+                    "avatar_url": None, "notes": None, "created_at": created, "updated_at": created,
+                })
+
+            for k in range(PER_USER["budgets"]):
+                row_n = n * PER_USER["budgets"] + k
+                budgets.append({
+                    "id": make_id(seed, "budgets", row_n), "user_id": user_id,
+                    "category": BUDGET_CATEGORIES[k % len(BUDGET_CATEGORIES)],
+                    "amount": rng.randrange(1_000_000, 10_000_000, 100_000), "period": "MONTH",
+                    "month": self.now.month, "year": self.now.year, "created_at": created, "updated_at": created,
+                })
+
+            for k in range(PER_USER["savings_goals"]):
+                row_n = n * PER_USER["savings_goals"] + k
+                target = rng.randrange(5_000_000, 100_000_000, 1_000_000)
+                goals.append({
+                    "id": make_id(seed, "savings_goals", row_n), "user_id": user_id, "name": "Du lịch",
+                    "target_amount": target, "current_amount": rng.randrange(0, target, 100_000),
+                    "deadline": (self.now + timedelta(days=rng.randrange(30, 720))).date(),
+                    "auto_deposit_amount": None, "is_completed": False, "created_at": created, "updated_at": created,
+                })
+
+            for k in range(PER_USER["saved_bills"]):
+                row_n = n * PER_USER["saved_bills"] + k
+                saved_bills.append({
+                    "id": make_id(seed, "saved_bills", row_n), "user_id": user_id,
+                    "provider_id": rng.choice(self.provider_ids), "customer_code": f"KH{row_n:010d}",
+                    "customer_name": users[-1]["full_name"], "alias": None, "created_at": created, "updated_at": created,
+                })
+
+            for k in range(PER_USER["transactions"]):
+                row_n = n * PER_USER["transactions"] + k
+                kind = rng.random()
+                # 40% deposits, 20% withdrawals, 40% transfers to a random user
+                sender = None if kind < 0.4 else user_id
+                receiver = user_id if kind < 0.4 else (None if kind < 0.6 else self.user_id(rng.randrange(self.user_count)))
+                transactions.append({
+                    "id": make_id(seed, "transactions", row_n), "sender_id": sender, "receiver_id": receiver,
+                    "amount": rng.randrange(10_000, 2_000_000, 1000), "timestamp": self._timestamp(rng),
+                })
+                notes.append(rng.choice(TRANSACTION_NOTES))
+
+            for k in range(PER_USER["bill_transactions"]):
+                row_n = n * PER_USER["bill_transactions"] + k
+                amount = rng.randrange(50_000, 1_000_000, 1000)
+                timestamp = self._timestamp(rng)
+                transaction_id = make_id(seed, "bill_payment_transactions", row_n)
+                customer_code = f"KH{row_n:010d}"
+                transactions.append({
+                    "id": transaction_id, "sender_id": user_id, "receiver_id": None,
+                    "amount": amount, "timestamp": timestamp,
+                })
+                notes.append(f"Thanh toán hóa đơn - Mã KH: {customer_code}")
+                bill_transactions.append({
+                    "id": make_id(seed, "bill_transactions", row_n), "user_id": user_id,
+                    "provider_id": rng.choice(self.provider_ids), "customer_code": customer_code,
+                    "amount": amount, "bill_period": timestamp.strftime("%m/%Y"),
+                    "transaction_id": transaction_id, "created_at": timestamp,
+                })
+
+            for k in range(PER_USER["notifications"]):
+                row_n = n * PER_USER["notifications"] + k
+                notifications.append({
+                    "id": make_id(seed, "notifications", row_n), "user_id": user_id,
+                    "title": "Giao dịch thành công", "message": "Bạn đã nhận được tiền",
+                    "type": "TRANSACTION", "is_read": rng.random() < 0.7, "data": None,
+                    "created_at": self._timestamp(rng),
+                })
+
+            for k in range(PER_USER["alerts"]):
+                row_n = n * PER_USER["alerts"] + k
+                alert_type, severity = rng.choice(ALERT_TYPES)
+                alerts.append({
+                    "id": make_id(seed, "alerts", row_n), "user_id": user_id, "type": alert_type,
+                    "title": alert_type.replace("_", " ").title(), "message": "Cảnh báo tự động",
+                    "severity": severity, "is_read": rng.random() < 0.5, "data": None,
+                    "created_at": self._timestamp(rng),
+                })
+
+            for k in range(PER_USER["security_history"]):
+                row_n = n * PER_USER["security_history"] + k
+                device_id = rng.choice(device_ids) if device_ids else None
+                history.append({
+                    "id": make_id(seed, "security_history", row_n), "user_id": user_id,
+                    "action_type": "LOGIN", "description": "Đăng nhập",
+                    "ip_address": None, "user_agent": None, "device_id": device_id,
+                    "created_at": self._timestamp(rng),
+                })
+
+        for row, token in zip(transactions, self.encryptor.encrypt(notes)):
+            row["encrypted_note"] = token
+        secrets = iter(self.encryptor.encrypt(card_secrets))
+        for row in cards:
+            row["card_number_encrypted"] = next(secrets)
+            row["expiry_date_encrypted"] = next(secrets)
+            row["cvv_encrypted"] = next(secrets)
+
+        # Parents before children so foreign keys hold
+        for model, rows in (
+            (User, users), (Wallet, wallets), (NotificationSettings, notification_settings),
+            (AlertSettings, alert_settings), (UserDevice, devices), (BankCard, cards),
+            (Contact, contacts), (Budget, budgets), (SavingsGoal, goals), (SavedBill, saved_bills),
+            (Transaction, transactions), (BillTransaction, bill_transactions),
+            (Notification, notifications), (Alert, alerts), (SecurityHistory, history),
+        ):
+            self.loader.load(model, rows)
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset (SF1 = 10k users / 1M transactions)")
+    parser.add_argument("--scale", type=float, default=0.01, help="Scale factor (default: 0.01)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=365, help="Spread timestamps over this many days")
+    parser.add_argument("--workers", type=int, default=1, help="Processes used for field encryption")
+    parser.add_argument("--block-size", type=int, default=1000, help="Users generated and committed per block")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per insert statement batch")
+    parser.add_argument("--no-copy", action="store_true", help="Use executemany inserts on PostgreSQL too")
+    args = parser.parse_args(argv)
+
+    from app.core.database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    encryptor = Encryptor(workers=args.workers)
+    try:
+        loader = BulkLoader(db, batch_size=args.batch_size, use_copy=False if args.no_copy else None)
+        generator = DatasetGenerator(
+            db, scale=args.scale, seed=args.seed, days=args.days,
+            block_size=args.block_size, loader=loader, encryptor=encryptor,
+        )
+        print(f"🚀 Generating SF{args.scale:g} ({generator.user_count:,} users) "
+              f"on {engine.dialect.name} using {'COPY' if loader.use_copy else 'batched inserts'}...")
+        started = time.perf_counter()
+        counts = generator.generate(progress=True)
+        elapsed = time.perf_counter() - started
+    except Exception as e:
+        db.rollback()
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+    finally:
+        encryptor.close()
+        db.close()
+
+    total = sum(counts.values())
+    print(f"\n✅ Wrote {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    for table, count in counts.items():
+        print(f"  - {table}: {count:,}")
+    print(f"\n💡 All users have password '{PASSWORD}' and PIN '{PIN}', e.g. {generator.email(0)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Per-field cost of encrypting notes and card data.
+
+Compares, for the values we store encrypted (a transaction note and the
+three card fields of a row):
+- fernet: the version 1 format (AES-128-CBC + HMAC-SHA256, base64 text)
+- envelope: the version 2 AES-GCM format as text, the way it is stored
+  in the String columns
+- envelope_bytes: the same format raw, as a binary column would hold it
+
+and reports encrypt/decrypt throughput and bytes stored per row.
+
+Usage:
+    python -m benchmarks.encryption --rows 10000 --repeat 5
+"""
+import argparse
+import json
+import time
+from typing import Callable, Dict, List
+
+from cryptography.fernet import Fernet
+
+from app.core.encryption import EncryptionService
+
+NOTE = "Chuyển tiền mua hàng"
+CARD_FIELDS = ["4111111111111111", "12/28", "123"]
+
+
+def best_ops_per_second(fn: Callable[[], object], ops: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return ops / best if best else float("inf")
+
+
+def measure(name: str, encrypt: Callable, decrypt: Callable, rows: int, repeat: int) -> Dict:
+    values = [NOTE] * rows
+    tokens = [encrypt(value) for value in values]
+    assert [decrypt(token) for token in tokens[:10]] == values[:10]
+    card_bytes = sum(len(encrypt(value)) for value in CARD_FIELDS)
+    return {
+        "format": name,
+        "encrypt_ops_per_s": round(best_ops_per_second(lambda: [encrypt(v) for v in values], rows, repeat)),
+        "decrypt_ops_per_s": round(best_ops_per_second(lambda: [decrypt(t) for t in tokens], rows, repeat)),
+        "note_bytes": len(tokens[0]),
+        "card_bytes_per_row": card_bytes,
+    }
+
+
+def run(rows: int = 10000, repeat: int = 5) -> List[Dict]:
+    key = Fernet.generate_key().decode()
+    fernet = EncryptionService(key=key, envelope=False)
+    envelope = EncryptionService(key=key, envelope=True)
+    return [
+        measure("fernet", fernet.encrypt, fernet.decrypt, rows, repeat),
+        measure("envelope", envelope.encrypt, envelope.decrypt, rows, repeat),
+        measure("envelope_bytes", envelope.encrypt_bytes, envelope.decrypt_bytes, rows, repeat),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark field encryption formats")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per format; the fastest counts")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+    print(f"{'format':<16}{'encrypt/s':>12}{'decrypt/s':>12}{'note B':>8}{'card B/row':>12}")
+    for r in results:
+        print(f"{r['format']:<16}{r['encrypt_ops_per_s']:>12,}{r['decrypt_ops_per_s']:>12,}"
+              f"{r['note_bytes']:>8}{r['card_bytes_per_row']:>12}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Run the wallet API benchmarks.
+
+Usage:
+    # Start a local uvicorn (rate limiting off) against DATABASE_URL and benchmark it
+    python -m benchmarks.run --start-server --output results.json
+
+    # Benchmark an already running server that uses the same DATABASE_URL
+    python -m benchmarks.run --base-url http://127.0.0.1:8000 --scenarios balance,history
+
+    # Fail (exit 1) if p95 or throughput regressed more than 10% against a baseline
+    python -m benchmarks.run --start-server --output new.json --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.scenarios import PREPARE, SCENARIOS, ScenarioContext
+from benchmarks.seed import BenchData
+from benchmarks.stats import compare, summarize
+
+
+async def fetch_tokens(client: httpx.AsyncClient, data: BenchData, concurrency: int) -> Dict[str, str]:
+    """Log every benchmark user in once so scenarios start with valid tokens."""
+    semaphore = asyncio.Semaphore(concurrency)
+    tokens = {}
+
+    async def login(user):
+        async with semaphore:
+            response = await client.post(
+                "/api/v1/auth/login", data={"username": user.email, "password": user.password}
+            )
+            response.raise_for_status()
+            tokens[user.email] = response.json()["access_token"]
+
+    await asyncio.gather(*(login(user) for user in data.users))
+    return tokens
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    ctx: ScenarioContext,
+    requests: int,
+    concurrency: int,
+) -> Dict:
+    """Send `requests` requests from `concurrency` workers and summarize the latencies."""
+    scenario = SCENARIOS[name]
+    prepare = PREPARE.get(name)
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    next_iteration = iter(range(requests))
+
+    async def worker():
+        for i in next_iteration:
+            if prepare is not None:
+                await prepare(ctx, i)  # not timed
+            started = time.perf_counter()
+            try:
+                response = await scenario(client, ctx, i)
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - started
+            if isinstance(status, int) and status < 400:
+                latencies.append(elapsed)
+            else:
+                errors[str(status)] = errors.get(str(status), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = summarize(latencies, sum(errors.values()), time.perf_counter() - started)
+    result["errors_by_status"] = errors
+    return result
+
+
+async def run_benchmarks(
+    client: httpx.AsyncClient,
+    data: BenchData,
+    scenarios: List[str],
+    requests: int,
+    concurrency: int,
+    hot_accounts: int = 4,
+) -> Dict[str, Dict]:
+    tokens = await fetch_tokens(client, data, concurrency)
+    ctx = ScenarioContext(data=data, tokens=tokens, hot_accounts=hot_accounts)
+    results = {}
+    for name in scenarios:
+        results[name] = await run_scenario(client, name, ctx, requests, concurrency)
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _start_server(port: int) -> subprocess.Popen:
+    env = dict(os.environ, RATE_LIMIT_ENABLED="false")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        if process.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 30s")
+
+
+def _print_table(results: Dict[str, Dict]) -> None:
+    print(f"{'scenario':<12}{'req':>7}{'err':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, r in results.items():
+        print(
+            f"{name:<12}{r['requests']:>7}{r['errors']:>6}{r['throughput_rps']:>9.1f}"
+            f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the wallet API")
+    parser.add_argument("--base-url", default=None, help="Server to benchmark (default: the started server)")
+    parser.add_argument("--start-server", action="store_true", help="Start uvicorn with rate limiting disabled")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenario names")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--hot-accounts", type=int, default=4, help="Accounts shared by the transfer scenario")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed regression (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)} (available: {', '.join(SCENARIOS)})")
+
+    from app.core.database import Base, SessionLocal, engine
+    from benchmarks.seed import seed_benchmark_data
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        print(f"🌱 Seeding {args.users} benchmark users...")
+        data = seed_benchmark_data(db, args.users)
+    finally:
+        db.close()
+
+    server = _start_server(args.port) if args.start_server else None
+    base_url = args.base_url or f"http://127.0.0.1:{args.port}"
+    try:
+        print(f"🚀 Benchmarking {base_url} ({args.requests} requests x {len(scenarios)} scenarios, concurrency {args.concurrency})")
+
+        async def _run():
+            limits = httpx.Limits(max_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+                return await run_benchmarks(
+                    client, data, scenarios, args.requests, args.concurrency, args.hot_accounts
+                )
+
+        results = asyncio.run(_run())
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    document = {
+        "commit": _git_commit(),
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "users": args.users,
+            "hot_accounts": args.hot_accounts,
+        },
+        "scenarios": results,
+    }
+
+    _print_table(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, document, args.tolerance)
+        if regressions:
+            print("❌ Regressions against baseline:")
+            for message in regressions:
+                print(f"   {message}")
+            sys.exit(1)
+        print("✅ No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark scenarios.
+
+Each scenario is an async function sending one request for iteration `i`
+and returning the response; the runner times it and counts any status
+>= 400 as an error. A scenario can have a PREPARE step, which the runner
+awaits before starting the clock (e.g. to issue a transfer OTP).
+"""
+import asyncio
+import random
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Tuple
+
+import httpx
+
+from benchmarks.seed import BenchData
+
+API = "/api/v1"
+
+
+@dataclass
+class ScenarioContext:
+    data: BenchData
+    tokens: Dict[str, str]  # email -> access token
+    hot_accounts: int = 4
+    rng: random.Random = field(default_factory=lambda: random.Random(42))
+    # Per-iteration state handed from a PREPARE step to its scenario
+    prepared: Dict[int, object] = field(default_factory=dict)
+    # Only one transfer per (sender, receiver) may be in flight: a new OTP replaces the pending one
+    pair_locks: Dict[Tuple[int, int], asyncio.Lock] = field(default_factory=lambda: defaultdict(asyncio.Lock))
+
+    def user(self, i: int):
+        return self.data.users[i % len(self.data.users)]
+
+    def headers(self, i: int) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.tokens[self.user(i).email]}"}
+
+
+Scenario = Callable[[httpx.AsyncClient, ScenarioContext, int], Awaitable[httpx.Response]]
+Prepare = Callable[[ScenarioContext, int], Awaitable[None]]
+
+
+async def login(client: httpx.AsyncClient, ctx: ScenarioContext, i: int) -> httpx.Response:
+    user = ctx.user(i)
+    return await client.post(f"{API}/auth/login", data={"username": user.email, "password": user.password})
+
+
+async def balance(client: httpx.AsyncClient, ctx: ScenarioContext, i: int) -> httpx.Response:
+    return await client.get(f"{API}/wallets/me", headers=ctx.headers(i))
+
+
+async def deposit(client: httpx.AsyncClient, ctx: ScenarioContext, i: int) -> httpx.Response:
+    return await client.post(f"{API}/wallets/deposit", headers=ctx.headers(i), json={"amount": 10000})
+
+
+async def prepare_transfer(ctx: ScenarioContext, i: int) -> None:
+    """
+    Pick the hot-account pair for iteration `i`, wait until no other transfer
+    between them is in flight and issue its OTP (in a thread, off the event loop).
+    """
+    hot = min(ctx.hot_accounts, len(ctx.data.users))
+    sender_index = i % hot
+    receiver_index = (sender_index + 1 + ctx.rng.randrange(hot - 1)) % hot if hot > 1 else sender_index
+    sender = ctx.data.users[sender_index]
+    receiver = ctx.data.users[receiver_index]
+    lock = ctx.pair_locks[(sender_index, receiver_index)]
+    await lock.acquire()
+    try:
+        code = await asyncio.to_thread(ctx.data.transfer_otp, sender, receiver.email)
+    except BaseException:
+        lock.release()
+        raise
+    ctx.prepared[i] = (sender_index, receiver, code, lock)
+
+
+async def transfer(client: httpx.AsyncClient, ctx: ScenarioContext, i: int) -> httpx.Response:
+    """Transfers between a small set of hot accounts to provoke row contention."""
+    sender_index, receiver, code, lock = ctx.prepared.pop(i)
+    sender = ctx.data.users[sender_index]
+    try:
+        return await client.post(
+            f"{API}/wallets/transfer",
+            headers=ctx.headers(sender_index),
+            json={
+                "receiver_email": receiver.email,
+                "amount": 1000,
+                "note": "benchmark",
+                "transaction_pin": sender.pin,
+                "otp_code": code,
+            },
+        )
+    finally:
+        lock.release()
+
+
+async def history(client: httpx.AsyncClient, ctx: ScenarioContext, i: int) -> httpx.Response:
+    return await client.get(f"{API}/wallets/transactions", headers=ctx.headers(i))
+
+
+async def analytics(client: httpx.AsyncClient, ctx: ScenarioContext, i: int) -> httpx.Response:
+    period = ("day", "week", "month", "year")[i % 4]
+    return await client.get(f"{API}/analytics/spending", headers=ctx.headers(i), params={"period": period})
+
+
+async def bill_pay(client: httpx.AsyncClient, ctx: ScenarioContext, i: int) -> httpx.Response:
+    user = ctx.user(i)
+    return await client.post(
+        f"{API}/bills/pay",
+        headers=ctx.headers(i),
+        json={
+            "provider_id": ctx.data.provider_id,
+            "customer_code": f"BENCH{i:06d}",
+            "amount": 50000,
+            "transaction_pin": user.pin,
+        },
+    )
+
+
+# Order matters: writes run before the reads that depend on their data
+SCENARIOS: Dict[str, Scenario] = {
+    "login": login,
+    "balance": balance,
+    "deposit": deposit,
+    "transfer": transfer,
+    "bill_pay": bill_pay,
+    "history": history,
+    "analytics": analytics,
+}
+
+PREPARE: Dict[str, Prepare] = {
+    "transfer": prepare_transfer,
+}
@@ -0,0 +1,88 @@
+"""
+Benchmark accounts.
+
+Benchmark users are written straight to the database the server uses so
+scenarios can skip registration and e-mail OTP verification. Every user
+shares one password and one PIN, hashed once. Transfer OTPs are single
+use, so the client issues one per transfer directly in the database
+(see scenarios.prepare_transfer).
+"""
+from dataclasses import dataclass
+from typing import Callable, List
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.security import get_password_hash
+from app.models import BillProvider, User, Wallet
+from app.services.otp_challenges import OTP_PURPOSE_TRANSFER, otp_challenge_store
+
+PASSWORD = "benchmark-password"
+PIN = "123456"
+EMAIL_TEMPLATE = "bench-{index}@bench.local"
+PROVIDER_CODE = "BENCH"
+INITIAL_BALANCE = 1_000_000_000
+
+
+@dataclass
+class BenchUser:
+    email: str
+    user_id: str
+    password: str = PASSWORD
+    pin: str = PIN
+
+
+@dataclass
+class BenchData:
+    users: List[BenchUser]
+    provider_id: str
+    session_factory: Callable[[], Session]
+
+    def transfer_otp(self, sender: BenchUser, receiver_email: str) -> str:
+        """Issue a transfer OTP, standing in for POST /wallets/transfer/request-otp and the e-mail."""
+        db = self.session_factory()
+        try:
+            code = otp_challenge_store.issue(db, sender.user_id, OTP_PURPOSE_TRANSFER, target=receiver_email)
+            db.commit()
+        finally:
+            db.close()
+        return code
+
+
+def seed_benchmark_data(db: Session, user_count: int) -> BenchData:
+    """
+    Create (or reset) `user_count` verified users with funded wallets and a bill provider.
+
+    Safe to run repeatedly: existing benchmark users get their balance
+    reset instead of being recreated.
+    """
+    password_hash = get_password_hash(PASSWORD)
+    pin_hash = get_password_hash(PIN)
+
+    emails = [EMAIL_TEMPLATE.format(index=i) for i in range(user_count)]
+    existing = {user.email: user for user in db.query(User).filter(User.email.in_(emails)).all()}
+
+    users = []
+    for index, email in enumerate(emails):
+        user = existing.get(email)
+        if user is None:
+            user = User(
+                email=email,
+                hashed_password=password_hash,
+                full_name=f"Benchmark User {index}",
+                is_verified=True,
+                transaction_pin_hash=pin_hash,
+            )
+            db.add(user)
+            db.flush()
+            db.add(Wallet(user_id=user.id, balance=INITIAL_BALANCE))
+        else:
+            db.query(Wallet).filter(Wallet.user_id == user.id).update({"balance": INITIAL_BALANCE})
+        users.append(BenchUser(email=email, user_id=user.id))
+
+    provider = db.query(BillProvider).filter(BillProvider.code == PROVIDER_CODE).first()
+    if provider is None:
+        provider = BillProvider(name="Benchmark Utility", code=PROVIDER_CODE)
+        db.add(provider)
+    db.commit()
+
+    return BenchData(users=users, provider_id=provider.id, session_factory=sessionmaker(bind=db.get_bind()))
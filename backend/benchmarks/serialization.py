@@ -0,0 +1,94 @@
+"""
+Per-row serialization cost of list responses.
+
+Compares, for an N-row transaction history:
+- before: one TransactionResponse built per row, then re-validated and
+  serialized through the List[TransactionResponse] response_model the way
+  FastAPI does it
+- after: plain dicts from column tuples serialized by ORJSONResponse
+
+Usage:
+    python -m benchmarks.serialization --rows 1000 --repeat 20
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+from pydantic import TypeAdapter
+
+from app.core.responses import ORJSONResponse
+from app.schemas import TransactionResponse
+
+
+def make_rows(count: int) -> List[Dict]:
+    """Rows shaped like GET /wallets/transactions output."""
+    user_id = str(uuid.uuid4())
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(count):
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "sender_id": user_id if i % 2 else str(uuid.uuid4()),
+            "receiver_id": str(uuid.uuid4()) if i % 2 else user_id,
+            "amount": 10000 + i,
+            "timestamp": now - timedelta(minutes=i),
+            "note": "Chuyển tiền mua hàng",
+            "type": "transfer_out" if i % 2 else "transfer_in",
+        })
+    return rows
+
+
+def serialize_before(rows: List[Dict], adapter: TypeAdapter) -> bytes:
+    models = [TransactionResponse(**row) for row in rows]
+    return adapter.dump_json(adapter.validate_python(models))
+
+
+def serialize_after(rows: List[Dict]) -> bytes:
+    return ORJSONResponse(rows).body
+
+
+def per_row_microseconds(fn: Callable[[], bytes], rows: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best / rows * 1_000_000
+
+
+def run(rows: int = 1000, repeat: int = 20) -> Dict:
+    data = make_rows(rows)
+    adapter = TypeAdapter(List[TransactionResponse])
+    # Both paths must produce the same document
+    assert json.loads(serialize_before(data, adapter)) == json.loads(serialize_after(data))
+
+    before = per_row_microseconds(lambda: serialize_before(data, adapter), rows, repeat)
+    after = per_row_microseconds(lambda: serialize_after(data), rows, repeat)
+    return {
+        "rows": rows,
+        "before_us_per_row": round(before, 3),
+        "after_us_per_row": round(after, 3),
+        "speedup": round(before / after, 1) if after else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list response serialization")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per path; the fastest counts")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    result = run(args.rows, args.repeat)
+    print(f"{result['rows']} rows: before {result['before_us_per_row']:.2f} µs/row, "
+          f"after {result['after_us_per_row']:.2f} µs/row ({result['speedup']}x)")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Enforce an import-time budget for the application.
+
+Runs `python -X importtime -c "import app.main"` in fresh interpreters and
+fails when the best cumulative import time of app.main exceeds the budget,
+or when a module that must be imported lazily (Firebase, requests, passlib,
+Fernet, ...) is loaded during startup.
+
+Usage:
+    python check_import_time.py
+    python check_import_time.py --budget-ms 800 --runs 5 --top 15
+"""
+import argparse
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Heavy SDKs that are imported on first use and must stay out of startup
+LAZY_MODULES = [
+    "firebase_admin",
+    "google.auth",
+    "httpx",
+    "requests",
+    "smtplib",
+    "passlib.context",
+    "cryptography.fernet",
+]
+
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def parse_importtime(output: str) -> List[Tuple[str, int, int, int]]:
+    """Parse -X importtime output into (module, self_us, cumulative_us, depth) tuples."""
+    entries = []
+    for line in output.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+
+def measure(module: str = "app.main") -> List[Tuple[str, int, int, int]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        raise SystemExit(f"❌ Importing {module} failed")
+    return parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check application import time")
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="Max cumulative import time of app.main")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to run; the fastest counts")
+    parser.add_argument("--top", type=int, default=10, help="Show the N slowest direct imports")
+    args = parser.parse_args()
+
+    best: Dict[str, int] = {}
+    best_entries = []
+    for _ in range(args.runs):
+        entries = measure()
+        total = next(cumulative for module, _, cumulative, _ in entries if module == "app.main")
+        if not best or total < best["app.main"]:
+            best = {"app.main": total}
+            best_entries = entries
+
+    total_ms = best["app.main"] / 1000
+    print(f"⏱️  import app.main: {total_ms:.0f} ms (best of {args.runs}, budget {args.budget_ms:.0f} ms)")
+
+    # Direct children of app.main ordered by cumulative time
+    direct = sorted(
+        (entry for entry in best_entries if entry[3] == 1),
+        key=lambda entry: entry[2], reverse=True,
+    )
+    for module, _, cumulative, _ in direct[:args.top]:
+        print(f"   {cumulative / 1000:8.1f} ms  {module}")
+
+    imported = {module for module, _, _, _ in best_entries}
+    eager = [module for module in LAZY_MODULES if module in imported]
+
+    failed = False
+    if eager:
+        print(f"❌ Imported at startup but should be lazy: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"❌ Import time {total_ms:.0f} ms exceeds budget of {args.budget_ms:.0f} ms")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("✅ Import time within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -95,7 +95,7 @@ def create_dummy_users(db, num_users: int = 15) -> List[User]:
         db.flush()  # Flush to get user.id
         
         # Create wallet for user with random initial balance
-        initial_balance = random.uniform(0, 5000000)  # 0 to 5,000,000 VND
+        initial_balance = random.randrange(0, 5000000, 1000)  # 0 to 5,000,000 VND
         wallet = Wallet(
             user_id=user.id,
             balance=initial_balance,
@@ -153,7 +153,7 @@ def create_dummy_transactions(
             wallet = wallets[user.id]
             
             if tx_type == 'deposit':
-                amount = random.uniform(50000, 2000000)  # 50,000 to 2,000,000 VND
+                amount = random.randrange(50000, 2000000, 1000)  # 50,000 to 2,000,000 VND
                 note = random.choice(DEPOSIT_NOTES)
                 encrypted_note = encryption_service.encrypt(note)
                 
@@ -172,7 +172,7 @@ def create_dummy_transactions(
                 # Only withdraw if balance is sufficient
                 max_withdraw = min(wallet.balance, 1000000)  # Max 1,000,000 VND
                 if max_withdraw > 0:
-                    amount = random.uniform(50000, max_withdraw)
+                    amount = random.randrange(50000, max_withdraw + 1, 1000)
                     note = random.choice(WITHDRAW_NOTES)
                     encrypted_note = encryption_service.encrypt(note)
                     
@@ -201,7 +201,7 @@ def create_dummy_transactions(
                 # Only transfer if balance is sufficient
                 max_transfer = min(wallet.balance, 500000)  # Max 500,000 VND per transfer
                 if max_transfer > 50000:  # At least 50,000 VND
-                    amount = random.uniform(50000, max_transfer)
+                    amount = random.randrange(50000, max_transfer + 1, 1000)
                     note = random.choice(TRANSFER_NOTES)
                     encrypted_note = encryption_service.encrypt(note)
                     
@@ -0,0 +1,60 @@
+"""
+Script to maintain monthly partitions of the transactions table.
+
+Creates partitions for the next TRANSACTION_PARTITION_MONTHS_AHEAD months and
+detaches partitions older than TRANSACTION_PARTITION_DETACH_AFTER_MONTHS.
+Detached partitions keep their data as standalone tables that can be dumped
+and dropped. Does nothing on SQLite. Intended to be run daily from cron.
+
+If a run was missed, rows of a month without a partition are kept in
+transactions_default; the next run creates the month's partition and moves
+them into it. A month that still fails is logged and skipped while the
+other months are created. To recover by hand, in one transaction: detach
+transactions_default, create the month's partition, INSERT INTO
+transactions the month's rows from transactions_default, delete them there,
+then ATTACH PARTITION transactions_default DEFAULT.
+
+Usage:
+    python maintain_partitions.py
+    python maintain_partitions.py --months-ahead 6 --detach-after 24
+"""
+
+import argparse
+import sys
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, '.')
+
+from app.core.database import SessionLocal
+from app.services.partition_service import (
+    ensure_partitions,
+    detach_old_partitions,
+    is_partitioned,
+    list_partitions,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain monthly partitions of the transactions table.")
+    parser.add_argument("--months-ahead", type=int, default=None, help="Future months to create partitions for")
+    parser.add_argument("--detach-after", type=int, default=None, help="Detach partitions older than N months")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if not is_partitioned(db):
+            print("ℹ️  transactions is not partitioned on this database (PostgreSQL only). Nothing to do.")
+            return
+
+        created = ensure_partitions(db, months_ahead=args.months_ahead)
+        detached = detach_old_partitions(db, older_than_months=args.detach_after)
+
+        print(f"✓ Created partitions: {', '.join(created) or 'none'}")
+        print(f"✓ Detached partitions: {', '.join(detached) or 'none'}")
+        print(f"📊 Attached partitions: {len(list_partitions(db))}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Local mock of the bill provider aggregator used by HttpBillGateway.
+
+Answers GET /providers/{code}/bills/{customer_code} with a deterministic
+bill (about 70% of customer codes have one, 404 otherwise). Per-provider
+latency and failures can be injected to try out timeouts and partial
+results of POST /bills/check-batch.
+
+Usage:
+    python mock_bill_provider.py
+    python mock_bill_provider.py --port 9100 --delay EVN=4 --delay FPT=0.5 --fail VIETTEL
+
+Then start the API with BILL_GATEWAY_URL=http://localhost:9100
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import Dict, Iterable, Optional
+
+from fastapi import FastAPI, HTTPException
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, '.')
+
+from app.services.bill_gateway import stable_bill
+from app.services.bill_provider_registry import ProviderInfo
+
+
+def create_app(delays: Optional[Dict[str, float]] = None, failures: Iterable[str] = ()) -> FastAPI:
+    """Mock provider app; `delays` maps provider code -> seconds, `failures` answer 503."""
+    delays = dict(delays or {})
+    failures = set(failures)
+    app = FastAPI(title="Mock bill provider")
+
+    @app.get("/providers/{code}/bills/{customer_code}")
+    async def get_bill(code: str, customer_code: str):
+        if delays.get(code):
+            await asyncio.sleep(delays[code])
+        if code in failures:
+            raise HTTPException(status_code=503, detail="Provider unavailable")
+        provider = ProviderInfo(id=code, name=code, code=code, logo_url=None, is_active=True)
+        bill = stable_bill(provider, customer_code)
+        if not bill.has_bill:
+            raise HTTPException(status_code=404, detail="No unpaid bill")
+        return {
+            "has_bill": True,
+            "customer_name": bill.customer_name,
+            "amount": bill.amount,
+            "bill_period": bill.bill_period,
+            "due_date": bill.due_date.isoformat(),
+            "description": bill.description,
+        }
+
+    return app
+
+
+def parse_delay(value: str):
+    code, _, seconds = value.partition("=")
+    return code, float(seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a mock bill provider aggregator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--delay", type=parse_delay, action="append", default=[],
+                        help="CODE=SECONDS latency for one provider (repeatable)")
+    parser.add_argument("--fail", action="append", default=[], help="Provider code answering 503 (repeatable)")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    print(f"🧾 Mock bill provider on http://{args.host}:{args.port}")
+    for code, seconds in args.delay:
+        print(f"   ⏳ {code}: {seconds}s delay")
+    for code in args.fail:
+        print(f"   ❌ {code}: failing")
+    uvicorn.run(create_app(dict(args.delay), args.fail), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
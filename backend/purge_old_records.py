@@ -0,0 +1,56 @@
+"""
+Script to purge old notifications, alerts and security history.
+
+Applies the retention policies configured in settings (see *_RETENTION_DAYS
+and *_MAX_PER_USER). Rows are archived to gzip JSON Lines files under
+RETENTION_ARCHIVE_DIR before deletion unless --no-archive is given.
+Expired OTP challenges are deleted too (never archived).
+Intended to be run from cron.
+
+Usage:
+    python purge_old_records.py
+    python purge_old_records.py --batch-size 5000 --no-archive
+"""
+
+import argparse
+import sys
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, '.')
+
+from app.core.database import SessionLocal
+from app.services.otp_challenges import otp_challenge_store
+from app.services.retention_service import RetentionService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Purge old notifications, alerts and security history.")
+    parser.add_argument("--batch-size", type=int, default=None, help="Rows per delete batch")
+    parser.add_argument("--archive-dir", default=None, help="Directory for archive files")
+    parser.add_argument("--no-archive", action="store_true", help="Delete without archiving")
+    args = parser.parse_args()
+
+    service = RetentionService(
+        batch_size=args.batch_size,
+        archive_dir=args.archive_dir,
+        archive=not args.no_archive,
+    )
+
+    db = SessionLocal()
+    try:
+        results = service.run(db)
+        expired_otps = otp_challenge_store.purge_expired(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    print(f"{'Table':<20} {'Purged':>10} {'Archived':>10} {'Seconds':>9} {'Rows/s':>10}")
+    for result in results:
+        print(
+            f"{result.table:<20} {result.purged:>10,} {result.archived:>10,} "
+            f"{result.elapsed_seconds:>9.2f} {result.rows_per_second:>10,.0f}"
+        )
+    print(f"{'otp_challenges':<20} {expired_otps:>10,} {0:>10,}")
+
+
+if __name__ == "__main__":
+    main()
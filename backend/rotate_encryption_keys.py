@@ -0,0 +1,73 @@
+"""
+Script to re-encrypt stored notes and card data with the current key.
+
+Rotating the encryption key:
+1. Generate a new key, set it as ENCRYPTION_KEY and move the old one to
+   ENCRYPTION_OLD_KEYS on every instance. Both keys now decrypt; new
+   values use the new one. BLIND_INDEX_KEY is required from now on: if it
+   was unset, set it to the old key, so card_hash values stay valid (the
+   app and this script refuse to run without it).
+2. Run this script. It re-encrypts transactions and bank cards in
+   throttled chunks while the API keeps running, and can be stopped and
+   re-run at any time: it resumes from its checkpoint file.
+3. When it reports no unreadable values, remove the old key from
+   ENCRYPTION_OLD_KEYS. The report covers the whole table, including rows
+   scanned before a resume; a table that had unreadable values is scanned
+   again on every run until it has none.
+
+Usage:
+    python rotate_encryption_keys.py
+    python rotate_encryption_keys.py --workers 4 --rows-per-second 5000
+    python rotate_encryption_keys.py --restart
+"""
+
+import argparse
+import sys
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, '.')
+
+from app.core.blind_index import blind_index_root_key
+from app.core.database import SessionLocal
+from app.services.key_rotation import KeyRotationJob
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-encrypt stored values with the current encryption key.")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Rows per transaction")
+    parser.add_argument("--workers", type=int, default=1, help="Processes used for encryption")
+    parser.add_argument("--rows-per-second", type=int, default=None, help="Throttle; 0 = unthrottled")
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and scan every row again")
+    args = parser.parse_args()
+
+    try:
+        blind_index_root_key()
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+
+    job = KeyRotationJob(
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        rows_per_second=args.rows_per_second,
+        checkpoint_path=args.checkpoint,
+    )
+
+    db = SessionLocal()
+    try:
+        results = job.run(db, restart=args.restart)
+    finally:
+        db.close()
+
+    print(f"{'Table':<14} {'Scanned':>10} {'Rotated':>10} {'Conflicts':>10} {'Unreadable':>11} {'Rows/s':>10}")
+    for result in results:
+        print(
+            f"{result.table:<14} {result.scanned:>10,} {result.rotated:>10,} {result.conflicts:>10,} "
+            f"{result.unreadable:>11,} {result.rows_per_second:>10,.0f}"
+        )
+    if any(result.unreadable for result in results):
+        print("⚠️  Some values could not be decrypted; keep ENCRYPTION_OLD_KEYS until they are resolved.")
+
+
+if __name__ == "__main__":
+    main()
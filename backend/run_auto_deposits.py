@@ -0,0 +1,56 @@
+"""
+Script to run monthly savings-goal auto-deposits.
+
+Processes every goal whose next_auto_deposit_at has passed, in chunks of
+AUTO_DEPOSIT_CHUNK_SIZE goals per transaction. Safe to re-run or run after a
+crash: each goal is charged at most once per month. Run it from cron, or
+keep it running as a worker with --interval.
+
+Usage:
+    python run_auto_deposits.py
+    python run_auto_deposits.py --chunk-size 5000
+    python run_auto_deposits.py --interval 300
+"""
+
+import argparse
+import sys
+import time
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, '.')
+
+from app.core.database import SessionLocal
+from app.services.auto_deposit_service import AutoDepositScheduler
+
+
+def run_once(scheduler: AutoDepositScheduler) -> None:
+    db = SessionLocal()
+    try:
+        result = scheduler.run(db)
+    finally:
+        db.close()
+
+    print(
+        f"✅ {result.deposited:,} deposited ({result.amount:,}₫), "
+        f"{result.insufficient_funds:,} insufficient funds, {result.already_done:,} already done; "
+        f"{result.processed:,} goals in {result.chunks} chunks, {result.elapsed_seconds:.2f}s "
+        f"({result.goals_per_second:,.0f} goals/s)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run due savings-goal auto-deposits.")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Goals per transaction")
+    parser.add_argument("--interval", type=float, default=None,
+                        help="Keep running, checking for due goals every N seconds")
+    args = parser.parse_args()
+
+    scheduler = AutoDepositScheduler(chunk_size=args.chunk_size)
+    run_once(scheduler)
+    while args.interval:
+        time.sleep(args.interval)
+        run_once(scheduler)
+
+
+if __name__ == "__main__":
+    main()
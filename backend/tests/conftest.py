@@ -3,12 +3,19 @@ Pytest configuration and shared fixtures for security tests.
 """
 import pytest
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
 from fastapi.testclient import TestClient
 
 from app.main import app
-from app.core.database import Base, get_db
+from app.core.database import Base, get_db, get_read_db
 from app.core.config import settings
+from app.core.security import get_password_hash
+from app.models import User, Wallet
+from app.services.alert_engine import alert_engine
+from app.services.bill_provider_registry import bill_provider_registry
+from app.services.event_bus import event_bus
+from app.services.login_recorder import login_recorder
+from app.services.otp_challenges import otp_challenge_store
 
 # Use in-memory SQLite for testing
 TEST_DATABASE_URL = "sqlite:///./test.db"
@@ -18,11 +25,26 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Alerts are evaluated only when a test calls alert_engine.flush(), against the test database
+alert_engine.session_factory = TestingSessionLocal
+alert_engine.background = False
+# Event subscribers use the test database and finish before the response is returned
+event_bus.session_factory = TestingSessionLocal
+event_bus.run_background_inline = True
+# Login device/history rows are written only when a test calls login_recorder.flush()
+login_recorder.session_factory = TestingSessionLocal
+login_recorder.background = False
+
 
 @pytest.fixture(scope="function")
 def db():
     """Create a fresh database for each test."""
     Base.metadata.create_all(bind=engine)
+    # The provider registry is process-wide; don't carry rows over from another test's database
+    bill_provider_registry.invalidate()
+    alert_engine.reset()
+    login_recorder.reset()
+    otp_challenge_store.clear()
     db = TestingSessionLocal()
     try:
         yield db
@@ -46,9 +68,46 @@ def client(db):
     limiter.enabled = False
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     yield TestClient(app)
     app.dependency_overrides.clear()
     
     # Restore original rate limit setting
     limiter.enabled = original_enabled
 
+
+@pytest.fixture(scope="function")
+def test_user(db: Session):
+    """Create a test user."""
+    hashed_password = get_password_hash("TestPassword123!")
+    user = User(
+        email="test@example.com",
+        hashed_password=hashed_password,
+        full_name="Test User",
+        is_verified=True
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    
+    # Create wallet for user
+    wallet = Wallet(user_id=user.id, balance=1000000.0)
+    db.add(wallet)
+    db.commit()
+    
+    return user
+
+
+@pytest.fixture(scope="function")
+def auth_token(client, test_user):
+    """Get authentication token for test user."""
+    response = client.post(
+        "/api/v1/auth/login",
+        data={
+            "username": test_user.email,
+            "password": "TestPassword123!"
+        },
+        headers={"Content-Type": "application/x-www-form-urlencoded"}
+    )
+    assert response.status_code == 200
+    return response.json()["access_token"]
@@ -0,0 +1,181 @@
+"""
+Tests for the alert engine.
+"""
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app.core.encryption import encryption_service
+from app.models import Alert, AlertSettings, Budget, Transaction
+from app.services.alert_engine import (
+    DIRECTION_IN,
+    DIRECTION_OUT,
+    AlertEngine,
+    MoneyMovement,
+    alert_engine,
+)
+from app.services.login_recorder import login_recorder
+from tests.conftest import TestingSessionLocal
+
+
+def _alerts(db, user_id):
+    db.expire_all()
+    return db.query(Alert).filter(Alert.user_id == user_id).order_by(Alert.created_at, Alert.title).all()
+
+
+def _settings(db, user, **values):
+    db.add(AlertSettings(user_id=user.id, **values))
+    db.commit()
+
+
+def _out(user, amount, balance_after, note="Chuyển tiền", transaction_id=None):
+    return MoneyMovement(user_id=user.id, direction=DIRECTION_OUT, amount=amount, balance_after=balance_after,
+                         note=note, transaction_id=transaction_id)
+
+
+def test_large_transaction_and_low_balance(db, test_user):
+    _settings(db, test_user, large_transaction_threshold=500_000, low_balance_threshold=200_000)
+
+    alert_engine.publish(_out(test_user, 600_000, 400_000))  # large
+    alert_engine.publish(_out(test_user, 250_000, 150_000))  # crosses low balance
+    alert_engine.publish(_out(test_user, 50_000, 100_000))  # already below: no repeat
+    alert_engine.publish(MoneyMovement(user_id=test_user.id, direction=DIRECTION_IN, amount=700_000,
+                                       balance_after=800_000))  # large incoming
+    assert alert_engine.flush() == 3
+
+    assert sorted(a.type for a in _alerts(db, test_user.id)) == ["LARGE_TRANSACTION", "LARGE_TRANSACTION", "LOW_BALANCE"]
+
+
+def test_disabled_rules_produce_nothing(db, test_user):
+    _settings(db, test_user, large_transaction_threshold=1, enable_large_transaction_alert=False,
+              enable_budget_alert=False)
+
+    alert_engine.publish(_out(test_user, 600_000, 400_000))
+
+    assert alert_engine.flush() == 0
+
+
+def test_budget_usage_is_tracked_incrementally(db, test_user):
+    now = datetime.utcnow()
+    db.add(Budget(user_id=test_user.id, category="FOOD", amount=100_000, period="MONTH",
+                  month=now.month, year=now.year))
+    existing_id = str(uuid.uuid4())
+    db.add(Transaction(id=existing_id, sender_id=test_user.id, amount=50_000,
+                       encrypted_note=encryption_service.encrypt("ăn trưa")))
+    db.commit()
+
+    statements = []
+    engine = db.get_bind()
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        # Its event is queued, so the scan leaves it out and the event adds it once
+        alert_engine.publish(_out(test_user, 50_000, 950_000, "ăn trưa", existing_id))
+        alert_engine.publish(_out(test_user, 35_000, 915_000, "ăn tối"))  # 85% -> warning
+        alert_engine.publish(_out(test_user, 5_000, 910_000, "cafe"))  # 90%: already warned
+        alert_engine.publish(_out(test_user, 20_000, 890_000, "grab"))  # other category
+        alert_engine.flush()
+        alert_engine.publish(_out(test_user, 20_000, 870_000, "đồ ăn"))  # 110% -> exceeded
+        alert_engine.flush()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    alerts = _alerts(db, test_user.id)
+    assert [(a.type, a.severity) for a in alerts] == [("BUDGET_WARNING", "WARNING"), ("BUDGET_WARNING", "CRITICAL")]
+    assert "85%" in alerts[0].message
+    scans = [s for s in statements if s.startswith("SELECT") and "FROM transactions" in s]
+    assert len(scans) == 1
+
+
+def test_first_payment_of_the_month_can_trigger_the_warning(db, test_user):
+    now = datetime.utcnow()
+    db.add(Budget(user_id=test_user.id, category="FOOD", amount=100_000, period="MONTH",
+                  month=now.month, year=now.year))
+    earlier_id, payment_id = str(uuid.uuid4()), str(uuid.uuid4())
+    db.add(Transaction(id=earlier_id, sender_id=test_user.id, amount=10_000,
+                       encrypted_note=encryption_service.encrypt("ăn sáng")))
+    db.add(Transaction(id=payment_id, sender_id=test_user.id, amount=90_000,
+                       encrypted_note=encryption_service.encrypt("ăn trưa")))
+    db.commit()
+
+    # Committed before its event is evaluated; the scan it triggers must not swallow it
+    alert_engine.publish(_out(test_user, 90_000, 900_000, "ăn trưa", payment_id))
+    assert alert_engine.flush() == 1
+    assert "100%" in _alerts(db, test_user.id)[0].message
+
+    # A later rescan counts it and doesn't warn again
+    alert_engine.invalidate_budgets()
+    alert_engine.publish(_out(test_user, 1_000, 899_000, "ăn tối"))
+    assert alert_engine.flush() == 1  # 101% -> exceeded
+
+
+def test_budget_change_drops_tracked_usage(db, test_user):
+    now = datetime.utcnow()
+    budget = Budget(user_id=test_user.id, category="FOOD", amount=100_000, period="MONTH",
+                    month=now.month, year=now.year)
+    db.add(budget)
+    db.commit()
+    alert_engine.publish(_out(test_user, 10_000, 990_000, "ăn sáng"))
+    alert_engine.flush()
+
+    budget.amount = 12_000
+    db.commit()
+    alert_engine.publish(_out(test_user, 1_000, 989_000, "ăn sáng"))
+
+    # The rescan only sees committed transactions, so usage restarts from 0 + 1,000
+    assert alert_engine.flush() == 0
+    alert_engine.publish(_out(test_user, 9_000, 980_000, "ăn sáng"))
+    assert alert_engine.flush() == 1
+
+
+def test_settings_commit_invalidates_cached_rules(client, db, test_user, auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.post("/api/v1/wallets/withdraw", json={"amount": 100_000}, headers=headers)
+    alert_engine.flush()  # caches default rules (no low-balance threshold)
+
+    client.put("/api/v1/alerts/settings", json={"low_balance_threshold": 850_000}, headers=headers)
+    client.post("/api/v1/wallets/withdraw", json={"amount": 100_000}, headers=headers)
+    alert_engine.flush()
+
+    alerts = client.get("/api/v1/alerts", headers=headers).json()
+    assert [a["type"] for a in alerts if a["type"] != "NEW_DEVICE"] == ["LOW_BALANCE"]
+
+
+def test_new_device_login(client, db, test_user):
+    login = {"username": "test@example.com", "password": "TestPassword123!"}
+    client.post("/api/v1/auth/login", data=login, headers={"User-Agent": "Mozilla/5.0 (iPhone)"})
+    client.post("/api/v1/auth/login", data=login, headers={"User-Agent": "Mozilla/5.0 (iPhone)"})
+    login_recorder.flush()
+    alert_engine.flush()
+
+    assert [a.type for a in _alerts(db, test_user.id)] == ["NEW_DEVICE"]
+
+
+def test_publish_cost_is_well_under_a_millisecond(test_user):
+    engine = AlertEngine(session_factory=TestingSessionLocal, background=False)
+    event_ = _out(test_user, 1_000, 999_000)
+    count = 10_000
+
+    started = time.perf_counter()
+    for _ in range(count):
+        engine.publish(event_)
+    per_event = (time.perf_counter() - started) / count
+
+    assert per_event < 0.001
+    engine.reset()
+
+
+def test_background_worker_writes_batches(db, test_user):
+    _settings(db, test_user, large_transaction_threshold=1_000)
+    engine = AlertEngine(session_factory=TestingSessionLocal, batch_size=50, flush_interval_ms=20)
+
+    for i in range(120):
+        engine.publish(_out(test_user, 5_000, 1_000_000 - i))
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and len(_alerts(db, test_user.id)) < 120:
+        time.sleep(0.05)
+    engine.stop()
+
+    assert len(_alerts(db, test_user.id)) == 120
@@ -0,0 +1,131 @@
+"""
+Tests for bank card display fields and the card number blind index.
+"""
+import pytest
+from cryptography.fernet import Fernet
+from sqlalchemy import event
+
+from app.core.blind_index import BlindIndex, card_number_index, digits_only
+from app.core.encryption import encryption_service
+from app.core.security import get_password_hash
+from app.models import BankCard, Transaction
+from app.services.card_display import card_display_fields, detect_brand
+
+
+def _headers(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _add_card(client, token, number="5555 5555 5555 4444"):
+    response = client.post("/api/v1/cards", headers=_headers(token), json={
+        "card_number": number, "card_holder_name": "TEST USER", "expiry_date": "08/29",
+        "cvv": "123", "bank_name": "VCB", "card_type": "MASTERCARD",
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+def _no_decrypt(monkeypatch):
+    def fail(_):
+        raise AssertionError("decrypt called")
+    monkeypatch.setattr(encryption_service, "decrypt", fail)
+
+
+def test_display_fields_are_stored_when_the_card_is_added(client, db, auth_token, monkeypatch):
+    _no_decrypt(monkeypatch)
+    created = _add_card(client, auth_token)
+
+    card = db.query(BankCard).one()
+    assert (card.last4, card.brand, card.expiry_masked) == ("4444", "MASTERCARD", "**/29")
+    assert (created["card_number_masked"], created["expiry_date_masked"], created["brand"]) == (
+        "**** **** **** 4444", "**/29", "MASTERCARD",
+    )
+
+    listed = client.get("/api/v1/cards", headers=_headers(auth_token)).json()
+    single = client.get(f"/api/v1/cards/{card.id}", headers=_headers(auth_token)).json()
+    assert listed[0]["card_number_masked"] == single["card_number_masked"] == "**** **** **** 4444"
+
+
+def test_cards_without_display_fields_are_masked(client, db, test_user, auth_token):
+    db.add(BankCard(user_id=test_user.id, card_number_encrypted=encryption_service.encrypt("4111111111111111"),
+                    card_holder_name="TEST", expiry_date_encrypted=encryption_service.encrypt("12/30"),
+                    cvv_encrypted=encryption_service.encrypt("123"), bank_name="VCB", card_type="VISA"))
+    db.commit()
+
+    card = client.get("/api/v1/cards", headers=_headers(auth_token)).json()[0]
+
+    assert (card["card_number_masked"], card["expiry_date_masked"], card["brand"]) == ("****", "**/**", None)
+
+
+def test_card_deposit_note_shows_last4(client, db, test_user, auth_token, monkeypatch):
+    test_user.transaction_pin_hash = get_password_hash("123456")
+    db.commit()
+    card_id = _add_card(client, auth_token, number="4111111111111111")["id"]
+    db.query(BankCard).update({"is_verified": True})
+    db.commit()
+
+    _no_decrypt(monkeypatch)
+    response = client.post("/api/v1/wallets/deposit", headers=_headers(auth_token), json={
+        "amount": 50000, "source_type": "bank_card", "source_id": card_id, "transaction_pin": "123456",
+    })
+    assert response.status_code == 200
+
+    monkeypatch.undo()
+    note = encryption_service.decrypt(db.query(Transaction).one().encrypted_note)
+    assert note == "Nạp tiền từ thẻ VCB •••• 1111"
+
+
+def test_duplicate_card_is_rejected_with_one_lookup(client, db, auth_token, monkeypatch):
+    _add_card(client, auth_token)
+    _no_decrypt(monkeypatch)
+
+    statements = []
+    engine = db.get_bind()
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.post("/api/v1/cards", headers=_headers(auth_token), json={
+            "card_number": "5555-5555-5555-4444", "card_holder_name": "TEST USER", "expiry_date": "08/29",
+            "cvv": "123", "bank_name": "VCB", "card_type": "MASTERCARD",
+        })
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert (response.status_code, response.json()["detail"]) == (400, "Card is already linked to your account")
+    lookups = [s for s in statements if s.startswith("SELECT") and "bank_cards" in s]
+    assert len(lookups) == 1 and "card_hash" in lookups[0]
+    assert db.query(BankCard).count() == 1
+    assert db.query(BankCard).one().card_hash == card_number_index.hash("5555555555554444")
+
+
+def test_blind_indexes_are_keyed_per_name():
+    phone = BlindIndex("contacts.phone", normalize=digits_only)
+
+    assert card_number_index.hash("4111 1111 1111 1111") == card_number_index.hash("4111111111111111")
+    assert phone.hash("4111111111111111") != card_number_index.hash("4111111111111111")
+    assert BlindIndex("bank_cards.card_number", normalize=digits_only, key="other").hash("4111111111111111") != \
+        card_number_index.hash("4111111111111111")
+    assert card_number_index.hash("") is None and card_number_index.hash("--") is None
+
+
+def test_detect_brand():
+    assert [detect_brand(n) for n in (
+        "4111111111111111", "5555555555554444", "2221000000000009", "378282246310005",
+        "3530111333300000", "6200000000000005", "9704000000000018", "1234567890123",
+    )] == ["VISA", "MASTERCARD", "MASTERCARD", "AMEX", "JCB", "UNIONPAY", "NAPAS", None]
+    assert card_display_fields("9704000000000018", "01/30") == {"last4": "0018", "brand": "NAPAS", "expiry_masked": "**/30"}
+
+
+def test_card_hash_survives_encryption_key_rotation(monkeypatch):
+    from app.core.config import settings
+
+    old_key = settings.ENCRYPTION_KEY
+    before = BlindIndex("bank_cards.card_number", normalize=digits_only).hash("4111111111111111")
+
+    monkeypatch.setattr(settings, "ENCRYPTION_KEY", Fernet.generate_key().decode())
+    monkeypatch.setattr(settings, "ENCRYPTION_OLD_KEYS", old_key)
+    with pytest.raises(ValueError, match="BLIND_INDEX_KEY"):
+        BlindIndex("bank_cards.card_number", normalize=digits_only).hash("4111111111111111")
+
+    monkeypatch.setattr(settings, "BLIND_INDEX_KEY", old_key)
+    assert BlindIndex("bank_cards.card_number", normalize=digits_only).hash("4111111111111111") == before
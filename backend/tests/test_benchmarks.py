@@ -0,0 +1,101 @@
+"""
+Tests for the benchmark suite: statistics, comparison, a smoke run of
+every scenario against the app in-process, and the dataset generator.
+"""
+import asyncio
+from datetime import datetime
+
+import httpx
+
+from app.core.encryption import encryption_service
+from app.main import app
+from app.models import BankCard, Transaction, User, UserDevice
+from app.services.device_detection import device_fingerprint
+from benchmarks.dataset import PER_USER, DatasetGenerator, make_id
+from benchmarks.run import run_benchmarks
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.seed import seed_benchmark_data
+from benchmarks.stats import compare, percentile, summarize
+
+
+class TestStats:
+    def test_percentile_nearest_rank(self):
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 95) == 95.0
+        assert percentile(values, 99) == 99.0
+        assert percentile([], 50) == 0.0
+
+    def test_summarize(self):
+        result = summarize([0.010, 0.020, 0.030, 0.040], errors=1, elapsed=2.0)
+        assert result["requests"] == 5
+        assert result["error_rate"] == 0.2
+        assert result["throughput_rps"] == 2.0
+        assert result["p50_ms"] == 20.0
+        assert result["max_ms"] == 40.0
+
+    def test_compare_flags_regressions(self):
+        baseline = {"scenarios": {"balance": {"p95_ms": 10.0, "throughput_rps": 100.0}}}
+        ok = {"scenarios": {"balance": {"p95_ms": 10.5, "throughput_rps": 95.0}}}
+        slow = {"scenarios": {"balance": {"p95_ms": 15.0, "throughput_rps": 60.0}}}
+        assert compare(baseline, ok) == []
+        assert len(compare(baseline, slow)) == 2
+
+
+def test_all_scenarios_succeed(client, db):
+    """Every scenario runs against the app without errors."""
+    data = seed_benchmark_data(db, user_count=3)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            return await run_benchmarks(http, data, list(SCENARIOS), requests=3, concurrency=1, hot_accounts=2)
+
+    results = asyncio.run(run())
+
+    assert set(results) == set(SCENARIOS)
+    for name, result in results.items():
+        assert result["errors"] == 0, (name, result["errors_by_status"])
+        assert result["requests"] == 3
+
+
+def test_concurrent_transfers_between_hot_accounts_succeed(client, db):
+    """Parallel workers never cancel each other's transfer OTPs."""
+    data = seed_benchmark_data(db, user_count=3)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            return await run_benchmarks(http, data, ["transfer"], requests=24, concurrency=8, hot_accounts=2)
+
+    result = asyncio.run(run())["transfer"]
+
+    assert result["errors"] == 0, result["errors_by_status"]
+    assert result["requests"] == 24
+
+
+class TestDatasetGenerator:
+    def test_scale_factor_row_counts(self, db):
+        generator = DatasetGenerator(db, scale=0.0005, block_size=2, now=datetime(2025, 6, 1))
+        counts = generator.generate()
+
+        users = generator.user_count
+        assert users == 5
+        assert counts["users"] == users
+        assert counts["transactions"] == users * (PER_USER["transactions"] + PER_USER["bill_transactions"])
+        for table in ("notifications", "security_history", "user_devices", "budgets", "saved_bills"):
+            assert counts[table] == users * PER_USER[table]
+        assert db.query(Transaction).count() == counts["transactions"]
+
+    def test_ids_are_deterministic_and_data_is_usable(self, db):
+        generator = DatasetGenerator(db, scale=0.0001, seed=7, now=datetime(2025, 6, 1))
+        generator.generate()
+
+        user = db.query(User).filter(User.id == make_id(7, "users", 0)).one()
+        assert user.email == generator.email(0)
+        transaction = db.query(Transaction).filter(Transaction.receiver_id == user.id).first()
+        assert encryption_service.decrypt(transaction.encrypted_note)
+        card = db.query(BankCard).filter(BankCard.user_id == user.id).one()
+        assert encryption_service.decrypt(card.card_number_encrypted).startswith("4")
+        device = db.query(UserDevice).filter(UserDevice.user_id == user.id).first()
+        assert device.fingerprint == device_fingerprint(device.ip_address, device.user_agent)
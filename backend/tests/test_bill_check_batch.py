@@ -0,0 +1,185 @@
+"""
+Tests for POST /bills/check-batch and the bill check dispatcher, using the
+mock provider server in mock_bill_provider.py.
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from app.main import app
+from app.models import BillProvider, SavedBill
+from app.services.bill_gateway import (
+    BillCheckDispatcher,
+    BillGateway,
+    BillLookup,
+    HttpBillGateway,
+    get_bill_check_dispatcher,
+    stable_bill,
+)
+from app.services.bill_provider_registry import ProviderInfo
+from mock_bill_provider import create_app
+
+
+def _use_mock_providers(delays=None, failures=(), batch_timeout=5.0):
+    transport = httpx.ASGITransport(app=create_app(delays, failures))
+    gateway = HttpBillGateway("http://mock", timeout=5.0, transport=transport)
+    dispatcher = BillCheckDispatcher(gateway, max_per_provider=4, timeout=5.0, batch_timeout=batch_timeout)
+    app.dependency_overrides[get_bill_check_dispatcher] = lambda: dispatcher
+
+
+@pytest.fixture
+def providers(db):
+    rows = [BillProvider(name=f"{code} name", code=code) for code in ("EVN", "FPT", "VIETTEL")]
+    db.add_all(rows)
+    db.commit()
+    return {row.code: row.id for row in rows}
+
+
+def _has_bill(code, customer_code):
+    info = ProviderInfo(id=code, name=code, code=code, logo_url=None, is_active=True)
+    return stable_bill(info, customer_code)
+
+
+def test_batch_checks_saved_bills_and_pairs(client, db, test_user, auth_token, providers):
+    _use_mock_providers()
+    saved = SavedBill(user_id=test_user.id, provider_id=providers["EVN"], customer_code="EVN001")
+    db.add(saved)
+    db.commit()
+
+    response = client.post("/api/v1/bills/check-batch", headers={"Authorization": f"Bearer {auth_token}"}, json={
+        "items": [
+            {"saved_bill_id": saved.id},
+            {"provider_id": providers["FPT"], "customer_code": "FPT002"},
+            {"saved_bill_id": "missing"},
+            {"provider_id": "unknown", "customer_code": "X1"},
+        ],
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["complete"] is True
+    evn, fpt, missing, unknown = body["results"]
+    for result, code, customer_code in ((evn, "EVN", "EVN001"), (fpt, "FPT", "FPT002")):
+        expected = _has_bill(code, customer_code)
+        assert result["status"] == "OK"
+        assert result["customer_code"] == customer_code
+        assert result["has_bill"] is expected.has_bill
+        if expected.has_bill:
+            assert result["bill_info"]["amount"] == expected.amount
+    assert missing["status"] == "NOT_FOUND"
+    assert unknown["status"] == "NOT_FOUND"
+
+
+def test_empty_batch_checks_all_saved_bills(client, db, test_user, auth_token, providers):
+    _use_mock_providers()
+    db.add_all([
+        SavedBill(user_id=test_user.id, provider_id=providers[code], customer_code=f"{code}-{i}")
+        for i, code in enumerate(("EVN", "FPT", "VIETTEL"))
+    ])
+    db.commit()
+
+    response = client.post("/api/v1/bills/check-batch", headers={"Authorization": f"Bearer {auth_token}"}, json={})
+
+    assert [r["status"] for r in response.json()["results"]] == ["OK", "OK", "OK"]
+
+
+def test_slow_and_failing_providers_give_partial_results(client, test_user, auth_token, providers):
+    _use_mock_providers(delays={"EVN": 2.0}, failures={"VIETTEL"}, batch_timeout=0.5)
+
+    response = client.post("/api/v1/bills/check-batch", headers={"Authorization": f"Bearer {auth_token}"}, json={
+        "items": [
+            {"provider_id": providers["EVN"], "customer_code": "EVN001"},
+            {"provider_id": providers["FPT"], "customer_code": "FPT001"},
+            {"provider_id": providers["VIETTEL"], "customer_code": "VT001"},
+        ],
+    })
+
+    body = response.json()
+    assert body["complete"] is False
+    assert [r["status"] for r in body["results"]] == ["TIMEOUT", "OK", "ERROR"]
+
+
+def test_batch_size_is_limited(client, test_user, auth_token, providers, monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "BILL_CHECK_BATCH_MAX_ITEMS", 2)
+    _use_mock_providers()
+
+    response = client.post("/api/v1/bills/check-batch", headers={"Authorization": f"Bearer {auth_token}"}, json={
+        "items": [{"provider_id": providers["EVN"], "customer_code": f"C{i}"} for i in range(3)],
+    })
+
+    assert response.status_code == 400
+
+
+def test_check_uses_gateway(client, test_user, auth_token, providers):
+    _use_mock_providers(failures={"FPT"})
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    ok = client.post("/api/v1/bills/check", headers=headers,
+                     json={"provider_id": providers["EVN"], "customer_code": "EVN001"})
+    failed = client.post("/api/v1/bills/check", headers=headers,
+                         json={"provider_id": providers["FPT"], "customer_code": "FPT001"})
+
+    assert ok.json()["has_bill"] is _has_bill("EVN", "EVN001").has_bill
+    assert failed.status_code == 502
+
+
+class _CountingGateway(BillGateway):
+    def __init__(self):
+        self.in_flight = {}
+        self.peak = {}
+
+    async def check(self, provider, customer_code):
+        self.in_flight[provider.code] = self.in_flight.get(provider.code, 0) + 1
+        self.peak[provider.code] = max(self.peak.get(provider.code, 0), self.in_flight[provider.code])
+        await asyncio.sleep(0.01)
+        self.in_flight[provider.code] -= 1
+        return BillLookup(has_bill=False)
+
+
+def test_concurrency_is_limited_per_provider():
+    gateway = _CountingGateway()
+    dispatcher = BillCheckDispatcher(gateway, max_per_provider=2, timeout=1.0, batch_timeout=5.0)
+    providers = [ProviderInfo(id=code, name=code, code=code, logo_url=None, is_active=True) for code in ("A", "B")]
+    checks = [(i, providers[i % 2], f"C{i}") for i in range(20)]
+
+    outcomes, complete = asyncio.run(dispatcher.check_many(checks))
+
+    assert complete
+    assert len(outcomes) == 20
+    assert gateway.peak == {"A": 2, "B": 2}
+
+
+def test_per_call_timeout():
+    class SlowGateway(BillGateway):
+        async def check(self, provider, customer_code):
+            await asyncio.sleep(1)
+
+    dispatcher = BillCheckDispatcher(SlowGateway(), max_per_provider=1, timeout=0.05, batch_timeout=5.0)
+    provider = ProviderInfo(id="A", name="A", code="A", logo_url=None, is_active=True)
+
+    outcomes, complete = asyncio.run(dispatcher.check_many([("x", provider, "C1")]))
+
+    assert complete
+    assert outcomes["x"].status == "TIMEOUT"
+
+
+def test_http_gateway_quotes_customer_code_and_rejects_bad_amounts():
+    paths = []
+
+    def handler(request):
+        paths.append(request.url.raw_path.decode())
+        amount = {"ok": 150000, "fraction": 1500.5, "text": "abc", "missing": None}.get(request.url.path.rsplit("/", 1)[-1], 1000)
+        return httpx.Response(200, json={"has_bill": True, "amount": amount})
+
+    gateway = HttpBillGateway("http://mock", timeout=5.0, transport=httpx.MockTransport(handler))
+    dispatcher = BillCheckDispatcher(gateway, max_per_provider=4, timeout=5.0, batch_timeout=5.0)
+    provider = ProviderInfo(id="EVN", name="EVN", code="EVN", logo_url=None, is_active=True)
+    codes = ["ok", "fraction", "text", "missing", "../x?y#z"]
+
+    outcomes, _ = asyncio.run(dispatcher.check_many([(code, provider, code) for code in codes]))
+
+    assert outcomes["ok"].status == "OK" and outcomes["ok"].lookup.amount == 150000
+    assert [outcomes[code].status for code in ("fraction", "text", "missing")] == ["ERROR"] * 3
+    assert outcomes["../x?y#z"].status == "OK" and "/providers/EVN/bills/..%2Fx%3Fy%23z" in paths
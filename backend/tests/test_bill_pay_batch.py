@@ -0,0 +1,121 @@
+"""
+Tests for POST /bills/pay-batch.
+"""
+import pytest
+from sqlalchemy import event
+
+from app.core.security import get_password_hash
+from app.models import BillProvider, BillTransaction, SavedBill, Transaction, Wallet
+
+
+@pytest.fixture
+def payer(db, test_user):
+    test_user.transaction_pin_hash = get_password_hash("123456")
+    db.commit()
+    return test_user
+
+
+@pytest.fixture
+def providers(db):
+    rows = [BillProvider(name=f"{code} name", code=code) for code in ("EVN", "SAVACO", "FPT")]
+    db.add_all(rows)
+    db.commit()
+    return {row.code: row.id for row in rows}
+
+
+def _pay(client, auth_token, items, mode=None, pin="123456"):
+    body = {"items": items, "transaction_pin": pin}
+    if mode:
+        body["mode"] = mode
+    return client.post("/api/v1/bills/pay-batch", json=body, headers={"Authorization": f"Bearer {auth_token}"})
+
+
+def _balance(db, user):
+    return db.query(Wallet.balance).filter(Wallet.user_id == user.id).scalar()
+
+
+def test_pays_all_bills_with_one_debit(client, db, payer, auth_token, providers):
+    items = [
+        {"provider_id": providers["EVN"], "customer_code": "EVN001", "amount": 300_000, "save_bill": True},
+        {"provider_id": providers["SAVACO"], "customer_code": "SAV001", "amount": 150_000},
+        {"provider_id": providers["FPT"], "customer_code": "FPT001", "amount": 250_000},
+    ]
+    statements = []
+    engine = db.get_bind()
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = _pay(client, auth_token, items)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["paid_count"] == 3
+    assert body["total_paid"] == 700_000
+    assert body["balance"] == 300_000
+    assert [r["status"] for r in body["results"]] == ["PAID"] * 3
+    assert _balance(db, payer) == 300_000
+    assert db.query(BillTransaction).count() == 3
+    assert db.query(Transaction).count() == 3
+    assert db.query(SavedBill).filter(SavedBill.customer_code == "EVN001").count() == 1
+    assert sum(1 for s in statements if s.startswith("UPDATE wallets")) == 1
+
+    history = client.get("/api/v1/bills/history", headers={"Authorization": f"Bearer {auth_token}"}).json()
+    assert {h["customer_code"] for h in history} == {"EVN001", "SAV001", "FPT001"}
+
+
+def test_all_or_nothing_rejects_whole_batch(client, db, payer, auth_token, providers):
+    items = [
+        {"provider_id": providers["EVN"], "customer_code": "EVN001", "amount": 300_000},
+        {"provider_id": "unknown", "customer_code": "X1", "amount": 100_000},
+    ]
+
+    response = _pay(client, auth_token, items)
+
+    assert response.status_code == 400
+    statuses = [r["status"] for r in response.json()["detail"]["results"]]
+    assert statuses == ["SKIPPED", "PROVIDER_NOT_FOUND"]
+    assert _balance(db, payer) == 1_000_000
+    assert db.query(BillTransaction).count() == 0
+
+
+def test_all_or_nothing_insufficient_funds(client, db, payer, auth_token, providers):
+    items = [
+        {"provider_id": providers["EVN"], "customer_code": "EVN001", "amount": 600_000},
+        {"provider_id": providers["FPT"], "customer_code": "FPT001", "amount": 600_000},
+    ]
+
+    response = _pay(client, auth_token, items)
+
+    assert response.status_code == 400
+    assert [r["status"] for r in response.json()["detail"]["results"]] == ["INSUFFICIENT_FUNDS"] * 2
+    assert _balance(db, payer) == 1_000_000
+
+
+def test_best_effort_pays_what_it_can(client, db, payer, auth_token, providers):
+    items = [
+        {"provider_id": providers["EVN"], "customer_code": "EVN001", "amount": 600_000},
+        {"provider_id": providers["FPT"], "customer_code": "FPT001", "amount": 600_000},
+        {"provider_id": providers["EVN"], "customer_code": "EVN001", "amount": 100_000},
+        {"provider_id": providers["SAVACO"], "customer_code": "SAV001", "amount": 300_000},
+    ]
+
+    response = _pay(client, auth_token, items, mode="best_effort")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [r["status"] for r in body["results"]] == ["PAID", "INSUFFICIENT_FUNDS", "DUPLICATE", "PAID"]
+    assert body["total_paid"] == 900_000
+    assert _balance(db, payer) == 100_000
+    paid = [r for r in body["results"] if r["status"] == "PAID"]
+    assert {r["bill_transaction_id"] for r in paid} == {bt.id for bt in db.query(BillTransaction)}
+
+
+def test_wrong_pin_is_checked_once_and_pays_nothing(client, db, payer, auth_token, providers):
+    items = [{"provider_id": providers["EVN"], "customer_code": "EVN001", "amount": 100_000}]
+
+    response = _pay(client, auth_token, items, pin="000000")
+
+    assert response.status_code == 400
+    assert _balance(db, payer) == 1_000_000
@@ -0,0 +1,91 @@
+"""
+Tests for the in-process bill provider registry.
+"""
+import pytest
+from sqlalchemy import event
+
+from app.models import BillProvider, BillTransaction, Transaction
+from app.services import bill_provider_registry as registry_module
+from app.services.bill_provider_registry import BillProviderRegistry
+
+
+@pytest.fixture
+def statements(db):
+    """SQL statements executed on the test session's engine."""
+    executed = []
+    engine = db.get_bind()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def _provider(db, code, active=True):
+    provider = BillProvider(name=f"{code} name", code=code, is_active=active)
+    db.add(provider)
+    db.commit()
+    return provider
+
+
+def test_lookups_are_served_from_memory(db, statements):
+    evn_id = _provider(db, "EVN").id
+    _provider(db, "OLD", active=False)
+    registry = BillProviderRegistry(ttl_seconds=300)
+    registry.load(db)
+    statements.clear()
+
+    assert registry.get(db, evn_id).name == "EVN name"
+    assert registry.get_by_code(db, "EVN").id == evn_id
+    assert [p.code for p in registry.active(db)] == ["EVN"]
+    assert statements == []
+
+
+def test_ttl_expiry_reloads(db):
+    registry = BillProviderRegistry(ttl_seconds=0)
+    registry.load(db)
+    provider = BillProvider(name="Late", code="LATE")
+    db.add(provider)
+    db.flush()  # visible to this session, no commit hook yet
+    assert registry.get_by_code(db, "LATE").name == "Late"
+
+
+def test_orm_commit_invalidates_shared_registry(db):
+    registry_module.bill_provider_registry.load(db)
+    assert registry_module.bill_provider_registry.active(db) == []
+
+    _provider(db, "FPT")
+
+    assert [p.code for p in registry_module.bill_provider_registry.active(db)] == ["FPT"]
+
+
+def test_unknown_id_refreshes_at_most_once_per_interval(db, statements, monkeypatch):
+    registry = BillProviderRegistry(ttl_seconds=300)
+    registry.load(db)
+    monkeypatch.setattr(registry_module, "MISS_REFRESH_SECONDS", 3600)
+    statements.clear()
+
+    assert registry.get(db, "missing") is None
+    assert registry.get(db, "missing") is None
+    assert statements == []
+
+
+def test_history_and_saved_bills_use_registry_names(client, db, test_user, auth_token):
+    provider = _provider(db, "VIETTEL")
+    transaction = Transaction(sender_id=test_user.id, amount=99000)
+    db.add(transaction)
+    db.flush()
+    db.add(BillTransaction(user_id=test_user.id, provider_id=provider.id, customer_code="VT1",
+                           amount=99000, bill_period="01/2025", transaction_id=transaction.id))
+    db.commit()
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    saved = client.post("/api/v1/bills/saved", json={"provider_id": provider.id, "customer_code": "VT1"},
+                        headers=headers)
+    history = client.get("/api/v1/bills/history", headers=headers).json()
+
+    assert saved.json()["provider_name"] == "VIETTEL name"
+    assert history[0]["provider_name"] == "VIETTEL name"
+    assert client.get("/api/v1/bills/saved", headers=headers).json()[0]["provider_name"] == "VIETTEL name"
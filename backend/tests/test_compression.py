@@ -0,0 +1,91 @@
+"""
+Tests for the response compression middleware.
+"""
+import gzip
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, brotli, choose_encoding
+from benchmarks.compression import run as run_compression_benchmark
+
+
+def _app(minimum_size=100):
+    app = FastAPI()
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/large")
+    def large():
+        return {"rows": [{"note": "Chuyển tiền", "amount": i} for i in range(200)]}
+
+    @app.get("/image")
+    def image():
+        return PlainTextResponse(b"x" * 5000, media_type="image/png")
+
+    @app.get("/export")
+    def export():
+        def lines():
+            yield "id,amount\n"
+            for i in range(500):
+                yield f"{i},{i * 1000}\n"
+        return StreamingResponse(lines(), media_type="text/csv", headers={"ETag": '"v1"'})
+
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+    return TestClient(app)
+
+
+def test_choose_encoding():
+    assert choose_encoding(None) is None
+    assert choose_encoding("identity") is None
+    assert choose_encoding("gzip, br", ["br", "gzip"]) == "br"
+    assert choose_encoding("gzip;q=1.0, br;q=0.5", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("*;q=0.1, br;q=0", ["br", "gzip"]) == "gzip"
+
+
+def test_small_body_is_not_compressed():
+    response = _app().get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"ok": True}
+
+
+def test_large_body_is_gzipped():
+    client = _app()
+    raw = client.get("/large", headers={"Accept-Encoding": "identity"})
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert int(response.headers["content-length"]) < len(raw.content)
+    assert response.json() == raw.json()
+
+
+def test_brotli_preferred_when_available():
+    response = _app().get("/large", headers={"Accept-Encoding": "gzip, br"})
+    expected = "br" if brotli is not None else "gzip"
+    assert response.headers["content-encoding"] == expected
+    assert len(response.json()["rows"]) == 200
+
+
+def test_non_text_types_are_skipped():
+    response = _app().get("/image", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_streamed_export_is_compressed_incrementally():
+    with _app(minimum_size=10**6).stream("GET", "/export", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.headers["etag"] == 'W/"v1"'
+        raw = b"".join(response.iter_raw())
+    text = gzip.decompress(raw).decode()
+    assert text.startswith("id,amount\n0,0\n")
+    assert text.endswith("499,499000\n")
+
+
+def test_compression_benchmark_reports_savings():
+    results = run_compression_benchmark(repeat=1)
+    gzip_rows = [row for row in results if row["encoding"] == "gzip-6"]
+    assert gzip_rows and all(row["bytes"] < row["original_bytes"] for row in gzip_rows)
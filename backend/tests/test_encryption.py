@@ -0,0 +1,59 @@
+"""
+Tests for the AES-GCM envelope encryption format.
+"""
+from datetime import datetime
+
+import pytest
+from cryptography.fernet import Fernet
+
+from app.core.encryption import ENVELOPE_OVERHEAD, FORMAT_ENVELOPE, EncryptionService, data_key_id
+
+KEY = Fernet.generate_key().decode()
+
+
+def test_envelope_round_trip_is_compact():
+    service = EncryptionService(key=KEY)
+    fernet = EncryptionService(key=KEY, envelope=False)
+    note = "Chuyển tiền mua hàng"
+
+    token = service.encrypt(note)
+    blob = service.encrypt_bytes(note)
+
+    assert service.decrypt(token) == note
+    assert service.decrypt_bytes(blob) == note
+    assert blob[0] == FORMAT_ENVELOPE
+    assert len(blob) == len(note.encode()) + ENVELOPE_OVERHEAD
+    assert len(token) < len(fernet.encrypt(note))
+
+
+def test_fernet_values_still_decrypt():
+    legacy = Fernet(KEY.encode()).encrypt("4111111111111111".encode()).decode()
+
+    assert EncryptionService(key=KEY).decrypt(legacy) == "4111111111111111"
+    assert EncryptionService(key=KEY, envelope=False).encrypt("x").startswith("g")
+
+
+def test_data_keys_are_per_month_and_cached():
+    service = EncryptionService(key=KEY, cache_size=2)
+    january = service.encrypt_bytes("a", moment=datetime(2026, 1, 15))
+    february = service.encrypt_bytes("b", moment=datetime(2026, 2, 1))
+    service.encrypt_bytes("c", moment=datetime(2026, 3, 1))
+
+    assert january[2:6] != february[2:6]
+    assert list(service._data_keys) == [(0, data_key_id(datetime(2026, 2, 1))), (0, data_key_id(datetime(2026, 3, 1)))]
+    # An evicted key is derived again
+    assert service.decrypt_bytes(january) == "a"
+    assert len(service._data_keys) == 2
+
+
+def test_tampered_or_foreign_ciphertexts_are_rejected():
+    service = EncryptionService(key=KEY)
+    blob = bytearray(service.encrypt_bytes("secret"))
+    blob[5] ^= 1  # data key id is authenticated
+
+    with pytest.raises(ValueError):
+        service.decrypt_bytes(bytes(blob))
+    with pytest.raises(ValueError):
+        EncryptionService(key=Fernet.generate_key().decode()).decrypt(service.encrypt("secret"))
+    with pytest.raises(ValueError):
+        service.decrypt("not a ciphertext")
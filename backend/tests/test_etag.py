@@ -0,0 +1,99 @@
+"""
+Tests for conditional GET (ETag / If-None-Match) on read endpoints.
+"""
+import pytest
+
+from app.core.encryption import encryption_service
+from app.core.etag import compute_etag
+from app.models import BankCard, BillProvider, Budget
+
+
+def _headers(token, etag=None):
+    headers = {"Authorization": f"Bearer {token}"}
+    if etag:
+        headers["If-None-Match"] = etag
+    return headers
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/wallets/me",
+    "/api/v1/budgets",
+    "/api/v1/savings-goals",
+    "/api/v1/contacts",
+    "/api/v1/cards",
+    "/api/v1/notifications/settings",
+])
+def test_unchanged_resource_returns_304(client, auth_token, path):
+    first = client.get(path, headers=_headers(auth_token))
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    second = client.get(path, headers=_headers(auth_token, etag))
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+
+
+def test_etag_changes_with_data(client, db, test_user, auth_token):
+    etag = client.get("/api/v1/wallets/me", headers=_headers(auth_token)).headers["etag"]
+    client.post("/api/v1/wallets/deposit", json={"amount": 1000}, headers=_headers(auth_token))
+
+    response = client.get("/api/v1/wallets/me", headers=_headers(auth_token, etag))
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_same_second_edit_changes_etag(client, db, test_user, auth_token):
+    db.add(Budget(user_id=test_user.id, category="FOOD", amount=100000, year=2025, month=1))
+    db.commit()
+    etag = client.get("/api/v1/budgets", headers=_headers(auth_token)).headers["etag"]
+
+    budget = db.query(Budget).filter(Budget.user_id == test_user.id).one()
+    budget.amount = 200000
+    db.commit()
+
+    response = client.get("/api/v1/budgets", headers=_headers(auth_token, etag))
+    assert response.status_code == 200
+    assert response.json()[0]["amount"] == 200000
+
+
+def test_bill_providers_are_publicly_cacheable(client, db, auth_token):
+    db.add(BillProvider(name="EVN", code="EVN"))
+    db.commit()
+
+    response = client.get("/api/v1/bills/providers", headers=_headers(auth_token))
+    assert response.headers["cache-control"].startswith("public, max-age=")
+
+    again = client.get("/api/v1/bills/providers", headers=_headers(auth_token, response.headers["etag"]))
+    assert again.status_code == 304
+
+
+def test_cards_list_and_304_skip_decryption(client, db, test_user, auth_token, monkeypatch):
+    db.add(BankCard(user_id=test_user.id, card_number_encrypted=encryption_service.encrypt("4111111111111111"),
+                    card_holder_name="TEST", expiry_date_encrypted=encryption_service.encrypt("12/30"),
+                    cvv_encrypted=encryption_service.encrypt("123"), bank_name="VCB", card_type="VISA",
+                    last4="1111", brand="VISA", expiry_masked="**/30"))
+    db.commit()
+
+    def fail(_):
+        raise AssertionError("decrypt called")
+    monkeypatch.setattr(encryption_service, "decrypt", fail)
+    first = client.get("/api/v1/cards", headers=_headers(auth_token))
+    assert first.json()[0]["card_number_masked"].endswith("1111")
+    second = client.get("/api/v1/cards", headers=_headers(auth_token, first.headers["etag"]))
+    assert second.status_code == 304
+
+
+def test_if_none_match_list_and_star(client, auth_token):
+    etag = client.get("/api/v1/contacts", headers=_headers(auth_token)).headers["etag"]
+    listed = client.get("/api/v1/contacts", headers=_headers(auth_token, f'"other", {etag[2:]}'))
+    star = client.get("/api/v1/contacts", headers=_headers(auth_token, "*"))
+    assert listed.status_code == 304
+    assert star.status_code == 304
+
+
+def test_compute_etag_is_order_sensitive():
+    assert compute_etag([("a", 1), ("b", 2)]) != compute_etag([("b", 2), ("a", 1)])
+    assert compute_etag([("a", 1)]) == compute_etag([("a", 1)])
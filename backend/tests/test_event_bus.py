@@ -0,0 +1,115 @@
+"""
+Tests for the domain event bus.
+"""
+import asyncio
+import json
+import threading
+from dataclasses import dataclass
+
+from app.core.metrics import OPERATION_SECONDS
+from app.models import Notification
+from app.services.event_bus import DomainEvent, EventBus, JsonlEventQueue, event_bus
+
+
+@dataclass(frozen=True)
+class SomethingHappened(DomainEvent):
+    value: int
+
+
+def test_events_are_delivered_only_after_commit(db):
+    received = []
+    handler = event_bus.subscribe(SomethingHappened, received.append)
+    try:
+        event_bus.publish_after_commit(db, SomethingHappened(value=1))
+        db.rollback()
+        event_bus.publish_after_commit(db, SomethingHappened(value=2))
+        assert received == []
+        db.commit()
+    finally:
+        event_bus.unsubscribe(SomethingHappened, handler)
+
+    assert [e.value for e in received] == [2]
+
+
+def test_failing_subscriber_is_isolated_and_timed():
+    bus = EventBus()
+    received = []
+
+    @bus.subscribe(SomethingHappened)
+    def explode(event):
+        raise RuntimeError("boom")
+
+    bus.subscribe(SomethingHappened, received.append, name="collect")
+    before = OPERATION_SECONDS.count("event_SomethingHappened_explode")
+
+    bus.publish(SomethingHappened(value=1))
+
+    assert [e.value for e in received] == [1]
+    assert OPERATION_SECONDS.count("event_SomethingHappened_explode") == before + 1
+    assert OPERATION_SECONDS.count("event_SomethingHappened_collect") >= 1
+
+
+def test_base_class_subscribers_receive_every_event():
+    bus = EventBus()
+    received = []
+    bus.subscribe(DomainEvent, received.append)
+
+    bus.publish(SomethingHappened(value=3))
+
+    assert len(received) == 1
+
+
+def test_background_subscriber_runs_off_the_calling_thread():
+    bus = EventBus(max_workers=1)
+    done = threading.Event()
+    threads = []
+
+    @bus.subscribe(SomethingHappened, background=True)
+    def slow(event):
+        threads.append(threading.current_thread().name)
+        done.set()
+
+    bus.publish(SomethingHappened(value=1))
+
+    assert done.wait(5)
+    assert threads[0].startswith("events")
+    bus.shutdown()
+
+
+def test_coroutine_subscriber_runs_on_the_event_loop():
+    bus = EventBus()
+    received = []
+
+    @bus.subscribe(SomethingHappened)
+    async def collect(event):
+        await asyncio.sleep(0)
+        received.append(event.value)
+
+    async def main():
+        bus.publish(SomethingHappened(value=7))
+        assert received == []  # scheduled, not awaited by publish
+        await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert received == [7]
+
+
+def test_durable_queue_gets_every_event(tmp_path):
+    bus = EventBus(durable_queue=JsonlEventQueue(str(tmp_path)))
+
+    bus.publish(SomethingHappened(value=5))
+
+    lines = [json.loads(line) for f in tmp_path.glob("events-*.jsonl") for line in f.read_text().splitlines()]
+    assert lines[0]["type"] == "SomethingHappened"
+    assert lines[0]["data"] == {"value": 5}
+
+
+def test_withdraw_side_effects_run_as_subscribers(client, db, test_user, auth_token):
+    response = client.post("/api/v1/wallets/withdraw", json={"amount": 50_000},
+                           headers={"Authorization": f"Bearer {auth_token}"})
+
+    assert response.status_code == 200
+    db.expire_all()
+    notifications = db.query(Notification).filter(Notification.user_id == test_user.id).all()
+    assert [n.title for n in notifications] == ["Rút tiền thành công"]
+    assert OPERATION_SECONDS.count("event_WithdrawCompleted_notify_withdraw") >= 1
@@ -0,0 +1,152 @@
+"""
+Tests for multi-key decryption and the re-encryption job.
+"""
+import json
+import time
+
+from cryptography.fernet import Fernet
+
+from app.core.encryption import EncryptionService
+from app.models import BankCard, Transaction
+from app.services.key_rotation import KeyRotationJob, rotate_values, UNREADABLE
+
+OLD_KEY = Fernet.generate_key().decode()
+NEW_KEY = Fernet.generate_key().decode()
+
+
+def _seed(db, user, service, notes=5):
+    for i in range(notes):
+        db.add(Transaction(id=f"tx-{i:03d}", receiver_id=user.id, amount=1000, encrypted_note=service.encrypt(f"note {i}")))
+    db.add(Transaction(id="tx-empty", receiver_id=user.id, amount=1000, encrypted_note=None))
+    db.add(BankCard(id="card-1", user_id=user.id, card_number_encrypted=service.encrypt("4111111111111111"),
+                    card_holder_name="TEST", expiry_date_encrypted=service.encrypt("12/30"),
+                    cvv_encrypted=service.encrypt("123"), bank_name="VCB", card_type="VISA"))
+    db.commit()
+
+
+def _job(tmp_path, service, **kwargs):
+    kwargs.setdefault("rows_per_second", 0)
+    return KeyRotationJob(service=service, checkpoint_path=str(tmp_path / "checkpoint.json"), **kwargs)
+
+
+def test_old_keys_decrypt_and_rotate():
+    old = EncryptionService(key=OLD_KEY)
+    legacy = EncryptionService(key=OLD_KEY, envelope=False).encrypt("legacy")
+    rotating = EncryptionService(key=NEW_KEY, old_keys=[OLD_KEY])
+
+    token = old.encrypt("secret")
+    assert rotating.decrypt(token) == "secret"
+    assert rotating.decrypt(legacy) == "legacy"
+
+    rotated = rotating.rotate(token)
+    assert EncryptionService(key=NEW_KEY, old_keys=[]).decrypt(rotated) == "secret"
+    assert rotating.rotate(rotated) is None  # already current
+    assert rotate_values(rotating, [legacy, None, "garbage"])[1:] == [None, UNREADABLE]
+
+
+def test_job_reencrypts_every_column(db, test_user, tmp_path):
+    _seed(db, test_user, EncryptionService(key=OLD_KEY))
+    rotating = EncryptionService(key=NEW_KEY, old_keys=[OLD_KEY])
+
+    results = _job(tmp_path, rotating, chunk_size=2).run(db)
+
+    assert [(r.table, r.scanned, r.rotated, r.unreadable) for r in results] == [
+        ("transactions", 6, 5, 0), ("bank_cards", 1, 1, 0),
+    ]
+    assert results[0].chunks == 3
+    new_only = EncryptionService(key=NEW_KEY, old_keys=[])
+    db.expire_all()
+    assert sorted(new_only.decrypt(t.encrypted_note) for t in db.query(Transaction) if t.encrypted_note) == [
+        f"note {i}" for i in range(5)
+    ]
+    card = db.query(BankCard).one()
+    assert [new_only.decrypt(v) for v in (card.card_number_encrypted, card.expiry_date_encrypted, card.cvv_encrypted)] == [
+        "4111111111111111", "12/30", "123",
+    ]
+    # A second run finds nothing left to do
+    assert [r.rotated for r in _job(tmp_path, rotating).run(db, restart=True)] == [0, 0]
+
+
+def test_job_resumes_from_checkpoint(db, test_user, tmp_path):
+    _seed(db, test_user, EncryptionService(key=OLD_KEY))
+    rotating = EncryptionService(key=NEW_KEY, old_keys=[OLD_KEY])
+    checkpoint = tmp_path / "checkpoint.json"
+    checkpoint.write_text(json.dumps({
+        "key": _job(tmp_path, rotating).key_fingerprint,
+        "tables": {"transactions": {"last_id": "tx-002", "done": False}, "bank_cards": {"last_id": None, "done": True}},
+    }))
+
+    results = _job(tmp_path, rotating).run(db)
+
+    assert [(r.scanned, r.rotated, r.resumed_from) for r in results] == [(3, 2, "tx-002"), (0, 0, None)]
+    saved = json.loads(checkpoint.read_text())
+    assert saved["tables"]["transactions"] == {"last_id": "tx-empty", "done": True, "unreadable": 0}
+    # A checkpoint written for another key is ignored
+    assert _job(tmp_path, EncryptionService(key=Fernet.generate_key().decode(), old_keys=[NEW_KEY])).run(db)[0].scanned == 6
+
+
+def test_rows_changed_during_the_chunk_are_not_overwritten(db, test_user, tmp_path):
+    _seed(db, test_user, EncryptionService(key=OLD_KEY), notes=2)
+    rotating = EncryptionService(key=NEW_KEY, old_keys=[OLD_KEY])
+    job = _job(tmp_path, rotating)
+    rotate = job._rotate
+
+    def rotate_while_the_api_writes(tokens):
+        db.query(Transaction).filter(Transaction.id == "tx-000").update({"encrypted_note": rotating.encrypt("edited")})
+        db.commit()
+        return rotate(tokens)
+
+    job._rotate = rotate_while_the_api_writes
+    result = job.rotate_table(db, job.targets[0], {"key": job.key_fingerprint, "tables": {}})
+
+    assert (result.rotated, result.conflicts) == (1, 1)
+    db.expire_all()
+    assert rotating.decrypt(db.get(Transaction, "tx-000").encrypted_note) == "edited"
+
+
+def test_unreadable_values_are_left_alone_and_throttled(db, test_user, tmp_path):
+    _seed(db, test_user, EncryptionService(key=OLD_KEY), notes=4)
+    db.query(Transaction).filter(Transaction.id == "tx-001").update({"encrypted_note": "plain text note"})
+    db.commit()
+
+    started = time.perf_counter()
+    job = _job(tmp_path, EncryptionService(key=NEW_KEY, old_keys=[OLD_KEY]), chunk_size=2, rows_per_second=40)
+    result = job.rotate_table(db, job.targets[0], {"key": job.key_fingerprint, "tables": {}})
+
+    assert (result.scanned, result.rotated, result.unreadable) == (5, 3, 1)
+    assert time.perf_counter() - started >= 4 / 40  # two full chunks before the last one
+    assert db.get(Transaction, "tx-001").encrypted_note == "plain text note"
+
+
+def test_unreadable_values_are_reported_on_every_run_until_fixed(db, test_user, tmp_path):
+    _seed(db, test_user, EncryptionService(key=OLD_KEY), notes=4)
+    db.query(Transaction).filter(Transaction.id == "tx-001").update({"encrypted_note": "plain text note"})
+    db.commit()
+    rotating = EncryptionService(key=NEW_KEY, old_keys=[OLD_KEY])
+
+    assert _job(tmp_path, rotating, chunk_size=2).run(db)[0].unreadable == 1
+    # A plain re-run scans the table again rather than reporting it finished and clean
+    again = _job(tmp_path, rotating, chunk_size=2).run(db)
+    assert [(r.table, r.scanned, r.rotated, r.unreadable) for r in again] == [
+        ("transactions", 5, 0, 1), ("bank_cards", 0, 0, 0),
+    ]
+
+    # Crash after the chunk with the unreadable value: the resumed run still reports it
+    checkpoint = tmp_path / "checkpoint.json"
+    saved = json.loads(checkpoint.read_text())
+    saved["tables"]["transactions"] = {"last_id": "tx-001", "done": False, "unreadable": 1}
+    checkpoint.write_text(json.dumps(saved))
+    resumed = _job(tmp_path, rotating, chunk_size=2).run(db)[0]
+    assert (resumed.scanned, resumed.unreadable, resumed.resumed_from) == (3, 1, "tx-001")
+
+    # Once the value is readable again, a run reports none
+    db.query(Transaction).filter(Transaction.id == "tx-001").update({"encrypted_note": rotating.encrypt("fixed")})
+    db.commit()
+    assert _job(tmp_path, rotating, chunk_size=2).run(db)[0].unreadable == 0
+
+def test_worker_processes_rotate_chunks(db, test_user, tmp_path):
+    _seed(db, test_user, EncryptionService(key=OLD_KEY), notes=8)
+
+    results = _job(tmp_path, EncryptionService(key=NEW_KEY, old_keys=[OLD_KEY]), workers=2).run(db)
+
+    assert [r.rotated for r in results] == [8, 1]
@@ -0,0 +1,160 @@
+"""
+Tests for the login write-behind recorder.
+"""
+import logging
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.models import Alert, SecurityHistory, UserDevice
+from app.services.alert_engine import alert_engine
+from app.services.device_detection import device_fingerprint, parse_user_agent
+from app.services.login_recorder import LoginRecord, LoginRecorder, login_recorder
+from tests.conftest import TestingSessionLocal
+
+IPHONE = "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X)"
+CHROME = "Mozilla/5.0 (Windows NT 10.0) Chrome/120.0"
+
+
+def _login(user, user_agent=IPHONE, ip="10.0.0.1", at=None):
+    return LoginRecord(user_id=user.id, ip_address=ip, user_agent=user_agent, device_type="IOS",
+                       device_name="iPhone", occurred_at=at or datetime.utcnow())
+
+
+def _devices(db, user):
+    db.expire_all()
+    return db.query(UserDevice).filter(UserDevice.user_id == user.id).all()
+
+
+def test_login_is_written_on_flush(client, db, test_user):
+    response = client.post("/api/v1/auth/login", data={"username": "test@example.com", "password": "TestPassword123!"},
+                           headers={"User-Agent": IPHONE})
+    assert response.status_code == 200
+    assert _devices(db, test_user) == []
+
+    assert login_recorder.flush() == 1
+    alert_engine.flush()
+
+    devices = _devices(db, test_user)
+    assert [(d.device_type, d.device_name) for d in devices] == [("IOS", "iPhone")]
+    history = db.query(SecurityHistory).filter(SecurityHistory.user_id == test_user.id).all()
+    assert [(h.action_type, h.device_id) for h in history] == [("LOGIN", devices[0].id)]
+    assert [a.type for a in db.query(Alert).all()] == ["NEW_DEVICE"]
+
+
+def test_batch_uses_one_statement_per_table(db, test_user):
+    now = datetime.utcnow()
+    for i in range(10):
+        login_recorder.record(_login(test_user, at=now + timedelta(seconds=i)))
+    login_recorder.record(_login(test_user, user_agent=CHROME))
+
+    statements = []
+    engine = db.get_bind()
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert login_recorder.flush() == 11
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert len(_devices(db, test_user)) == 2
+    assert db.query(SecurityHistory).count() == 11
+    assert len([s for s in statements if s.startswith("SELECT")]) == 1
+    assert len([s for s in statements if s.startswith("INSERT INTO user_devices")]) == 1
+    assert len([s for s in statements if s.startswith("INSERT INTO security_history")]) == 1
+
+
+def test_last_login_updates_are_debounced(db, test_user):
+    recorder = LoginRecorder(session_factory=TestingSessionLocal, debounce_seconds=300, background=False)
+    start = datetime(2026, 1, 1, 8, 0)
+    recorder.record(_login(test_user, at=start))
+    recorder.flush()
+
+    recorder.record(_login(test_user, at=start + timedelta(minutes=1)))  # within the window
+    recorder.flush()
+    assert _devices(db, test_user)[0].last_login.replace(tzinfo=None) == start
+
+    recorder.record(_login(test_user, at=start + timedelta(minutes=6)))
+    recorder.record(_login(test_user, at=start + timedelta(minutes=7)))
+    recorder.flush()
+    assert _devices(db, test_user)[0].last_login.replace(tzinfo=None) == start + timedelta(minutes=6)
+    assert db.query(SecurityHistory).count() == 4
+
+
+def test_removed_device_is_reactivated_on_login(db, test_user):
+    login_recorder.record(_login(test_user))
+    login_recorder.flush()
+
+    device = _devices(db, test_user)[0]
+    device.is_active = False
+    db.commit()  # drops the cached device
+    login_recorder.record(_login(test_user))
+    login_recorder.flush()
+    alert_engine.flush()
+
+    devices = _devices(db, test_user)
+    assert [(d.id, d.is_active) for d in devices] == [(device.id, True)]
+    assert [a.type for a in db.query(Alert).all()] == ["NEW_DEVICE", "NEW_DEVICE"]
+
+
+def test_devices_are_matched_by_fingerprint(db, test_user):
+    login_recorder.record(_login(test_user))
+    login_recorder.flush()
+    login_recorder.invalidate_devices()
+
+    statements = []
+    engine = db.get_bind()
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        login_recorder.record(_login(test_user))
+        login_recorder.flush()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    device = _devices(db, test_user)[0]
+    assert device.fingerprint == device_fingerprint("10.0.0.1", IPHONE)
+    lookup = next(s for s in statements if s.startswith("SELECT"))
+    assert "fingerprint" in lookup and "user_agent" not in lookup.split("WHERE")[1]
+    assert len(_devices(db, test_user)) == 1
+
+
+def test_user_agent_parsing_is_memoized():
+    parse_user_agent.cache_clear()
+    for _ in range(3):
+        assert parse_user_agent(IPHONE) == ("IOS", "iPhone")
+        assert parse_user_agent(CHROME) == ("WEB", "Chrome Browser")
+    assert parse_user_agent("Mozilla/5.0 (Linux; Android 14; SAMSUNG SM-S918B)") == ("ANDROID", "Samsung Device")
+
+    info = parse_user_agent.cache_info()
+    assert (info.hits, info.misses) == (4, 3)
+
+
+def test_failed_batch_is_retried_then_logged(test_user, caplog):
+    def broken_session():
+        raise RuntimeError("database is down")
+
+    recorder = LoginRecorder(session_factory=broken_session, background=False)
+    recorder.record(_login(test_user))
+
+    with caplog.at_level(logging.WARNING, logger="app.services.login_recorder"):
+        assert recorder.flush() == 0
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert any("retrying" in m for m in messages)
+    assert any(m.startswith(f"Unrecorded login: user={test_user.id}") for m in messages)
+
+
+def test_background_worker_writes_batches(db, test_user):
+    recorder = LoginRecorder(session_factory=TestingSessionLocal, batch_size=20, flush_interval_ms=20)
+
+    for i in range(50):
+        recorder.record(_login(test_user, ip=f"10.0.0.{i % 5}"))
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and db.query(SecurityHistory).count() < 50:
+        time.sleep(0.05)
+    recorder.stop()
+
+    assert db.query(SecurityHistory).count() == 50
+    assert len(_devices(db, test_user)) == 5
@@ -0,0 +1,108 @@
+"""
+Tests for the /metrics endpoint and connection pool telemetry.
+"""
+import sqlite3
+import time
+
+import pytest
+
+from sqlalchemy import create_engine, exc, text
+
+from app.core.database import InstrumentedQueuePool, engines, pool_stats
+from app.core.metrics import (
+    Histogram, REQUEST_LATENCY, REQUEST_DB_STATEMENTS, OPERATION_SECONDS, RequestDBStats, _request_db_stats,
+)
+
+
+class TestPoolMetrics:
+    """Test pool checkout instrumentation."""
+
+    def test_checkouts_are_recorded(self):
+        engine = create_engine(
+            "sqlite://",
+            poolclass=InstrumentedQueuePool,
+            pool_size=2,
+            pool_logging_name="test_pool",
+            creator=lambda: sqlite3.connect(":memory:", check_same_thread=False),
+        )
+        engines["test_pool"] = engine
+        try:
+            for _ in range(3):
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+            assert pool_stats["test_pool"].checkouts == 3
+        finally:
+            engines.pop("test_pool", None)
+            pool_stats.pop("test_pool", None)
+            engine.dispose()
+
+    def test_failed_statements_leave_no_timing_state(self):
+        engine = create_engine("sqlite://")
+        stats = RequestDBStats()
+        token = _request_db_stats.set(stats)
+        try:
+            with engine.connect() as conn:
+                for _ in range(3):
+                    with pytest.raises(exc.OperationalError):
+                        conn.execute(text("SELECT * FROM missing_table"))
+                conn.execute(text("SELECT 1"))
+                assert "query_started" not in conn.info
+        finally:
+            _request_db_stats.reset(token)
+            engine.dispose()
+        assert stats.statements == 1
+
+    def test_metrics_endpoint_exposes_pool_gauges(self, client):
+        engine = create_engine(
+            "sqlite://",
+            poolclass=InstrumentedQueuePool,
+            pool_logging_name="test_pool",
+            creator=lambda: sqlite3.connect(":memory:", check_same_thread=False),
+        )
+        engines["test_pool"] = engine
+        try:
+            with engine.connect():
+                response = client.get("/metrics")
+            assert response.status_code == 200
+            assert 'db_pool_checked_out{pool="test_pool"} 1' in response.text
+            assert "# TYPE db_pool_checkout_wait_seconds_total counter" in response.text
+        finally:
+            engines.pop("test_pool", None)
+            pool_stats.pop("test_pool", None)
+            engine.dispose()
+
+
+class TestRequestMetrics:
+    """Test request histograms and service hooks."""
+
+    def test_latency_is_labelled_by_route_template(self, client, auth_token):
+        before = REQUEST_LATENCY.count("GET", "/api/v1/cards/{card_id}", "404")
+        response = client.get(
+            "/api/v1/cards/does-not-exist",
+            headers={"Authorization": f"Bearer {auth_token}"}
+        )
+        assert response.status_code == 404
+        assert REQUEST_LATENCY.count("GET", "/api/v1/cards/{card_id}", "404") == before + 1
+        assert REQUEST_DB_STATEMENTS.count("/api/v1/cards/{card_id}") >= 1
+
+    def test_unmatched_paths_share_one_label(self, client):
+        before = REQUEST_LATENCY.count("GET", "unmatched", "404")
+        client.get("/no/such/path/12345")
+        assert REQUEST_LATENCY.count("GET", "unmatched", "404") == before + 1
+
+    def test_bcrypt_hook_is_recorded(self, client, auth_token):
+        # Logging in (auth_token fixture) verifies the password with bcrypt
+        assert OPERATION_SECONDS.count("bcrypt_verify") >= 1
+        text_output = client.get("/metrics").text
+        assert 'operation_duration_seconds_count{operation="bcrypt_verify"}' in text_output
+        assert "http_request_duration_seconds_bucket" in text_output
+
+    def test_observation_overhead_budget(self):
+        """Recording one observation must stay under 20 microseconds."""
+        histogram = Histogram("budget_test", "overhead budget", labels=("route",))
+        iterations = 20000
+        started = time.perf_counter()
+        for _ in range(iterations):
+            histogram.observe(0.012, "/api/v1/wallets/me")
+        per_observation = (time.perf_counter() - started) / iterations
+        assert per_observation < 20e-6
@@ -0,0 +1,72 @@
+"""
+Tests for integer minor-unit money handling.
+"""
+from decimal import Decimal
+
+import pytest
+from pydantic import TypeAdapter, ValidationError
+
+from app.core.money import sum_money, to_minor_units
+from app.models import Contact, Transaction, User, Wallet
+from app.schemas import Money
+
+
+def _headers(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.parametrize("value, expected", [
+    (50000, 50000), (50000.0, 50000), (Decimal("120000.00"), 120000), ("75000", 75000),
+])
+def test_to_minor_units(value, expected):
+    result = to_minor_units(value)
+    assert result == expected and type(result) is int
+
+
+@pytest.mark.parametrize("value", [1000.5, "12.34", "abc", True, float("inf")])
+def test_fractional_or_invalid_amounts_are_rejected(value):
+    with pytest.raises(ValidationError):
+        TypeAdapter(Money).validate_python(value)
+
+
+def test_deposit_rejects_fractional_dong(client, auth_token):
+    response = client.post("/api/v1/wallets/deposit", json={"amount": 1000.5}, headers=_headers(auth_token))
+    assert response.status_code == 422
+
+
+def test_balance_is_exact_integer(client, db, test_user, auth_token):
+    for _ in range(10):
+        client.post("/api/v1/wallets/deposit", json={"amount": 0.1e5}, headers=_headers(auth_token))
+
+    balance = client.get("/api/v1/wallets/me", headers=_headers(auth_token)).json()["balance"]
+    assert balance == 1_100_000 and isinstance(balance, int)
+
+
+def test_sum_money_returns_int(db, test_user):
+    assert db.query(sum_money(Transaction.amount)).scalar() == 0
+    db.add_all([Transaction(sender_id=test_user.id, amount=amount) for amount in (1, 2, 3)])
+    db.commit()
+    total = db.query(sum_money(Transaction.amount)).scalar()
+    assert total == 6 and type(total) is int
+
+
+def test_contact_stats_are_summed_in_sql(client, db, test_user, auth_token):
+    friend = User(email="friend@example.com", hashed_password="x", full_name="Friend", is_verified=True)
+    db.add(friend)
+    db.flush()
+    db.add(Wallet(user_id=friend.id, balance=0))
+    db.add(Contact(user_id=test_user.id, name="Friend", email=friend.email))
+    db.add_all([
+        Transaction(sender_id=test_user.id, receiver_id=friend.id, amount=30000),
+        Transaction(sender_id=test_user.id, receiver_id=friend.id, amount=20000),
+        Transaction(sender_id=friend.id, receiver_id=test_user.id, amount=5000),
+    ])
+    db.commit()
+    contact_id = db.query(Contact.id).filter(Contact.email == friend.email).scalar()
+
+    stats = client.get(f"/api/v1/contacts/{contact_id}/stats", headers=_headers(auth_token)).json()
+
+    assert stats["total_transactions"] == 3
+    assert stats["total_amount_sent"] == 50000
+    assert stats["total_amount_received"] == 5000
+    assert stats["last_transaction_date"] is not None
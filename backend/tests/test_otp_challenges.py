@@ -0,0 +1,156 @@
+"""
+Tests for the OTP challenge store.
+"""
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.models import OtpChallenge
+from app.services.otp_challenges import (
+    OTP_EXPIRED,
+    OTP_INVALID,
+    OTP_LOCKED,
+    OTP_MISSING,
+    OTP_OK,
+    OTP_PURPOSE_BANK_CARD,
+    OTP_PURPOSE_TRANSFER,
+    OtpChallengeStore,
+    otp_challenge_store,
+)
+
+
+def _issue(db, user, purpose=OTP_PURPOSE_TRANSFER, target="friend@example.com", store=otp_challenge_store, **kwargs):
+    code = store.issue(db, user.id, purpose, target=target, **kwargs)
+    db.commit()
+    return code
+
+
+def _wrong(code):
+    return f"{(int(code) + 1) % 1_000_000:06d}"
+
+
+def test_code_is_single_use_and_never_touches_users(db, test_user):
+    user_id = test_user.id
+    statements = []
+    engine = db.get_bind()
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        code = otp_challenge_store.issue(db, user_id, OTP_PURPOSE_TRANSFER, target="friend@example.com")
+        db.commit()
+        assert otp_challenge_store.verify(db, user_id, OTP_PURPOSE_TRANSFER, code, target="friend@example.com") == OTP_OK
+        db.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert not [s for s in statements if "users" in s.split("WHERE")[0]]
+    assert not [s for s in statements if s.startswith("SELECT")]  # served from the cache
+    assert otp_challenge_store.verify(db, user_id, OTP_PURPOSE_TRANSFER, code, target="friend@example.com") == OTP_MISSING
+
+
+def test_challenges_are_scoped_by_purpose_and_target(db, test_user):
+    transfer_code = _issue(db, test_user)
+    card_code = _issue(db, test_user, purpose=OTP_PURPOSE_BANK_CARD, target="card-1")
+
+    assert otp_challenge_store.verify(db, test_user.id, OTP_PURPOSE_TRANSFER, transfer_code, target="other@example.com") == OTP_MISSING
+    assert otp_challenge_store.verify(db, test_user.id, OTP_PURPOSE_BANK_CARD, card_code, target="card-1") == OTP_OK
+    assert otp_challenge_store.verify(db, test_user.id, OTP_PURPOSE_TRANSFER, transfer_code, target="friend@example.com") == OTP_OK
+
+
+def test_wrong_codes_are_counted_then_locked(db, test_user):
+    store = OtpChallengeStore(max_attempts=3)
+    code = _issue(db, test_user, store=store)
+
+    results = [store.verify(db, test_user.id, OTP_PURPOSE_TRANSFER, _wrong(code), target="friend@example.com")
+               for _ in range(3)]
+
+    assert results == [OTP_INVALID, OTP_INVALID, OTP_LOCKED]
+    assert store.verify(db, test_user.id, OTP_PURPOSE_TRANSFER, code, target="friend@example.com") == OTP_LOCKED
+    db.expire_all()
+    assert db.query(OtpChallenge).one().attempts == 3
+    # A fresh challenge starts over
+    code = _issue(db, test_user, store=store)
+    assert store.verify(db, test_user.id, OTP_PURPOSE_TRANSFER, code, target="friend@example.com") == OTP_OK
+
+
+def test_wrong_code_does_not_commit_the_callers_transaction(db, test_user):
+    code = _issue(db, test_user)
+    test_user.full_name = "Not committed"
+
+    assert otp_challenge_store.verify(db, test_user.id, OTP_PURPOSE_TRANSFER, _wrong(code), target="friend@example.com") == OTP_INVALID
+    db.rollback()
+
+    assert test_user.full_name != "Not committed"
+    assert db.query(OtpChallenge).one().attempts == 1
+
+
+def test_attempts_counted_by_another_worker_lock_a_cached_challenge(db, test_user):
+    other = OtpChallengeStore()
+    code = _issue(db, test_user)
+    for _ in range(other.max_attempts):
+        other.verify(db, test_user.id, OTP_PURPOSE_TRANSFER, _wrong(code), target="friend@example.com")
+
+    # This worker still has the challenge cached with no attempts
+    assert otp_challenge_store._cached((test_user.id, OTP_PURPOSE_TRANSFER, "friend@example.com")).attempts == 0
+    assert otp_challenge_store.verify(db, test_user.id, OTP_PURPOSE_TRANSFER, code, target="friend@example.com") == OTP_LOCKED
+    db.commit()
+    assert db.query(OtpChallenge).count() == 1
+
+
+def test_reissuing_replaces_the_old_code(db, test_user):
+    old = _issue(db, test_user)
+    new = _issue(db, test_user)
+
+    if old != new:
+        assert otp_challenge_store.verify(db, test_user.id, OTP_PURPOSE_TRANSFER, old, target="friend@example.com") == OTP_INVALID
+    assert otp_challenge_store.verify(db, test_user.id, OTP_PURPOSE_TRANSFER, new, target="friend@example.com") == OTP_OK
+    assert db.query(OtpChallenge).count() == 0
+
+
+def test_database_is_the_fallback_for_other_workers(db, test_user):
+    issuing, other = OtpChallengeStore(), OtpChallengeStore()
+    first = _issue(db, test_user, store=issuing)
+    assert other.verify(db, test_user.id, OTP_PURPOSE_TRANSFER, _wrong(first), target="friend@example.com") == OTP_INVALID
+
+    # Reissued elsewhere: the stale cached challenge is reloaded instead of rejecting the new code
+    second = _issue(db, test_user, store=issuing)
+    assert other.verify(db, test_user.id, OTP_PURPOSE_TRANSFER, second, target="friend@example.com") == OTP_OK
+    db.commit()
+    assert issuing.verify(db, test_user.id, OTP_PURPOSE_TRANSFER, second, target="friend@example.com") == OTP_MISSING
+
+
+def test_rolled_back_challenge_is_not_cached(db, test_user):
+    code = otp_challenge_store.issue(db, test_user.id, OTP_PURPOSE_TRANSFER, target="friend@example.com")
+    db.rollback()
+
+    assert otp_challenge_store.verify(db, test_user.id, OTP_PURPOSE_TRANSFER, code, target="friend@example.com") == OTP_MISSING
+
+
+def test_expired_challenges_are_rejected_and_purged(db, test_user):
+    code = _issue(db, test_user, ttl_minutes=1)
+    _issue(db, test_user, purpose=OTP_PURPOSE_BANK_CARD, target="card-1", ttl_minutes=60)
+    db.query(OtpChallenge).filter(OtpChallenge.purpose == OTP_PURPOSE_TRANSFER).update(
+        {"expires_at": datetime.utcnow() - timedelta(seconds=1)}
+    )
+    db.commit()
+    otp_challenge_store.clear()
+
+    assert otp_challenge_store.verify(db, test_user.id, OTP_PURPOSE_TRANSFER, code, target="friend@example.com") == OTP_EXPIRED
+    assert otp_challenge_store.purge_expired(db, batch_size=1) == 1
+    assert [c.purpose for c in db.query(OtpChallenge).all()] == [OTP_PURPOSE_BANK_CARD]
+
+
+def test_registration_is_verified_with_the_emailed_code(client, db, capsys):
+    response = client.post("/api/v1/auth/register", json={
+        "email": "new@example.com", "password": "NewPassword123!", "full_name": "New User",
+    })
+    assert response.status_code == 200
+    code = re.search(r"OTP Code: (\d{6})", capsys.readouterr().out).group(1)
+
+    wrong = client.post("/api/v1/auth/verify-otp", json={"email": "new@example.com", "otp_code": _wrong(code)})
+    ok = client.post("/api/v1/auth/verify-otp", json={"email": "new@example.com", "otp_code": code})
+
+    assert (wrong.status_code, wrong.json()["detail"]) == (400, "Invalid OTP")
+    assert ok.status_code == 200
+    assert db.query(OtpChallenge).count() == 0
@@ -0,0 +1,61 @@
+"""
+Tests for read-replica routing using two SQLite databases (primary and replica).
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, ReplicaRouter, RoutingSession
+from app.models import User
+
+
+@pytest.fixture
+def engines(tmp_path):
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        Base.metadata.create_all(bind=engine)
+    # The replica holds a stale copy of the user
+    with sessionmaker(bind=replica)() as db:
+        db.add(User(id="u1", email="u1@example.com", full_name="Stale Name"))
+        db.commit()
+    with sessionmaker(bind=primary)() as db:
+        db.add(User(id="u1", email="u1@example.com", full_name="Fresh Name"))
+        db.commit()
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+class TestReplicaRouting:
+    """Test replica selection, lag awareness and read-your-writes."""
+
+    def test_reads_go_to_replica_and_writes_to_primary(self, engines):
+        primary, replica = engines
+        ReadSession = sessionmaker(class_=RoutingSession, bind=primary)
+
+        with ReadSession(replica=replica) as db:
+            user = db.query(User).filter(User.id == "u1").first()
+            assert user.full_name == "Stale Name"
+
+            db.add(User(id="u2", email="u2@example.com"))
+            db.commit()
+
+        with sessionmaker(bind=primary)() as db:
+            assert db.query(User).filter(User.id == "u2").count() == 1
+
+    def test_lagging_replica_is_skipped(self, engines):
+        primary, replica = engines
+        router = ReplicaRouter([replica], max_lag_seconds=5, lag_probe=lambda engine: 30.0)
+        assert router.choose_replica() is None
+
+        router = ReplicaRouter([replica], max_lag_seconds=5, lag_probe=lambda engine: 0.5)
+        assert router.choose_replica() is replica
+
+    def test_recent_writer_reads_from_primary(self, engines):
+        primary, replica = engines
+        router = ReplicaRouter([replica], read_your_writes_seconds=60, lag_probe=lambda engine: 0.0)
+
+        router.mark_write("client-a")
+        assert router.choose_replica("client-a") is None
+        assert router.choose_replica("client-b") is replica
@@ -0,0 +1,76 @@
+"""
+Tests for the orjson list-response path.
+
+The hand-built list endpoints return ORJSONResponse directly; their output
+must still match what the declared response_model would produce.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app.core.encryption import encryption_service
+from app.core.responses import ORJSONResponse
+from app.models import BillProvider, BillTransaction, SavedBill, Transaction
+from app.schemas import BillHistoryResponse, SavedBillResponse, TransactionResponse
+from benchmarks.serialization import run as run_serialization_benchmark
+
+
+def _headers(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _matches_response_model(model, payload):
+    adapter = TypeAdapter(List[model])
+    assert payload == adapter.dump_python(adapter.validate_python(payload), mode="json")
+
+
+def test_orjson_datetimes_match_pydantic():
+    moment = datetime(2025, 1, 2, 3, 4, 5, 678000, tzinfo=timezone.utc)
+    body = ORJSONResponse({"at": moment, "naive": moment.replace(tzinfo=None)}).body
+    assert body == b'{"at":"2025-01-02T03:04:05.678000Z","naive":"2025-01-02T03:04:05.678000"}'
+
+
+def test_transaction_history(client, db, test_user, auth_token):
+    now = datetime.utcnow()
+    db.add_all([
+        Transaction(sender_id=None, receiver_id=test_user.id, amount=50000.0,
+                    timestamp=now - timedelta(hours=1), encrypted_note=encryption_service.encrypt("Nạp tiền")),
+        Transaction(sender_id=test_user.id, receiver_id=None, amount=20000.0,
+                    timestamp=now, encrypted_note=encryption_service.encrypt("Rút tiền")),
+    ])
+    db.commit()
+
+    response = client.get("/api/v1/wallets/transactions", headers=_headers(auth_token))
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert [(tx["type"], tx["note"]) for tx in payload] == [("withdraw", "Rút tiền"), ("deposit", "Nạp tiền")]
+    _matches_response_model(TransactionResponse, payload)
+
+
+def test_bill_lists(client, db, test_user, auth_token):
+    provider = BillProvider(name="EVN (Điện lực)", code="EVN")
+    db.add(provider)
+    db.flush()
+    transaction = Transaction(sender_id=test_user.id, amount=120000.0, encrypted_note=None)
+    db.add(transaction)
+    db.flush()
+    db.add(SavedBill(user_id=test_user.id, provider_id=provider.id, customer_code="EVN001", alias="Nhà"))
+    db.add(BillTransaction(user_id=test_user.id, provider_id=provider.id, customer_code="EVN001",
+                           amount=120000, bill_period="01/2025", transaction_id=transaction.id))
+    db.commit()
+
+    saved = client.get("/api/v1/bills/saved", headers=_headers(auth_token)).json()
+    history = client.get("/api/v1/bills/history", headers=_headers(auth_token)).json()
+
+    assert saved[0]["provider_name"] == "EVN (Điện lực)"
+    assert history[0]["amount"] == 120000.0
+    _matches_response_model(SavedBillResponse, saved)
+    _matches_response_model(BillHistoryResponse, history)
+
+
+def test_serialization_benchmark_paths_agree():
+    result = run_serialization_benchmark(rows=50, repeat=1)
+    assert result["rows"] == 50
+    assert result["after_us_per_row"] > 0
@@ -0,0 +1,90 @@
+"""
+Tests for the retention service (bulk purge of notifications, alerts, history).
+"""
+import gzip
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import User, Notification
+from app.services.retention_service import RetentionService, RetentionPolicy
+
+
+def _make_user(db: Session, email: str) -> User:
+    user = User(email=email, hashed_password="x", full_name="Retention User", is_verified=True)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def _add_notifications(db: Session, user: User, ages_in_days):
+    now = datetime.utcnow()
+    for i, age in enumerate(ages_in_days):
+        db.add(Notification(
+            user_id=user.id,
+            title=f"n{i}",
+            message="m",
+            type="TRANSACTION",
+            created_at=now - timedelta(days=age),
+        ))
+    db.commit()
+
+
+class TestRetentionService:
+    """Test age and count policies."""
+
+    def test_age_policy_purges_only_old_rows(self, db: Session, tmp_path):
+        user = _make_user(db, "old@example.com")
+        _add_notifications(db, user, [1, 2, 100, 200, 300])
+
+        service = RetentionService(batch_size=2, archive_dir=str(tmp_path))
+        result = service.apply_policy(db, RetentionPolicy(model=Notification, max_age_days=90))
+
+        assert result.purged == 3
+        assert result.archived == 3
+        assert db.query(Notification).count() == 2
+
+        archive_files = list((tmp_path / "notifications").glob("*.jsonl.gz"))
+        assert len(archive_files) == 1
+        with gzip.open(archive_files[0], "rt", encoding="utf-8") as f:
+            archived = [json.loads(line) for line in f]
+        assert len(archived) == 3
+
+    def test_count_policy_keeps_newest_rows_per_user(self, db: Session):
+        first = _make_user(db, "first@example.com")
+        second = _make_user(db, "second@example.com")
+        _add_notifications(db, first, [1, 2, 3, 4, 5])
+        _add_notifications(db, second, [1, 2])
+
+        service = RetentionService(batch_size=10, archive=False)
+        result = service.apply_policy(db, RetentionPolicy(model=Notification, max_per_user=3))
+
+        assert result.purged == 2
+        assert result.archived == 0
+        remaining = db.query(Notification).filter(Notification.user_id == first.id).all()
+        assert sorted(n.title for n in remaining) == ["n0", "n1", "n2"]
+        assert db.query(Notification).filter(Notification.user_id == second.id).count() == 2
+
+    def test_count_policy_scans_the_table_once_and_batches_by_user(self, db: Session, tmp_path):
+        users = [_make_user(db, f"user{i}@example.com") for i in range(3)]
+        for user in users:
+            _add_notifications(db, user, [1, 2, 3, 4, 5])
+
+        statements = []
+        engine = db.get_bind()
+        record = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            service = RetentionService(batch_size=2, archive_dir=str(tmp_path))
+            result = service.apply_policy(db, RetentionPolicy(model=Notification, max_per_user=2))
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert result.purged == result.archived == 9
+        assert not any("OVER" in statement for statement in statements)
+        assert sum("GROUP BY" in statement for statement in statements) == 1
+        for user in users:
+            remaining = db.query(Notification).filter(Notification.user_id == user.id).all()
+            assert sorted(n.title for n in remaining) == ["n0", "n1"]
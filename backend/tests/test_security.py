@@ -25,44 +25,7 @@ from app.core.security import (
     ALGORITHM,
 )
 from app.core.encryption import EncryptionService
-from app.models import User, Wallet
-
-
-@pytest.fixture(scope="function")
-def test_user(db: Session):
-    """Create a test user."""
-    hashed_password = get_password_hash("TestPassword123!")
-    user = User(
-        email="test@example.com",
-        hashed_password=hashed_password,
-        full_name="Test User",
-        is_verified=True
-    )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    
-    # Create wallet for user
-    wallet = Wallet(user_id=user.id, balance=1000000.0)
-    db.add(wallet)
-    db.commit()
-    
-    return user
-
-
-@pytest.fixture(scope="function")
-def auth_token(client, test_user):
-    """Get authentication token for test user."""
-    response = client.post(
-        "/api/v1/auth/login",
-        data={
-            "username": test_user.email,
-            "password": "TestPassword123!"
-        },
-        headers={"Content-Type": "application/x-www-form-urlencoded"}
-    )
-    assert response.status_code == 200
-    return response.json()["access_token"]
+from app.models import User
 
 
 class TestSQLInjectionProtection:
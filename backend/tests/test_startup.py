@@ -0,0 +1,68 @@
+"""
+Tests for lazy imports and startup behaviour.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from cryptography.fernet import Fernet
+from fastapi.testclient import TestClient
+
+from app.core.encryption import EncryptionService
+from app.main import app
+from app.services import fcm_service
+from check_import_time import LAZY_MODULES, parse_importtime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_heavy_sdks_are_not_imported_at_startup():
+    code = (
+        "import json, sys, app.main; "
+        f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
+
+
+def test_parse_importtime():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     app.core.config\n"
+        "import time:      2000 |       5000 |   app.main\n"
+    )
+    assert parse_importtime(output) == [
+        ("app.core.config", 120, 120, 2),
+        ("app.main", 2000, 5000, 1),
+    ]
+
+
+def test_ciphers_are_created_on_first_use():
+    service = EncryptionService(key=Fernet.generate_key().decode())
+    assert "master_keys" not in vars(service) and not service._data_keys
+    assert service.decrypt(service.encrypt("hello")) == "hello"
+    assert "master_keys" in vars(service) and len(service._data_keys) == 1
+    assert "fernets" not in vars(service)  # only needed for values written before the envelope format
+
+
+def test_invalid_encryption_key_fails_at_startup(monkeypatch):
+    monkeypatch.setattr("app.main.encryption_service", EncryptionService(key="not-a-key"))
+
+    with pytest.raises(ValueError, match="Invalid ENCRYPTION_KEY"):
+        with TestClient(app):
+            pass
+
+
+def test_firebase_warm_up_without_credentials(monkeypatch, tmp_path):
+    monkeypatch.setenv("FIREBASE_CREDENTIALS", str(tmp_path / "missing.json"))
+    monkeypatch.setattr(fcm_service, "_firebase_app", None)
+
+    thread = fcm_service.warm_up_firebase()
+    thread.join(timeout=30)
+
+    assert not thread.is_alive()
+    assert fcm_service._firebase_app is None
@@ -185,7 +185,7 @@ class BankCard {
   final String bankName;
   final String cardType; // VISA, MASTERCARD, ATM
   final String cardNumberMasked; // Last 4 digits only
-  final String expiryDateMasked; // MM/YY
+  final String expiryDateMasked; // **/YY
   final bool isVerified;
   final DateTime createdAt;
 